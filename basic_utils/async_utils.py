@@ -0,0 +1,37 @@
+import asyncio
+from time import monotonic
+from typing import Callable, Generator
+from .wait_utils import FileStableProbe, T
+
+async def wait_until(predicate: Callable[[], bool],
+                     timeout: float = None,
+                     poll_interval: float = 0.01) -> bool:
+    """
+    The awaitable version of `wait_utils.wait_until`.
+    """
+    start_time = monotonic()
+    while not predicate():
+        if timeout is not None and monotonic() - start_time >= timeout:
+            return False
+        await asyncio.sleep(poll_interval)
+    return True
+
+async def run_poll(poll: Generator[float, None, T]) -> T:
+    """
+    The awaitable version of `wait_utils.run_poll`, the event loop runs while sleeping.
+    """
+    while True:
+        try:
+            delay = next(poll)
+        except StopIteration as stop:
+            return stop.value
+        await asyncio.sleep(delay)
+
+async def wait_for_file_stable(file_path: str,
+                               idle_window: float = 0.2,
+                               timeout: float = None,
+                               poll_interval: float = 0.01) -> bool:
+    """
+    The awaitable version of `wait_utils.wait_for_file_stable`.
+    """
+    return await wait_until(FileStableProbe(file_path, idle_window), timeout, poll_interval)
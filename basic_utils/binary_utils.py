@@ -3,12 +3,27 @@ Functions used for binary processing.
 """
 
 import socket
+import struct
+
+# The precomputed big-endian codecs of the common widths, keyed by the number of octets.
+NUM_STRUCTS = {
+    1: struct.Struct("!B"),
+    2: struct.Struct("!H"),
+    4: struct.Struct("!I"),
+    8: struct.Struct("!Q"),
+}
+# The exclusive upper bound of the numbers of each width in `NUM_STRUCTS`.
+NUM_LIMITS = {octet_num: 1 << (8*octet_num) for octet_num in NUM_STRUCTS}
 
 def num2bytes(num, octet_num, overflow_escape=False) -> bytes:
     """
     Convert the number into the binary expression with 1 octet
     `octet_num` should usually be 1 or 2.
     """
+    codec = NUM_STRUCTS.get(octet_num)
+    if codec is not None and 0 <= num < NUM_LIMITS[octet_num]:
+        # Fast path: no range warning needed.
+        return codec.pack(num)
     bit_num = 8*octet_num
     if not 0 <= num < 2**bit_num:
         if not overflow_escape:
@@ -0,0 +1,136 @@
+import os, json
+import numpy as np
+from time import monotonic
+from contextlib import contextmanager
+
+TRACE_JSONL_SUFFIX = ".jsonl"
+CHROME_TRACE_SUFFIX = ".chrome.json"
+
+class Tracer:
+    """
+    Record the spans (by `time.monotonic`) of the phases of the testcases,
+    export them as JSONL or as a Chrome trace (chrome://tracing, Perfetto),
+    and summarize the duration of each phase.
+    """
+    def __init__(self, worker: int = None):
+        # (worker, testcase, name, category, start time, end time)
+        self.spans : list[tuple] = []
+        # The index of the worker (e.g. the sandbox) recording the spans, kept across `clear`.
+        self.worker = worker
+        # The index of the running testcase, recorded along with the spans.
+        self.testcase : int = None
+
+    def clear(self):
+        self.spans = []
+        self.testcase = None
+
+    ########## Record ##########
+
+    def record(self, name: str, start_time: float, end_time: float, category: str = "phase"):
+        self.spans.append((self.worker, self.testcase, name, category, start_time, end_time))
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase"):
+        """
+        Record the span of the block.
+        """
+        start_time = monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, start_time, monotonic(), category)
+
+    ########## Export ##########
+
+    def write_jsonl(self, path: str):
+        """
+        Write one span per line.
+        """
+        with open(path, 'w') as file:
+            for worker, testcase, name, category, start_time, end_time in self.spans:
+                file.write(json.dumps({
+                    "worker": worker,
+                    "testcase": testcase,
+                    "name": name,
+                    "category": category,
+                    "start": start_time,
+                    "end": end_time,
+                    "duration": end_time - start_time,
+                }) + '\n')
+
+    def read_jsonl(self, path: str):
+        """
+        Append the spans written by `write_jsonl` (e.g. by another process).
+        """
+        with open(path, 'r') as file:
+            for line in file:
+                span = json.loads(line)
+                self.spans.append((span.get("worker"), span["testcase"], span["name"], span["category"],
+                                   span["start"], span["end"]))
+
+    def write_chrome_trace(self, path: str):
+        """
+        Write the spans as complete events of the Chrome trace event format (in microseconds).
+        The spans of each worker are on a thread of their own (named after the worker),
+        so the spans of the parallel workers do not overlap.
+        """
+        pid = os.getpid()
+        def get_tid(worker: int) -> int:
+            return pid if worker is None else worker
+        events = [{
+            "name": "thread_name",
+            "ph": "M",
+            "pid": pid,
+            "tid": get_tid(worker),
+            "args": {"name": f"worker {worker}"},
+        } for worker in sorted({span[0] for span in self.spans if span[0] is not None})]
+        events += [{
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_time * 1e6,
+            "dur": (end_time - start_time) * 1e6,
+            "pid": pid,
+            "tid": get_tid(worker),
+            "args": {"worker": worker, "testcase": testcase},
+        } for worker, testcase, name, category, start_time, end_time in self.spans]
+        with open(path, 'w') as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def export(self, path_prefix: str):
+        """
+        Write `{path_prefix}.jsonl` and `{path_prefix}.chrome.json`.
+        """
+        self.write_jsonl(path_prefix + TRACE_JSONL_SUFFIX)
+        self.write_chrome_trace(path_prefix + CHROME_TRACE_SUFFIX)
+
+    ########## Summary ##########
+
+    def summarize(self) -> dict[str, dict[str, float]]:
+        """
+        Get `{name: {"count", "total", "p50", "p95", "max"}}` of the durations (in seconds) of each span name,
+        in the order the names are first seen.
+        """
+        durations : dict[str, list[float]] = {}
+        for _, _, name, _, start_time, end_time in self.spans:
+            durations.setdefault(name, []).append(end_time - start_time)
+        summary = {}
+        for name, duration_list in durations.items():
+            duration_array = np.array(duration_list)
+            summary[name] = {
+                "count": len(duration_list),
+                "total": float(np.sum(duration_array)),
+                "p50": float(np.percentile(duration_array, 50)),
+                "p95": float(np.percentile(duration_array, 95)),
+                "max": float(np.max(duration_array)),
+            }
+        return summary
+
+    def report(self):
+        """
+        Print the summary of the spans.
+        """
+        print(f"{'span':<24}{'count':>7}{'total(s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+        for name, stats in self.summarize().items():
+            print(f"{name:<24}{stats['count']:>7}{stats['total']:>10.2f}"
+                  f"{stats['p50']*1e3:>10.1f}{stats['p95']*1e3:>10.1f}{stats['max']*1e3:>10.1f}")
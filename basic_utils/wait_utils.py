@@ -0,0 +1,119 @@
+import os, json
+from time import monotonic, sleep
+from contextlib import contextmanager
+from typing import Callable, Generator, TypeVar
+
+T = TypeVar("T")
+
+def wait_until(predicate: Callable[[], bool],
+               timeout: float = None,
+               poll_interval: float = 0.01) -> bool:
+    """
+    Wait until `predicate()` holds, return False if `timeout` seconds have passed.
+    """
+    start_time = monotonic()
+    while not predicate():
+        if timeout is not None and monotonic() - start_time >= timeout:
+            return False
+        sleep(poll_interval)
+    return True
+
+def run_poll(poll: Generator[float, None, T]) -> T:
+    """
+    Run a poll loop written as a generator, which yields the seconds to sleep between two checks
+    and returns the result of the wait, so the same loop can be run by `async_utils.run_poll`.
+    """
+    while True:
+        try:
+            delay = next(poll)
+        except StopIteration as stop:
+            return stop.value
+        sleep(delay)
+
+class FileStableProbe:
+    """
+    Probe if a file has been written, i.e. it exists, is not empty, and its size and
+    modification time have not changed for `idle_window` seconds.
+    """
+    def __init__(self, file_path: str, idle_window: float = 0.2):
+        self.file_path = file_path
+        self.idle_window = idle_window
+        self.last_stat = None
+        self.last_change_time = monotonic()
+
+    def __call__(self) -> bool:
+        now = monotonic()
+        try:
+            stat = os.stat(self.file_path)
+            current_stat = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            current_stat = None
+        if current_stat != self.last_stat:
+            self.last_stat = current_stat
+            self.last_change_time = now
+            return False
+        return current_stat is not None and current_stat[0] > 0 \
+            and now - self.last_change_time >= self.idle_window
+
+def wait_for_file_stable(file_path: str,
+                         idle_window: float = 0.2,
+                         timeout: float = None,
+                         poll_interval: float = 0.01) -> bool:
+    """
+    Wait until the file is written (see `FileStableProbe`), 
+    return False if `timeout` seconds have passed.
+    """
+    return wait_until(FileStableProbe(file_path, idle_window), timeout, poll_interval)
+
+class WaitRecorder:
+    """
+    Record the actual duration of the waits, and if they end because the condition holds
+    (ready) or because of the timeout.
+    """
+    def __init__(self):
+        self.records : list[dict] = []
+
+    def record(self, name: str, duration: float, ready: bool):
+        self.records.append({"name": name, "duration": duration, "ready": ready})
+
+    @contextmanager
+    def measure(self, name: str, timeout: float = None):
+        """
+        Record the duration of the block, the wait is ready if the block ends before `timeout`.
+        A block interrupted by an exception is recorded as well, as not ready.
+        """
+        start_time = monotonic()
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            duration = monotonic() - start_time
+            self.record(name, duration, completed and (timeout is None or duration < timeout))
+
+    def wait_until(self,
+                   name: str,
+                   predicate: Callable[[], bool],
+                   timeout: float = None,
+                   poll_interval: float = 0.01) -> bool:
+        """
+        Record `wait_until`.
+        """
+        start_time = monotonic()
+        ready = wait_until(predicate, timeout, poll_interval)
+        self.record(name, monotonic() - start_time, ready)
+        return ready
+
+    def pop_records(self) -> list[dict]:
+        """
+        Get the records and clear them.
+        """
+        records, self.records = self.records, []
+        return records
+
+    def dump(self, path: str):
+        """
+        Dump the records as json into `path`, then clear them.
+        """
+        with open(path, 'w') as file:
+            json.dump(self.pop_records(), file, indent=1)
@@ -0,0 +1,128 @@
+# This file measures the encoding cost of the fields of a large NLRI_BFN.
+# Usage:
+#   python benchmarks/bfn_codecs.py [--baseline <git-rev>] [--prefix-num N] [--repeat N]
+# An UPDATE message with `prefix-num` prefixes is built, then the NLRI_BFN is re-encoded
+# from scratch (all encoding caches dropped) and the cost per field is reported,
+# along with the cost of `get_binary_expression_inner` of each leaf class alone.
+# With `--baseline`, the same workload is also measured with the BFN codecs of `<git-rev>`,
+# so the costs per field before and after can be compared.
+
+import sys, os, argparse, json, random, subprocess, tempfile, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def get_nlri_bfn(prefix_num: int):
+    """Build an UPDATE message with `prefix_num` random prefixes and get its NLRI_BFN."""
+    from bgp_utils.message import UpdateMessage_BFN
+    rng = random.Random(0)
+    nlri = [f"{rng.randint(1,223)}.{rng.randint(0,255)}.{rng.randint(0,255)}.{rng.randint(0,255)}/{rng.randint(0,32)}"
+            for _ in range(prefix_num)]
+    message_bfn = UpdateMessage_BFN.get_bfn(aspath=[65001], next_hop="10.0.0.1", nlri=nlri)
+    content_bfn = message_bfn.children[message_bfn.message_content_key]
+    return content_bfn.children[content_bfn.nlri_key]
+
+def get_all_bfns(bfn) -> list:
+    """Get the BFNs of the tree under `bfn` (included)."""
+    bfn_list = []
+    stack = [bfn]
+    while stack:
+        node = stack.pop()
+        bfn_list.append(node)
+        stack.extend(node.children.values())
+    return bfn_list
+
+def time_full_encoding(nlri_bfn, bfn_list: list, repeat: int) -> float:
+    """Re-encode the NLRI_BFN with all caches dropped `repeat` times, return the best time."""
+    best_time = float("inf")
+    for _ in range(repeat):
+        for bfn in bfn_list:
+            bfn.binary_cache = None
+        start = time.perf_counter()
+        nlri_bfn.get_binary_expression()
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+def time_leaf_encoding(bfn_list: list, repeat: int) -> dict[str, tuple[int, float]]:
+    """Time `get_binary_expression_inner` of the leaves of each class, return `{name: (count, best_time)}`."""
+    leaves : dict[str, list] = {}
+    for bfn in bfn_list:
+        if len(bfn.children) == 0:
+            leaves.setdefault(type(bfn).__name__, []).append(bfn)
+    result = {}
+    for name, leaf_list in sorted(leaves.items()):
+        best_time = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for bfn in leaf_list:
+                bfn.get_binary_expression_inner()
+            best_time = min(best_time, time.perf_counter() - start)
+        result[name] = (len(leaf_list), best_time)
+    return result
+
+def measure(prefix_num: int, repeat: int) -> dict:
+    """Measure the encoding costs with the BFN codecs of the current interpreter."""
+    nlri_bfn = get_nlri_bfn(prefix_num)
+    bfn_list = get_all_bfns(nlri_bfn)
+    return {
+        "fields": len(bfn_list),
+        "bytes": len(nlri_bfn.get_binary_expression()),
+        "full": time_full_encoding(nlri_bfn, bfn_list, repeat),
+        "leaves": time_leaf_encoding(bfn_list, repeat),
+    }
+
+def measure_baseline(rev: str, prefix_num: int, repeat: int) -> dict:
+    """Measure the encoding costs with the BFN codecs of the git revision `rev`."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = subprocess.run(["git", "-C", REPO_ROOT, "archive", rev],
+                                 check=True, capture_output=True).stdout
+        subprocess.run(["tar", "-x", "-C", tmp_dir], input=archive, check=True)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__),
+                                 "--root", tmp_dir, "--json",
+                                 "--prefix-num", str(prefix_num), "--repeat", str(repeat)],
+                                check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+def print_report(prefix_num: int, current: dict, baseline: dict = None):
+    """Print the cost of the full encoding and of each leaf class (in us/field)."""
+    print(f"NLRI_BFN: {prefix_num} prefixes, {current['fields']} fields, {current['bytes']} bytes")
+    header = f"{'':<24}{'fields':>8}{'us/field':>10}"
+    if baseline is not None:
+        header += f"{'baseline':>10}{'ratio':>8}"
+    print(header)
+    # `(name, fields, seconds, (baseline fields, baseline seconds) or None)`
+    baseline_leaves = baseline["leaves"] if baseline is not None else {}
+    rows = [("full encoding", current["fields"], current["full"],
+             (baseline["fields"], baseline["full"]) if baseline is not None else None)]
+    rows += [(name, count, seconds, baseline_leaves.get(name))
+             for name, (count, seconds) in current["leaves"].items()]
+    for name, count, seconds, baseline_row in rows:
+        per_field = seconds / count * 1e6
+        line = f"{name:<24}{count:>8}{per_field:>10.3f}"
+        if baseline_row is not None:
+            baseline_per_field = baseline_row[1] / baseline_row[0] * 1e6
+            line += f"{baseline_per_field:>10.3f}{per_field / baseline_per_field:>8.2f}"
+        elif baseline is not None:
+            line += f"{'-':>10}{'-':>8}"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the encoding cost of the fields of a large NLRI_BFN.")
+    parser.add_argument("--prefix-num", type=int, default=10000,
+                        help="The number of prefixes in the NLRI.")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="The number of runs, the best one is reported.")
+    parser.add_argument("--baseline", default=None,
+                        help="The git revision whose BFN codecs are compared against.")
+    parser.add_argument("--root", default=REPO_ROOT, help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # The BFN classes are imported from `--root`.
+    sys.path.insert(0, args.root)
+
+    current = measure(args.prefix_num, args.repeat)
+    if args.json:
+        print(json.dumps(current))
+    else:
+        baseline = measure_baseline(args.baseline, args.prefix_num, args.repeat) if args.baseline else None
+        print_report(args.prefix_num, current, baseline)
@@ -0,0 +1,111 @@
+# This file measures the memory used by the BFN trees of the stored test batches.
+# Usage:
+#   python benchmarks/bfn_memory.py [--baseline <git-rev>] [test_batches/*.pkl]
+# With `--baseline`, the same workloads are also loaded with the BFN layout of `<git-rev>`,
+# so the bytes-per-testcase of the two layouts can be compared.
+
+import sys, os, argparse, gc, glob, json, pickle, subprocess, tempfile, tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_pickles(path: str) -> list:
+    """Load all the variables appended to the pickle file."""
+    variables = []
+    with open(path, "rb") as f:
+        while True:
+            try:
+                variables.append(pickle.load(f))
+            except EOFError:
+                break
+    return variables
+
+def count_testcases_and_bfns(variables: list) -> tuple[int, int]:
+    """Count the testcases and the (distinct) BFNs in the loaded variables."""
+    from bgp_utils.binary_field_node import BinaryFieldNode
+    visited = set()
+    def count_bfn(bfn) -> int:
+        if id(bfn) in visited:
+            return 0
+        visited.add(id(bfn))
+        return 1 + sum(count_bfn(child) for child in bfn.children.values())
+    testcase_num = 0
+    bfn_num = 0
+    for variable in variables:
+        testcases = variable if isinstance(variable, list) else [variable]
+        for testcase in testcases:
+            testcase_num += 1
+            for message in testcase:
+                bfn = getattr(message, "message_bfn", None)
+                if isinstance(bfn, BinaryFieldNode):
+                    bfn_num += count_bfn(bfn)
+    return testcase_num, bfn_num
+
+def measure_workload(path: str) -> dict:
+    """Measure the memory allocated by loading the pickle file."""
+    gc.collect()
+    tracemalloc.start()
+    variables = load_pickles(path)
+    gc.collect()
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    testcase_num, bfn_num = count_testcases_and_bfns(variables)
+    return {
+        "testcases": testcase_num,
+        "bfns": bfn_num,
+        "bytes": allocated,
+        "peak_bytes": peak,
+    }
+
+def measure_all(paths: list[str]) -> dict[str, dict]:
+    """Measure all workloads with the BFN layout of the current interpreter."""
+    # Import the BFN modules in advance, so they are not counted in the first workload.
+    import bgp_utils.message, bgp_utils.path_attribute, test_agent.test_suite
+    return {os.path.basename(path): measure_workload(path) for path in paths}
+
+def measure_baseline(rev: str, paths: list[str]) -> dict[str, dict]:
+    """Measure all workloads with the BFN layout of the git revision `rev`."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = subprocess.run(["git", "-C", REPO_ROOT, "archive", rev],
+                                 check=True, capture_output=True).stdout
+        subprocess.run(["tar", "-x", "-C", tmp_dir], input=archive, check=True)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__),
+                                 "--root", tmp_dir, "--json"] + paths,
+                                check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+def print_report(current: dict[str, dict], baseline: dict[str, dict] = None):
+    """Print the bytes-per-testcase of each workload."""
+    header = f"{'workload':<30}{'testcases':>10}{'BFNs':>10}{'bytes/testcase':>16}{'bytes/BFN':>11}"
+    if baseline is not None:
+        header += f"{'baseline':>16}{'ratio':>8}"
+    print(header)
+    for name, result in current.items():
+        per_testcase = result["bytes"] / max(result["testcases"], 1)
+        per_bfn = result["bytes"] / max(result["bfns"], 1)
+        line = f"{name:<30}{result['testcases']:>10}{result['bfns']:>10}{per_testcase:>16.0f}{per_bfn:>11.0f}"
+        if baseline is not None:
+            baseline_per_testcase = baseline[name]["bytes"] / max(baseline[name]["testcases"], 1)
+            line += f"{baseline_per_testcase:>16.0f}{per_testcase / baseline_per_testcase:>8.2f}"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory used by the BFN trees of the test batches.")
+    parser.add_argument("pickles", nargs="*",
+                        help="The pickle files to load (default: test_batches/*.pkl).")
+    parser.add_argument("--baseline", default=None,
+                        help="The git revision whose BFN layout is compared against.")
+    parser.add_argument("--root", default=REPO_ROOT, help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(path) for path in args.pickles] or \
+            sorted(glob.glob(os.path.join(REPO_ROOT, "test_batches", "*.pkl")))
+    # The pickles are loaded with the BFN classes under `--root`.
+    sys.path.insert(0, args.root)
+
+    current = measure_all(paths)
+    if args.json:
+        print(json.dumps(current))
+    else:
+        baseline = measure_baseline(args.baseline, paths) if args.baseline else None
+        print_report(current, baseline)
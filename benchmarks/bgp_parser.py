@@ -0,0 +1,65 @@
+# This file measures the throughput of the wire-format parser (`bgp_utils.message.msg_parser`).
+# Usage:
+#   python benchmarks/bgp_parser.py [--repeat N] [test_batches/*.pkl]
+# The messages of the stored test batches are encoded and parsed back into BFN trees, lazily and eagerly.
+# The messages are parsed one by one, since the length fields of the mutated messages
+# cannot be relied on to frame a concatenated stream.
+
+import sys, os, argparse, glob, time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bfn_memory import load_pickles
+from bgp_utils.message import parse_message_bfn
+
+def load_messages(paths: list[str]) -> list[bytes]:
+    """Load the test batches and get the binary expressions of their messages."""
+    binary_list = []
+    for path in paths:
+        for variable in load_pickles(path):
+            testcases = variable if isinstance(variable, list) else [variable]
+            for testcase in testcases:
+                for message in testcase:
+                    binary_list.append(message.get_binary_expression())
+    return binary_list
+
+def materialize_all(message_bfn_list: list):
+    """Access every BFN of the trees, so the lazy BFN lists are decoded."""
+    stack = list(message_bfn_list)
+    while stack:
+        stack.extend(stack.pop().children.values())
+
+def run_mode(messages: list[bytes], lazy: bool, materialize: bool, repeat: int) -> float:
+    """Parse the messages `repeat` times, return the best time."""
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        message_bfn_list = [parse_message_bfn(message, lazy=lazy) for message in messages]
+        if materialize:
+            materialize_all(message_bfn_list)
+        best_time = min(best_time, time.perf_counter() - start)
+    if [bfn.get_binary_expression() for bfn in message_bfn_list] != messages:
+        raise ValueError("The parsed messages cannot reproduce the input!")
+    return best_time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the throughput of the BGP wire-format parser.")
+    parser.add_argument("pickles", nargs="*",
+                        help="The pickle files providing the messages (default: test_batches/*.pkl).")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="The number of runs of each mode, the best one is reported.")
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(path) for path in args.pickles] or \
+            sorted(glob.glob(os.path.join(REPO_ROOT, "test_batches", "*.pkl")))
+    messages = load_messages(paths)
+    byte_num = sum(len(message) for message in messages)
+    print(f"{len(messages)} messages, {byte_num} bytes")
+
+    print(f"{'mode':<20}{'seconds':>10}{'msgs/sec':>12}{'MB/sec':>10}")
+    for mode, lazy, materialize in [("lazy", True, False),
+                                    ("lazy+materialize", True, True),
+                                    ("eager", False, False)]:
+        seconds = run_mode(messages, lazy, materialize, args.repeat)
+        print(f"{mode:<20}{seconds:>10.3f}{len(messages) / seconds:>12.0f}{byte_num / seconds / 1e6:>10.2f}")
@@ -0,0 +1,120 @@
+# This file benchmarks the routing software under a table-scale UPDATE flood.
+# Usage (from the root of the repo, with the virtual network set up by `vnet_config.py`):
+#   python benchmarks/update_flood.py [--routers frr bird] [--prefix-num N] [--per-update N] [--rate R]
+# For each routing software, the tester peer opens a session and floods it with UPDATEs
+# (see `test_agent.update_flood`), then the ingest throughput and the convergence time are measured
+# from the receipt times of the routes propagated to the ExaBGP client.
+
+import sys, os, argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# The configuration files are loaded relative to the root of the repo.
+os.chdir(REPO_ROOT)
+
+from bgp_utils.message import MessageType, OpenMessage_BFN, KeepAliveMessage_BFN
+from routing_software_interface.utils import get_router_interface
+from test_agent.test_agent import TestAgent
+from test_agent.update_flood import FloodConfiguration, FloodResult, UpdateFlood
+from test_configuration import *
+
+# The upper bound (in seconds) of establishing the sessions.
+SESSION_TIMEOUT = 10
+# The flood is regarded as converged if the ExaBGP client logs nothing within this duration (in seconds).
+CONVERGENCE_IDLE_WINDOW = 3
+
+ROUTER_TYPES = {
+    "frr": RouterSoftwareType.FRR,
+    "bird": RouterSoftwareType.BIRD,
+}
+
+def get_router_configuration(router_type: RouterSoftwareType) -> RouterConfiguration:
+    """Get the configuration peering with the tester and the ExaBGP client, see `test_batched.py`."""
+    return RouterConfiguration(
+        asn=router_software_asn,
+        router_id=router_software_ip,
+        neighbors=[
+            Neighbor(
+                peer_ip=tester_client_ip,
+                peer_asn=tester_client_asn,
+                local_source=router_software["veth"]
+            ),
+            Neighbor(
+                peer_ip=exabgp_client_ip,
+                peer_asn=exabgp_client_asn,
+                local_source=router_software["veth"]
+            ),
+        ],
+        router_type=router_type
+    )
+
+def run_flood(router_type: RouterSoftwareType,
+              flood_config: FloodConfiguration,
+              timeout: float) -> FloodResult:
+    """
+    Flood the routing software and wait until the propagated routes are logged by the ExaBGP client
+    (or `timeout` seconds have passed).
+    """
+    router_interface = get_router_interface(get_router_configuration(router_type))
+    test_agent = TestAgent(tcp_client_config=tcp_client_config,
+                           exabgp_client_config=exabgp_client_config)
+    test_agent.start_session(router_interface)
+    try:
+        ###### Establish the session of the tester ######
+
+        tcp_client = test_agent.tcp_client
+        tcp_client.send(OpenMessage_BFN.get_bfn(BGP_CONFIG).get_binary_expression())
+        tcp_client.send(KeepAliveMessage_BFN.get_bfn().get_binary_expression())
+        if tcp_client.wait_for_message(MessageType.KEEPALIVE, timeout=SESSION_TIMEOUT) is None:
+            raise ValueError(f"The session is not established ({tcp_client.describe_close()})!")
+        # Wait for the session of the ExaBGP client.
+        test_agent.exabgp_client.wait_for_log(CONVERGENCE_IDLE_WINDOW, timeout=SESSION_TIMEOUT)
+
+        ###### Flood ######
+
+        flood = UpdateFlood(flood_config, aspath=[tester_client_asn], next_hop=tester_client_ip)
+        result = flood.send(tcp_client)
+        if not test_agent.exabgp_client.wait_for_log(CONVERGENCE_IDLE_WINDOW, timeout=timeout):
+            print(f"Warning: The routes are still propagated after {timeout} seconds.")
+        flood.collect_receipts(result, exabgp_client_config.log_path)
+        return result
+    finally:
+        test_agent.end_session(router_interface)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the routing software under an UPDATE flood.")
+    parser.add_argument("--routers", nargs="+", choices=list(ROUTER_TYPES), default=list(ROUTER_TYPES),
+                        help="The routing software to benchmark.")
+    parser.add_argument("--prefix-num", type=int, default=1000000,
+                        help="The number of prefixes announced.")
+    parser.add_argument("--per-update", type=int, default=1,
+                        help="The number of prefixes per UPDATE message.")
+    parser.add_argument("--first-prefix", default="20.0.0.0/24",
+                        help="The first prefix, the following ones are the consecutive prefixes of the same length.")
+    parser.add_argument("--origins", type=int, default=1,
+                        help="The number of origin AS numbers the UPDATEs cycle through.")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="The target rate in UPDATEs per second (default: as fast as possible).")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="The number of UPDATEs encoded and written at once.")
+    parser.add_argument("--timeout", type=float, default=600,
+                        help="The upper bound (in seconds) of the convergence.")
+    args = parser.parse_args()
+
+    flood_config = FloodConfiguration(prefix_num=args.prefix_num,
+                                      prefixes_per_update=args.per_update,
+                                      first_prefix=args.first_prefix,
+                                      origin_num=args.origins,
+                                      rate=args.rate,
+                                      batch_size=args.batch_size)
+    results = {name: run_flood(ROUTER_TYPES[name], flood_config, args.timeout) for name in args.routers}
+
+    print(f"{'router':<8}{'updates':>10}{'sent(s)':>10}{'sent/sec':>12}"
+          f"{'received':>10}{'converge(s)':>13}{'ingest/sec':>12}")
+    for name, result in results.items():
+        convergence_time = result.get_convergence_time()
+        ingest_rate = result.get_ingest_rate()
+        print(f"{name:<8}{result.update_num:>10}{result.send_end - result.send_start:>10.2f}"
+              f"{result.get_send_rate():>12.0f}{result.received_prefix_num:>10}"
+              f"{convergence_time if convergence_time is not None else float('nan'):>13.2f}"
+              f"{ingest_rate if ingest_rate is not None else float('nan'):>12.0f}")
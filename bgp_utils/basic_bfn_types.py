@@ -1,14 +1,24 @@
 from .binary_field_node import BinaryFieldNode
 from basic_utils.binary_utils import num2bytes, bytes2num
-from network_utils.utils import is_valid_ipv4, is_valid_ipv4_prefix, get_ip_segments, get_ipv4_prefix_parts
+from network_utils.utils import is_valid_ipv4, is_valid_ipv4_prefix, get_ipv4_prefix_parts, ipv4_to_int, int_to_ipv4
+from typing import Callable, Mapping
 import numpy as np
 import random
 from abc import abstractmethod
+import struct
+
+# The codec of a packed IPv4 address.
+IPV4_STRUCT = struct.Struct("!I")
+# The netmask of each IPv4 prefix length, indexed by the prefix length.
+IPV4_PREFIX_MASKS = tuple((0xffffffff << (32 - prefix_len)) & 0xffffffff for prefix_len in range(33))
 
 class Number_BFN(BinaryFieldNode):
     """
     The field representing a number.
     """
+
+    __slots__ = ("num_val", "num_len")
+
     def __init__(self,
                  num_val: int,
                  num_len: int = 1):
@@ -17,10 +27,6 @@ class Number_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(Number_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.num_val = num_val
@@ -77,6 +83,9 @@ class Length_BFN(Number_BFN):
     """
     The length field.
     """
+
+    __slots__ = ("include_myself",)
+
     def __init__(self,
                  length_val : int,
                  length_byte_len : int = 1,
@@ -87,10 +96,6 @@ class Length_BFN(Number_BFN):
 
         super().__init__(num_val=length_val, num_len=length_byte_len)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(Length_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # `num_val` and `num_len` has been defined in `Number_BFN`.
@@ -108,13 +113,19 @@ class Length_BFN(Number_BFN):
 
     ########## Update according to dependencies ##########
     
+    def get_length_dependencies(self) -> list[BinaryFieldNode]:
+        """
+        Get the dependencies whose binary lengths are summed up in the length value.
+        """
+        return list(self.dependencies.values())
+
     def update_on_dependencies_inner(self):
         """
         Update the current BFN according to its dependencies.
         Calculate the sum of length of the dependency fields.
         """
         len_sum = self.num_len if self.include_myself else 0
-        for dependency in self.dependencies.values():
+        for dependency in self.get_length_dependencies():
             len_sum = len_sum + dependency.get_binary_length()
         self.num_val = len_sum
 
@@ -147,6 +158,9 @@ class ASN_BFN(Number_BFN):
     """
     The AS number field.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  asn: int,
                  asn_byte_len=2):
@@ -156,10 +170,6 @@ class ASN_BFN(Number_BFN):
 
         super().__init__(num_val=asn, num_len=asn_byte_len)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(ASN_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -231,7 +241,12 @@ class ASN_BFN(Number_BFN):
 class IPv4Address_BFN(BinaryFieldNode):
     """
     The IPv4 address field.
+    The address is stored as a packed 32-bit integer `ip_val`,
+    `ip_addr` converts it from/to the dotted-decimal string.
     """
+
+    __slots__ = ("ip_val",)
+
     def __init__(self,
                  ip_addr: str):
         """Initialize the IPv4 address BFN."""
@@ -243,27 +258,30 @@ class IPv4Address_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(IPv4Address_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
-        self.ip_addr = ip_addr
+        self.ip_val = ipv4_to_int(ip_addr)
 
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
         return "IPv4Address_BFN"
+
+    @property
+    def ip_addr(self) -> str:
+        """The IPv4 address in dotted-decimal string."""
+        return int_to_ipv4(self.ip_val)
+
+    @ip_addr.setter
+    def ip_addr(self, ip_addr: str):
+        # Only used when unpickling, the set-function is `set_ip_addr`.
+        self.ip_val = ipv4_to_int(ip_addr)
     
     ########## Get binary info ##########
 
     def get_binary_expression_inner(self):
         """Get binary expression."""
-        segments = get_ip_segments(self.ip_addr)
-        return b''.join([
-            num2bytes(segment,1) for segment in segments
-        ])
+        return IPV4_STRUCT.pack(self.ip_val)
 
     ########## Update according to dependencies ##########
     
@@ -295,7 +313,7 @@ class IPv4Address_BFN(BinaryFieldNode):
         """
         if not is_valid_ipv4(ip_addr):
             raise ValueError(f"Please enter a valid IPv4 address (Your input: {ip_addr})")
-        self.ip_addr = ip_addr
+        self.ip_val = ipv4_to_int(ip_addr)
     
     ########## Method for selecting mutation ##########
 
@@ -307,7 +325,12 @@ class IPv4Address_BFN(BinaryFieldNode):
 class IPv4PrefixValue_BFN(BinaryFieldNode):
     """
     The IPv4 prefix value field.
+    The address is stored as a packed 32-bit integer `ip_val`,
+    `ip_addr` converts it from/to the dotted-decimal string.
     """
+
+    __slots__ = ("ip_val", "prefix_len", "segment_num", "padding_bits")
+
     def __init__(self,
                  ip_addr: str):
         """Initialize the IPv4 prefix BFN."""
@@ -319,14 +342,10 @@ class IPv4PrefixValue_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(IPv4PrefixValue_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         ip_part, prefix_length = get_ipv4_prefix_parts(ip_addr)
-        self.ip_addr = ip_part
+        self.ip_val = ipv4_to_int(ip_part)
         self.prefix_len = prefix_length
         self.segment_num = (self.prefix_len+7) // 8
         self.padding_bits = [0]*(self.segment_num*8-self.prefix_len)
@@ -336,33 +355,34 @@ class IPv4PrefixValue_BFN(BinaryFieldNode):
         """Get the name of the BFN."""
         return "IPv4PrefixValue_BFN"
 
+    @property
+    def ip_addr(self) -> str:
+        """The IPv4 address in dotted-decimal string."""
+        return int_to_ipv4(self.ip_val)
+
+    @ip_addr.setter
+    def ip_addr(self, ip_addr: str):
+        # Only used when unpickling, the set-function is `set_ip_addr`.
+        self.ip_val = ipv4_to_int(ip_addr)
+
     ########## Get binary info ##########
 
     def get_binary_expression_inner(self):
         """
         Get binary expression.
-        Only preserve the 
-        """
-        segments = get_ip_segments(self.ip_addr)
-        segment_res = 8 - len(self.padding_bits)
-        segment_list = segments[:self.segment_num].copy()
-        if len(segment_list)>=1:
-            # Compute the valid part of the IP address.
-            base = 2**8
-            comp = 0
-            for i in range(0,segment_res):
-                base = base>>1
-                comp = comp | base
-            segment_list[-1] = segment_list[-1]&comp
-            # Compute the padding part of the IP address.
-            comp = 0
-            for bit in self.padding_bits:
-                comp = comp<<1
-                comp = comp | bit
-            segment_list[-1] = segment_list[-1]|comp
-        return b''.join([
-            num2bytes(segment,1) for segment in segment_list
-        ])
+        Only preserve the first `segment_num` octets of the address, 
+        the bits after the prefix length in the last octet are replaced by the padding bits.
+        """
+        segment_num = self.segment_num
+        if segment_num == 0:
+            return b''
+        # The padding bits end at the last preserved octet.
+        padding = 0
+        for bit in self.padding_bits:
+            padding = (padding << 1) | bit
+        val = (self.ip_val & IPV4_PREFIX_MASKS[segment_num*8 - len(self.padding_bits)]) \
+              | (padding << (32 - segment_num*8))
+        return IPV4_STRUCT.pack(val)[:segment_num]
 
     ########## Update according to dependencies ##########
     
@@ -406,7 +426,7 @@ class IPv4PrefixValue_BFN(BinaryFieldNode):
         """
         if not is_valid_ipv4(ip_addr):
             raise ValueError(f"Please enter a valid IPv4 address (Your input: {ip_addr})")
-        self.ip_addr = ip_addr
+        self.ip_val = ipv4_to_int(ip_addr)
     
     @BinaryFieldNode.set_function_decorator
     def set_padding_bits(self, padding_bits: list[int]):
@@ -443,6 +463,9 @@ class IPv4PrefixLength_BFN(Length_BFN):
     """
     The IPv4 prefix length field.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  length_val: int):
         """
@@ -455,16 +478,18 @@ class IPv4PrefixLength_BFN(Length_BFN):
                          length_byte_len=1,
                          include_myself=False)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(IPv4PrefixLength_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
         return "IPv4PrefixLength_BFN"
 
     ######### Update according to dependencies ##########
+
+    def get_length_dependencies(self) -> list[BinaryFieldNode]:
+        """
+        The value is the length of the prefix in bits, not a sum of binary lengths.
+        """
+        return []
     
     def update_on_dependencies_inner(self):
         """
@@ -478,6 +503,9 @@ class IPv4Prefix_BFN(BinaryFieldNode):
     """
     The full IPv4 prefix field.
     """
+
+    __slots__ = ("prefix_len_key", "prefix_val_key")
+
     def __init__(self,
                  prefix_val_bfn: IPv4PrefixValue_BFN,
                  prefix_len_bfn: IPv4PrefixLength_BFN):
@@ -487,10 +515,6 @@ class IPv4Prefix_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(IPv4Prefix_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -595,6 +619,8 @@ class BinaryFieldList_BFN(BinaryFieldNode):
     All BFNs must have the same type.
     """
 
+    __slots__ = ("BFN_type_check", "list_element_name", "bfn_list", "lazy_source")
+
     def __init__(self,
                  bfn_list : list[BinaryFieldNode],
                  list_element_name : str,
@@ -605,10 +631,6 @@ class BinaryFieldList_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(BinaryFieldList_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.BFN_type_check = BFN_type_check
@@ -621,6 +643,10 @@ class BinaryFieldList_BFN(BinaryFieldNode):
         self.list_element_name : str = list_element_name
         self.bfn_list : list[BinaryFieldNode] = bfn_list
 
+        # The undecoded binary expression of the list elements and the function decoding it,
+        # see `set_lazy_source`. `None` means all elements are in `bfn_list`.
+        self.lazy_source : tuple[memoryview, Callable[[memoryview], list[BinaryFieldNode]]] = None
+
         ###### Deal with relations with and between children ######
 
         # Initialize the children. 
@@ -638,12 +664,76 @@ class BinaryFieldList_BFN(BinaryFieldNode):
 
     def get_list_len(self) -> int:
         """Get the number of elements in the BFN list."""
+        self.materialize()
         return len(self.bfn_list)
+
+    ########## Lazy decoding ##########
+
+    def set_lazy_source(self,
+                        source: memoryview,
+                        decode_func: Callable[[memoryview], list[BinaryFieldNode]]):
+        """
+        Let the elements of the (empty) list be decoded from `source` on the first access.
+        `decode_func(source)` must return the BFNs whose binary expressions concatenate to `source`.
+        Until then, the binary expression of the list is `source` itself.
+        """
+        if self.bfn_list:
+            raise ValueError("The lazy source can only be set on an empty BFN list!")
+        self.lazy_source = (source, decode_func)
+        self.invalidate_binary_cache()
+
+    def materialize(self):
+        """Decode the elements from the lazy source (if any) and append them as children."""
+        if self.lazy_source is None:
+            return
+        source, decode_func = self.lazy_source
+        # Reset first, since appending children accesses `children` again.
+        self.lazy_source = None
+        with self.transaction():
+            for bfn in decode_func(source):
+                self.bfn_list.append(bfn)
+                self.append_child(bfn)
+            # Update the detach state of the current BFN.
+            self.detach_according_to_children()
+
+    @BinaryFieldNode.children.getter
+    def children(self) -> Mapping[str, BinaryFieldNode]:
+        """The children of the BFN. The lazy source is decoded on the first access."""
+        if self.lazy_source is not None:
+            self.materialize()
+        return BinaryFieldNode.children.fget(self)
+
+    def get_shallow_copy(self) -> "BinaryFieldList_BFN":
+        """Get a copy of the current BFN sharing its children, with its own `bfn_list`."""
+        bfn = super().get_shallow_copy()
+        bfn.bfn_list = list(self.bfn_list)
+        return bfn
+
+    def unshare_children(self) -> dict[int, BinaryFieldNode]:
+        """Replace the shared children with their copies, in `bfn_list` as well."""
+        copies = super().unshare_children()
+        self.bfn_list = [copies.get(id(bfn), bfn) for bfn in self.bfn_list]
+        return copies
+
+    def __getstate__(self):
+        """Get the state of the BFN. The lazy source is stored as bytes."""
+        state = super().__getstate__()
+        if self.lazy_source is not None:
+            source, decode_func = self.lazy_source
+            state["lazy_source"] = (bytes(source), decode_func)
+        return state
+
+    def __setstate__(self, state: dict):
+        """Restore the BFN. BFN lists pickled before the lazy source existed are decoded."""
+        self.lazy_source = None
+        super().__setstate__(state)
     
     ########## Get binary info ##########
 
     def get_binary_expression_inner(self):
         """Get binary expression."""
+        if self.lazy_source is not None:
+            return bytes(self.lazy_source[0])
         return b''.join([
             child.get_binary_expression() for child in self.children.values()
         ])
@@ -672,6 +762,7 @@ class BinaryFieldList_BFN(BinaryFieldNode):
         if self.BFN_type_check and self.list_element_name != bfn.get_bfn_name():
             # The type of BFN do not match
             raise ValueError(f"The type of input BFN ({bfn.get_bfn_name()}) cannot match the type of BFNs in the BFN list ({self.list_element_name}).")
+        self.materialize()
         self.bfn_list.append(bfn)
         self.append_child(bfn)
     
@@ -683,10 +774,12 @@ class BinaryFieldList_BFN(BinaryFieldNode):
             if self.BFN_type_check and bfn.get_bfn_name() != self.list_element_name:
                 raise ValueError(f"The input list of BFNs must contain name consistent with `list_element_name`!")
         self.bfn_list : list[BinaryFieldNode] = bfn_list
+        # The undecoded elements are dropped together with the original list.
+        self.lazy_source = None
         # Clear the original children dictionary
         for child in self.children.values():
             child.parent = None
-        self.children.clear()
+        self.clear_children()
         # Initialize the children.
         for bfn in self.bfn_list:
             self.append_child(bfn)
@@ -702,6 +795,9 @@ class Reserved_BFN(BinaryFieldNode):
     """
     Reserved field BFN.
     """
+
+    __slots__ = ("reserved_val",)
+
     def __init__(self,
                  reserved_val: bytes = None):
         """Initialize the reserved BFN"""
@@ -715,10 +811,6 @@ class Reserved_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(Reserved_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.reserved_val : bytes = reserved_val
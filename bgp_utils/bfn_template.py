@@ -0,0 +1,304 @@
+from enum import IntEnum
+from typing import Iterable, Union
+import numpy as np
+from .binary_field_node import BinaryFieldNode
+from .basic_bfn_types import Number_BFN, Length_BFN, ASN_BFN
+
+class TemplateFieldKind(IntEnum):
+    """
+    Kind of a field in a `BFNTemplate`.
+    """
+    # A BFN whose binary expression is the concatenation of its children.
+    COMPOSITE = 0
+    # A leaf BFN that can only be mutated as raw bytes.
+    BYTES = 1
+    # A leaf `Number_BFN` (not a length or an ASN).
+    NUMBER = 2
+    # A leaf `Length_BFN`.
+    LENGTH = 3
+    # A leaf `ASN_BFN`.
+    ASN = 4
+
+# The kinds holding a big-endian number that can be mutated by `mutate_numbers`.
+NUMBER_KINDS = (TemplateFieldKind.NUMBER, TemplateFieldKind.LENGTH, TemplateFieldKind.ASN)
+
+# The row of the field table.
+# `offset` and `width` locate the whole binary expression (prefix and suffix included).
+TEMPLATE_FIELD_DTYPE = np.dtype([
+    ("offset", np.int64),
+    ("width", np.int64),
+    ("prefix_len", np.int64),
+    ("suffix_len", np.int64),
+    ("kind", np.int8),
+    ("parent", np.int64),
+    ("depth", np.int16),
+])
+
+class MutantBatch:
+    """
+    A batch of messages in wire format, stored in one contiguous buffer.
+    The i-th message is `data[offsets[i]:offsets[i+1]]`.
+    """
+    def __init__(self,
+                 data: np.ndarray,
+                 offsets: np.ndarray):
+        """Initialize the batch."""
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.data[self.offsets[i]:self.offsets[i+1]].tobytes()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+class BFNTemplate:
+    """
+    A BFN tree compiled into a flat template:
+    the binary expression of the tree as a byte buffer, plus a table of its fields.
+    -----------------------------
+    Mutants are generated on the byte buffer directly, without building BFN trees.
+    Applying a mutation on field `i` of the template gives the same bytes as applying
+    the corresponding set-function on the BFN `i` of a copy of the tree:
+    the Length_BFNs depending on the mutated BFN are fixed up, nothing else is propagated.
+    The fields are numbered in depth-first order, so the root is field 0.
+    """
+    def __init__(self,
+                 bfn: BinaryFieldNode):
+        """Compile the BFN tree rooted at `bfn`."""
+        self.buffer = np.frombuffer(bfn.get_binary_expression(), dtype=np.uint8)
+        # The name of the BFN of each field.
+        self.names : list[str] = []
+        records = []
+        bfns : list[BinaryFieldNode] = []
+        # Depth-first traversal, the children are pushed in reverse order.
+        stack = [(bfn, 0, -1, 0)]
+        while stack:
+            node, offset, parent, depth = stack.pop()
+            index = len(records)
+            width = node.get_binary_length()
+            prefix_len = len(node.prefix)
+            suffix_len = len(node.suffix)
+            children = list(node.children.values())
+            kind = self.get_field_kind(node)
+            if node.binary_content is None and children and \
+               sum(child.get_binary_length() for child in children) == width - prefix_len - suffix_len:
+                kind = TemplateFieldKind.COMPOSITE
+                child_offset = offset + prefix_len
+                child_items = []
+                for child in children:
+                    child_items.append((child, child_offset, index, depth+1))
+                    child_offset = child_offset + child.get_binary_length()
+                stack.extend(reversed(child_items))
+            records.append((offset, width, prefix_len, suffix_len, kind, parent, depth))
+            bfns.append(node)
+            self.names.append(node.get_bfn_name())
+        self.fields = np.array(records, dtype=TEMPLATE_FIELD_DTYPE)
+
+        ###### Length dependency edges ######
+
+        # Row `[l, d]` means the value of Length_BFN `l` sums up the width of field `d`.
+        # `length_base[l]` is the part of the value of `l` not given by any field.
+        index_of = {id(node): index for index, node in enumerate(bfns)}
+        edges = []
+        self.length_base = np.zeros(len(bfns), dtype=np.int64)
+        for index, node in enumerate(bfns):
+            if not self.is_updatable_length(node):
+                continue
+            dependencies = node.get_length_dependencies()
+            if any(id(dependency) not in index_of for dependency in dependencies):
+                continue
+            self.length_base[index] = node.num_len if node.include_myself else 0
+            edges.extend((index, index_of[id(dependency)]) for dependency in dependencies)
+        self.length_edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        # Sort the edges by the dependency, to find the edges of a mutated field by binary search.
+        self.length_edges = self.length_edges[np.argsort(self.length_edges[:, 1], kind="stable")]
+        # The value of each length field before any mutation.
+        length_widths = np.zeros(len(bfns), dtype=np.int64)
+        np.add.at(length_widths, self.length_edges[:, 0], self.fields["width"][self.length_edges[:, 1]])
+        self.length_value = self.length_base + length_widths
+
+    @staticmethod
+    def get_field_kind(bfn: BinaryFieldNode) -> TemplateFieldKind:
+        """Get the kind of a leaf BFN."""
+        if not isinstance(bfn, Number_BFN) or bfn.binary_content is not None or bfn.num_len > 8:
+            return TemplateFieldKind.BYTES
+        if isinstance(bfn, Length_BFN):
+            return TemplateFieldKind.LENGTH
+        if isinstance(bfn, ASN_BFN):
+            return TemplateFieldKind.ASN
+        return TemplateFieldKind.NUMBER
+
+    @staticmethod
+    def is_updatable_length(bfn: BinaryFieldNode) -> bool:
+        """
+        Return if `bfn` is a Length_BFN recomputed when its dependencies change.
+        Detached lengths are never recomputed,
+        and lengths with prefix or suffix are not supported.
+        """
+        return isinstance(bfn, Length_BFN) and not bfn.detached and bfn.binary_content is None \
+               and not bfn.prefix and not bfn.suffix and bfn.num_len <= 8
+
+    def __len__(self) -> int:
+        """Get the number of fields."""
+        return len(self.fields)
+
+    def get_field_indices(self,
+                          kinds: Iterable[TemplateFieldKind]) -> np.ndarray:
+        """Get the indices of the fields of the given kinds."""
+        return np.flatnonzero(np.isin(self.fields["kind"], [int(kind) for kind in kinds]))
+
+    ########## Vectorized mutation ##########
+
+    def get_region(self,
+                   field_idx: np.ndarray,
+                   part: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the start and the width of the region replaced when mutating `part` of the fields.
+        `part` is "content" (as `set_bval`), "prefix" (as `set_prefix`) or "suffix" (as `set_suffix`).
+        """
+        fields = self.fields[field_idx]
+        if part == "content":
+            return fields["offset"] + fields["prefix_len"], \
+                   fields["width"] - fields["prefix_len"] - fields["suffix_len"]
+        elif part == "prefix":
+            return fields["offset"], fields["prefix_len"]
+        elif part == "suffix":
+            return fields["offset"] + fields["width"] - fields["suffix_len"], fields["suffix_len"]
+        raise ValueError(f"Unknown part of the field: {part}")
+
+    def mutate_numbers(self,
+                       field_idx: Union[list[int], np.ndarray],
+                       values: Union[list[int], np.ndarray]) -> MutantBatch:
+        """
+        Generate one mutant per pair of `field_idx` and `values`,
+        as calling `set_num` of the field with the value.
+        The values wrap around as `num2bytes` does.
+        All fields must be of the kinds in `NUMBER_KINDS`.
+        """
+        field_idx = np.asarray(field_idx, dtype=np.int64)
+        values = np.asarray(values, dtype=np.uint64)
+        if not np.isin(self.fields["kind"][field_idx], [int(kind) for kind in NUMBER_KINDS]).all():
+            raise ValueError("Only the number fields can be mutated by `mutate_numbers`!")
+        _, widths = self.get_region(field_idx, "content")
+        return self.replace_regions(field_idx, "content",
+                                    self.encode_numbers(values, widths), widths)
+
+    def mutate_bytes(self,
+                     field_idx: Union[list[int], np.ndarray],
+                     values: list[bytes],
+                     part: str = "content") -> MutantBatch:
+        """
+        Generate one mutant per pair of `field_idx` and `values`,
+        as calling `set_bval` (part="content"), `set_prefix` (part="prefix")
+        or `set_suffix` (part="suffix") of the field with the value.
+        """
+        field_idx = np.asarray(field_idx, dtype=np.int64)
+        lengths = np.fromiter((len(value) for value in values), dtype=np.int64, count=len(values))
+        data = np.frombuffer(b''.join(values), dtype=np.uint8)
+        return self.replace_regions(field_idx, part, data, lengths)
+
+    @staticmethod
+    def encode_numbers(values: np.ndarray, widths: np.ndarray) -> np.ndarray:
+        """
+        Encode each value in big-endian with the corresponding width (at most 8 bytes),
+        and concatenate the results. The values wrap around if they do not fit.
+        """
+        max_width = int(widths.max()) if len(widths) else 0
+        # The byte `j` of a value encoded in `max_width` bytes.
+        shifts = np.arange(max_width - 1, -1, -1, dtype=np.uint64) * np.uint64(8)
+        encoded = ((values[:, None] >> shifts[None, :]) & np.uint64(0xFF)).astype(np.uint8)
+        # Keep the last `width` bytes of each row.
+        keep = np.arange(max_width)[None, :] >= (max_width - widths)[:, None]
+        return encoded[keep]
+
+    def replace_regions(self,
+                        field_idx: np.ndarray,
+                        part: str,
+                        data: np.ndarray,
+                        lengths: np.ndarray) -> MutantBatch:
+        """
+        Generate one mutant per field, replacing `part` of the field
+        with the next `lengths[i]` bytes of `data`, and fix up the depending lengths.
+        """
+        mutant_num = len(field_idx)
+        template_len = len(self.buffer)
+        starts, old_widths = self.get_region(field_idx, part)
+        deltas = lengths - old_widths
+        mutant_lens = template_len + deltas
+        offsets = np.zeros(mutant_num + 1, dtype=np.int64)
+        np.cumsum(mutant_lens, out=offsets[1:])
+
+        ###### Copy the bytes ######
+
+        if not deltas.any():
+            # Fixed width: copy the template and scatter the new bytes.
+            out = np.tile(self.buffer, mutant_num)
+            positions = np.repeat(offsets[:-1] + starts, lengths) + \
+                        self.get_ranks_in_groups(lengths)
+            out[positions] = data
+        else:
+            # Variable width: gather the head of the template, the new bytes, and the tail.
+            source = np.concatenate([self.buffer, data])
+            data_starts = np.zeros(mutant_num, dtype=np.int64)
+            np.cumsum(lengths[:-1], out=data_starts[1:])
+            segment_starts = np.stack([np.zeros(mutant_num, dtype=np.int64),
+                                       template_len + data_starts,
+                                       starts + old_widths], axis=1).ravel()
+            segment_lens = np.stack([starts, lengths,
+                                     template_len - starts - old_widths], axis=1).ravel()
+            out = source[np.repeat(segment_starts, segment_lens) + self.get_ranks_in_groups(segment_lens)]
+
+        ###### Fix up the lengths ######
+
+        # Find the length edges whose dependency is the mutated field.
+        edge_begin = np.searchsorted(self.length_edges[:, 1], field_idx, side="left")
+        edge_end = np.searchsorted(self.length_edges[:, 1], field_idx, side="right")
+        edge_counts = edge_end - edge_begin
+        if edge_counts.any():
+            mutant_of_edge = np.repeat(np.arange(mutant_num), edge_counts)
+            edges = np.repeat(edge_begin, edge_counts) + self.get_ranks_in_groups(edge_counts)
+            length_idx = self.length_edges[edges, 0]
+            length_fields = self.fields[length_idx]
+            values = (self.length_value[length_idx] + deltas[mutant_of_edge]).astype(np.uint64)
+            widths = length_fields["width"]
+            # The length fields after the mutated field are shifted by the change of the width.
+            positions = offsets[mutant_of_edge] + length_fields["offset"] + \
+                        np.where(length_idx > field_idx[mutant_of_edge], deltas[mutant_of_edge], 0)
+            out[np.repeat(positions, widths) + self.get_ranks_in_groups(widths)] = \
+                self.encode_numbers(values, widths)
+
+        return MutantBatch(out, offsets)
+
+    @staticmethod
+    def get_ranks_in_groups(group_lens: np.ndarray) -> np.ndarray:
+        """
+        Get `[0, 1, ..., group_lens[0]-1, 0, 1, ..., group_lens[1]-1, ...]`.
+        """
+        total = int(group_lens.sum())
+        group_starts = np.cumsum(group_lens) - group_lens
+        return np.arange(total, dtype=np.int64) - np.repeat(group_starts, group_lens)
+
+    ########## Random mutation ##########
+
+    def mutate_random_numbers(self,
+                              mutant_num: int,
+                              kinds: Iterable[TemplateFieldKind] = (TemplateFieldKind.LENGTH,),
+                              rng: np.random.Generator = None) -> MutantBatch:
+        """
+        Generate `mutant_num` mutants, each sets a uniformly chosen field of the given kinds
+        to a random value fitting in the field (as `Number_BFN.random_num`).
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        candidates = self.get_field_indices(kinds)
+        if len(candidates) == 0:
+            raise ValueError(f"There is no field of the kinds {list(kinds)} in the template!")
+        field_idx = rng.choice(candidates, size=mutant_num)
+        # Only the lowest bytes fitting in the field are encoded.
+        values = rng.integers(0, np.iinfo(np.uint64).max, size=mutant_num, dtype=np.uint64, endpoint=True)
+        return self.mutate_numbers(field_idx, values)
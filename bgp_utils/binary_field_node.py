@@ -1,43 +1,184 @@
 from abc import ABC, abstractmethod
-from functools import wraps
-from typing import Callable, Union, Any
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps, lru_cache
+from types import MappingProxyType
+from typing import Callable, Union, Any, Mapping
+import math
 import random
 import numpy as np
+from .mutation_sampler import MutationSampler
 
-def smart_append(d: dict, key: str, val) -> str:
+@lru_cache(maxsize=None)
+def get_bfn_key(name: str, index: int) -> str:
     """
-    Smart append method.
-    Will check all the keys in the dictionary `d`, 
-    find all in the form of `key_*` (* is an integer no less than 0),
-    and find the smallest n such that `key_n` does not exist in `d`,
-    and finally append `(key_n, val)` to `d`.
-    Return "key_n". 
+    Get the key `"<name>_<index>"` used in the relationship dictionaries of BFNs.
+    `index` is the insertion count of the dictionary, so a new key never collides
+    with an existing one and no scan over the keys is needed.
+    The keys are cached, so all BFNs share the same key strings.
     -----------------------------
     Called in the append methods of BinaryFieldNode
     """
-    # extract all numbers from keys look like `key_*`.
-    numbers = set()
-    for k in d.keys():
-        if k.startswith(key + "_"):
-            # Extract the number part. 
-            num = int(k.split("_")[-1])
-            numbers.add(num)
-    # Find the minimal usable number `n`.
-    n = 0
-    while n in numbers:
-        n += 1
-    # Insert the new key-value pair.
-    new_key = f"{key}_{n}"
-    d[new_key] = val
-    # Return the key
-    return new_key
+    return f"{name}_{index}"
+
+class BFNUpdateScheduler:
+    """
+    Schedule the propagation of updates between BFNs.
+    The propagation graph has an edge from each BFN to every BFN in its `depend_on_me`
+    and to its `parent`. Instead of recursively calling `update` along every path,
+    the scheduler collects all BFNs reachable from the modified ones, 
+    orders them topologically, and recomputes each of them at most once.
+    -----------------------------
+    Inside a transaction (see `BinaryFieldNode.transaction`), 
+    the propagation is deferred until the outermost transaction ends,
+    so several set-functions only trigger a single propagation pass.
+    -----------------------------
+    Inside a construction (see `construction`), the updates only propagate between siblings,
+    for the trees built bottom-up from consistent values (e.g. decoded from the wire).
+    """
+    def __init__(self):
+        """Initialize the scheduler."""
+        # The nesting depth of the currently open transactions.
+        self.transaction_depth = 0
+        # The nesting depth of the currently open constructions.
+        self.construction_depth = 0
+        # The BFNs that must be recomputed on their dependencies.
+        # Keyed by `id` because BFNs are not hashable by value.
+        self.pending_recompute : dict[int, "BinaryFieldNode"] = {}
+        # The BFNs that have already been modified (by a set-function),
+        # only the BFNs after them need to be recomputed.
+        self.pending_changed : dict[int, "BinaryFieldNode"] = {}
+
+    @staticmethod
+    def get_successors(bfn: "BinaryFieldNode", follow_parent: bool = True) -> list["BinaryFieldNode"]:
+        """Get the BFNs that should be updated when `bfn` changes."""
+        successors = list(bfn.depend_on_me.values())
+        if follow_parent and bfn.parent is not None:
+            successors.append(bfn.parent)
+        return successors
+
+    def schedule(self,
+                 recompute: list["BinaryFieldNode"] = None,
+                 changed: list["BinaryFieldNode"] = None):
+        """
+        Schedule a propagation pass.
+        `recompute`: BFNs that must be updated on their dependencies.
+        `changed`: BFNs that have already changed.
+        The pass runs immediately unless a transaction is open.
+        Inside a construction, a local pass (see `construction`) runs immediately instead.
+        """
+        if self.construction_depth > 0:
+            self.propagate({id(bfn): bfn for bfn in recompute or [] if bfn.dependencies},
+                           {id(bfn): bfn for bfn in changed or []},
+                           follow_parent=False)
+            return
+        for bfn in recompute or []:
+            self.pending_recompute[id(bfn)] = bfn
+        for bfn in changed or []:
+            self.pending_changed[id(bfn)] = bfn
+        if self.transaction_depth == 0:
+            self.flush()
+
+    def flush(self):
+        """Run the propagation pass on all pending BFNs."""
+        while self.pending_recompute or self.pending_changed:
+            recompute, self.pending_recompute = self.pending_recompute, {}
+            changed, self.pending_changed = self.pending_changed, {}
+            self.propagate(recompute, changed)
+
+    def propagate(self,
+                  recompute: dict[int, "BinaryFieldNode"],
+                  changed: dict[int, "BinaryFieldNode"],
+                  follow_parent: bool = True):
+        """
+        Propagate the updates in topological order.
+        A BFN is recomputed only if it is in `recompute` 
+        or one of its predecessors has actually changed.
+        If not `follow_parent`, the updates do not propagate from the BFNs to their parents.
+        """
+        # Collect all BFNs reachable from the seeds, along with their successors.
+        reachable : dict[int, BinaryFieldNode] = {}
+        successors : dict[int, list[BinaryFieldNode]] = {}
+        stack = list(recompute.values()) + list(changed.values())
+        while stack:
+            bfn = stack.pop()
+            if id(bfn) in reachable:
+                continue
+            reachable[id(bfn)] = bfn
+            successors[id(bfn)] = self.get_successors(bfn, follow_parent)
+            stack.extend(successors[id(bfn)])
+        # Count the predecessors of each reachable BFN.
+        in_degree = dict.fromkeys(reachable, 0)
+        for bfn_successors in successors.values():
+            for successor in bfn_successors:
+                in_degree[id(successor)] += 1
+        # Kahn's algorithm.
+        to_recompute = set(recompute)
+        ready = deque(bfn for bfn in reachable.values() if in_degree[id(bfn)] == 0)
+        while ready:
+            bfn = ready.popleft()
+            bfn_changed = id(bfn) in changed
+            if id(bfn) in to_recompute:
+                bfn_changed = bfn.update_on_dependencies() or bfn_changed
+            for successor in successors[id(bfn)]:
+                if bfn_changed:
+                    to_recompute.add(id(successor))
+                in_degree[id(successor)] -= 1
+                if in_degree[id(successor)] == 0:
+                    ready.append(successor)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Defer the propagation until the outermost transaction ends.
+        """
+        self.transaction_depth = self.transaction_depth + 1
+        try:
+            yield self
+        finally:
+            self.transaction_depth = self.transaction_depth - 1
+            if self.transaction_depth == 0:
+                self.flush()
+
+    @contextmanager
+    def construction(self):
+        """
+        Build BFN trees bottom-up without propagating the updates to the parents.
+        The values of the new BFNs must be consistent (e.g. decoded from the wire),
+        so only the BFNs with dependencies are recomputed, on their siblings,
+        when their parent is initialized (see `BinaryFieldNode.children_update`).
+        The ancestors, built afterwards, are not updated again by their descendents.
+        The BFNs already in other trees must not be modified inside.
+        """
+        self.construction_depth = self.construction_depth + 1
+        try:
+            yield self
+        finally:
+            self.construction_depth = self.construction_depth - 1
+
+# The scheduler shared by all BFNs.
+update_scheduler = BFNUpdateScheduler()
+
+# The read-only map returned for the relationships that have not been allocated.
+EMPTY_BFN_MAP : Mapping[str, "BinaryFieldNode"] = MappingProxyType({})
 
 class BinaryFieldNode(ABC):
     """
     The basic type of binary field.
     Use "BFN" as a shorter representation. 
+    -----------------------------
+    BFNs use `__slots__` to keep the node compact, 
+    every subclass must declare `__slots__` with the attributes it introduces
+    (or `__slots__ = ()` if there is none), otherwise a `__dict__` is added back.
     """
 
+    __slots__ = ("_children", "children_max_index", "parent",
+                 "_dependencies", "dependencies_max_index",
+                 "_depend_on_me", "depend_on_me_max_index",
+                 "children_shared", "detached", "binary_content", "prefix", "suffix",
+                 "binary_cache", "cone_weight_cache", "_sampler", "eta")
+
     @abstractmethod
     def __init__(self,
                  eta = 0.05):
@@ -54,9 +195,14 @@ class BinaryFieldNode(ABC):
         # the `children` dictionary must be ordered, 
         # because we may need to concatenate the binary expression of the chidren 
         # to get the binary expression of current BFN.
-        self.children : dict[str,BinaryFieldNode] = {}
+        # The relationship dictionaries are allocated on the first insertion,
+        # read them via the `children`, `dependencies` and `depend_on_me` properties.
+        self._children : dict[str,BinaryFieldNode] = None
         self.children_max_index = -1
         self.parent : BinaryFieldNode = None
+        # If the children are shared with a clone (see `clone`).
+        # Shared children are never modified, they are copied on the first access.
+        self.children_shared = False
 
         ###### For the dependency relations ######
 
@@ -64,10 +210,10 @@ class BinaryFieldNode(ABC):
         # and set by the parent via `add_dependency_between_children`.
         
         # the BFNs whose values decides the value of current BFN.
-        self.dependencies : dict[str,BinaryFieldNode] = {}
+        self._dependencies : dict[str,BinaryFieldNode] = None
         self.dependencies_max_index = -1
         # the BFNs whose values depend on the value of current BFN.
-        self.depend_on_me : dict[str,BinaryFieldNode] = {}
+        self._depend_on_me : dict[str,BinaryFieldNode] = None
         self.depend_on_me_max_index = -1
 
         ###### For modification ######
@@ -88,12 +234,30 @@ class BinaryFieldNode(ABC):
         self.prefix : bytes = b''
         self.suffix : bytes = b''
 
+        ###### For encoding cache ######
+
+        # The memoized output of `get_binary_expression`.
+        # `None` means the BFN is dirty and must be re-encoded.
+        # Any modification of the BFN must invalidate the cache of the BFN 
+        # and all its ancestors via `invalidate_binary_cache`.
+        self.binary_cache : bytes = None
+
+        ###### For sampling cache ######
+
+        # The cumulative cone weights used by `sample_under_cone`, keyed by the weight function.
+        # Each value is `(cumulative_weights, child_keys)`, where `cumulative_weights[0]` is
+        # the weight of the current BFN and `cumulative_weights[i]` adds the cone weight
+        # of the child `child_keys[i-1]`. `None` means nothing has been cached.
+        # Invalidated together with `binary_cache`.
+        self.cone_weight_cache : dict[Callable, tuple[tuple, tuple]] = None
+
         ###### For mutation ######
 
-        # Initialize all weights to 1.
-        self.weights = np.ones(len(BinaryFieldNode.mutation_set))
-        # Normalize
-        self.weights /= np.sum(self.weights)
+        # The sampler of the mutation strategies, holding the (unnormalized) weights.
+        # The uniform sampler is shared by all BFNs of the same class
+        # until `update_weights` or `set_weights` is called (copy-on-write).
+        # `None` means the shared sampler is used, read it via `sampler`.
+        self._sampler : MutationSampler = None
         # Set the learning rate.
         self.eta = eta
 
@@ -103,6 +267,189 @@ class BinaryFieldNode(ABC):
         """Get the name of the BFN."""
         raise NotImplementedError()
 
+    ########## Compact storage ##########
+
+    @property
+    def children(self) -> Mapping[str, "BinaryFieldNode"]:
+        """
+        The children of the BFN. Modify them via `append_child` and `remove_child`.
+        The children shared with a clone are copied first.
+        """
+        if self.children_shared:
+            self.unshare_children()
+        return self._children if self._children is not None else EMPTY_BFN_MAP
+
+    @children.setter
+    def children(self, children: dict[str, "BinaryFieldNode"]):
+        self._children = dict(children) if children else None
+
+    @property
+    def dependencies(self) -> Mapping[str, "BinaryFieldNode"]:
+        """The dependencies of the BFN. Modify them via `append_dependency` and `remove_dependency`."""
+        return self._dependencies if self._dependencies is not None else EMPTY_BFN_MAP
+
+    @dependencies.setter
+    def dependencies(self, dependencies: dict[str, "BinaryFieldNode"]):
+        self._dependencies = dict(dependencies) if dependencies else None
+
+    @property
+    def depend_on_me(self) -> Mapping[str, "BinaryFieldNode"]:
+        """The depend-on-mes of the BFN. Modify them via `append_depend_on_me` and `remove_depend_on_me`."""
+        return self._depend_on_me if self._depend_on_me is not None else EMPTY_BFN_MAP
+
+    @depend_on_me.setter
+    def depend_on_me(self, depend_on_me: dict[str, "BinaryFieldNode"]):
+        self._depend_on_me = dict(depend_on_me) if depend_on_me else None
+
+    # The uniform weights shared by the BFNs of each class, keyed by the class.
+    shared_weights : dict[type, np.ndarray] = {}
+
+    @classmethod
+    def get_shared_weights(cls) -> np.ndarray:
+        """
+        Get the read-only uniform weights shared by all BFNs of this class.
+        The size follows the `mutation_set` of the class.
+        """
+        weights = BinaryFieldNode.shared_weights.get(cls)
+        if weights is None:
+            weights = np.ones(len(cls.mutation_set))
+            weights /= np.sum(weights)
+            weights.flags.writeable = False
+            BinaryFieldNode.shared_weights[cls] = weights
+        return weights
+
+    # The uniform samplers shared by the BFNs of each class, keyed by the class.
+    shared_samplers : dict[type, MutationSampler] = {}
+
+    @classmethod
+    def get_shared_sampler(cls) -> MutationSampler:
+        """
+        Get the uniform sampler shared by all BFNs of this class.
+        Do not modify it, copy it first.
+        """
+        sampler = BinaryFieldNode.shared_samplers.get(cls)
+        if sampler is None:
+            sampler = MutationSampler.uniform(len(cls.mutation_set))
+            BinaryFieldNode.shared_samplers[cls] = sampler
+        return sampler
+
+    @property
+    def sampler(self) -> MutationSampler:
+        """The sampler of the mutation strategies. Read-only while the shared sampler is used."""
+        return self._sampler if self._sampler is not None else type(self).get_shared_sampler()
+
+    @property
+    def weights(self) -> np.ndarray:
+        """The normalized mutation weights. Modify them via `update_weights` and `set_weights`."""
+        if self._sampler is None:
+            return type(self).get_shared_weights()
+        return self._sampler.get_probabilities()
+
+    @weights.setter
+    def weights(self, weights: np.ndarray):
+        shared_weights = type(self).get_shared_weights()
+        if weights is shared_weights or (len(weights) == len(shared_weights) 
+                                         and np.array_equal(weights, shared_weights)):
+            # Go back to the shared sampler if nothing has been learned.
+            self._sampler = None
+        else:
+            self._sampler = MutationSampler(weights)
+
+    # The index of each mutation strategy in the `mutation_set` of each class, keyed by the class.
+    strategy_indices : dict[type, dict[int, int]] = {}
+
+    @classmethod
+    def get_strategy_index(cls, strategy: "BinaryFieldNode.MutationItem") -> int:
+        """Get the index of the strategy in the `mutation_set` of the class."""
+        indices = BinaryFieldNode.strategy_indices.get(cls)
+        if indices is None:
+            # `MutationItem` is compared by identity, the same as `list.index`.
+            indices = {}
+            for idx, item in enumerate(cls.mutation_set):
+                indices.setdefault(id(item), idx)
+            BinaryFieldNode.strategy_indices[cls] = indices
+        idx = indices.get(id(strategy))
+        if idx is None:
+            raise ValueError(f"The strategy is not in the mutation set of {cls.__name__}.")
+        return idx
+
+    # The cache of `get_slot_names`, keyed by the class.
+    slot_names : dict[type, tuple[str, ...]] = {}
+
+    @classmethod
+    def get_slot_names(cls) -> tuple[str, ...]:
+        """Get the names of all slots of the class, including the inherited ones."""
+        names = BinaryFieldNode.slot_names.get(cls)
+        if names is None:
+            names = tuple(name for klass in reversed(cls.__mro__)
+                          for name in klass.__dict__.get("__slots__", ()))
+            BinaryFieldNode.slot_names[cls] = names
+        return names
+
+    ########## Copy-on-write cloning ##########
+
+    def clone(self) -> "BinaryFieldNode":
+        """
+        Get a copy-on-write clone of the BFN tree under the current BFN.
+        The clone has no parent and no dependencies.
+        --------------------
+        The descendents are shared by the clone and the current BFN,
+        and copied level by level when they are accessed via `children`,
+        so a set-function only copies the path from the root to the modified BFN
+        (along with the siblings on the path), the other subtrees stay shared.
+        --------------------
+        Since the shared descendents must not be modified, 
+        the references to the descendents taken before cloning are outdated,
+        get them again via `children` (or `sample_under_cone`).
+        """
+        bfn = self.get_shallow_copy()
+        bfn.parent = None
+        bfn._dependencies = None
+        bfn._depend_on_me = None
+        # The current BFN must not modify the shared descendents in place either.
+        self.children_shared = self._children is not None
+        return bfn
+
+    def get_shallow_copy(self) -> "BinaryFieldNode":
+        """
+        Get a copy of the current BFN sharing its children.
+        The caller must fix the parent and the dependencies of the copy.
+        """
+        bfn = object.__new__(type(self))
+        for name in self.get_slot_names():
+            try:
+                setattr(bfn, name, getattr(self, name))
+            except AttributeError:
+                pass
+        bfn.children_shared = self._children is not None
+        if self.cone_weight_cache is not None:
+            bfn.cone_weight_cache = dict(self.cone_weight_cache)
+        if self._sampler is not None:
+            # `update_weights` modifies the sampler in place.
+            bfn._sampler = self._sampler.copy()
+        return bfn
+
+    def unshare_children(self) -> dict[int, "BinaryFieldNode"]:
+        """
+        Replace the shared children with their shallow copies, which share the grandchildren in turn.
+        The dependencies between the children are redirected to the copies.
+        Return the copies keyed by the `id` of the original children.
+        """
+        self.children_shared = False
+        if self._children is None:
+            return {}
+        copies = {id(child): child.get_shallow_copy() for child in self._children.values()}
+        for child in copies.values():
+            child.parent = self
+            if child._dependencies is not None:
+                child._dependencies = {key: copies.get(id(bfn), bfn) 
+                                       for key, bfn in child._dependencies.items()}
+            if child._depend_on_me is not None:
+                child._depend_on_me = {key: copies.get(id(bfn), bfn) 
+                                       for key, bfn in child._depend_on_me.items()}
+        self._children = {key: copies[id(child)] for key, child in self._children.items()}
+        return copies
+
     ########## Get binary info ##########
 
     @abstractmethod
@@ -122,14 +469,70 @@ class BinaryFieldNode(ABC):
         Attach the prefix and suffix on them. 
         If `self.binary_content` is not None, you sould return `self.binary_content` 
         (along with the prefix and suffix), otherwise you should return in your way.
+        The result is memoized in `self.binary_cache` until the BFN is invalidated.
         """
+        if self.binary_cache is not None:
+            return self.binary_cache
         if self.binary_content is not None:
-            return self.prefix + self.binary_content + self.suffix
-        return self.prefix + self.get_binary_expression_inner() + self.suffix
+            binary_val = self.prefix + self.binary_content + self.suffix
+        else:
+            binary_val = self.prefix + self.get_binary_expression_inner() + self.suffix
+        self.binary_cache = binary_val
+        return binary_val
 
     def get_binary_length(self) -> int:
-        """Get the length of the binary expression of this BFN."""
+        """
+        Get the length of the binary expression of this BFN.
+        The length is taken from the memoized binary expression, so it is O(1) when clean.
+        """
         return len(self.get_binary_expression())
+
+    def invalidate_binary_cache(self):
+        """
+        Mark the current BFN and all its ancestors as dirty.
+        Must be called whenever the binary expression of the BFN may have changed.
+        Only the path from the current BFN to the root is re-encoded afterwards.
+        The cached cone weights on the path are dropped as well.
+        """
+        bfn = self
+        while bfn is not None:
+            bfn.binary_cache = None
+            bfn.cone_weight_cache = None
+            bfn = bfn.parent
+
+    def __getstate__(self):
+        """
+        Get the state of the BFN as a dictionary of its slots.
+        Do not pickle or copy the encoding cache.
+        It is rebuilt lazily on the first call of `get_binary_expression`.
+        """
+        state = {name: getattr(self, name) for name in self.get_slot_names() 
+                 if hasattr(self, name)}
+        state["binary_cache"] = None
+        state["cone_weight_cache"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Restore the BFN from the pickled state.
+        BFNs pickled before the slots existed store `children`, `dependencies`, 
+        `depend_on_me` and `weights` directly, they are converted by the property setters.
+        BFNs pickled before the sampler existed store `_weights`, converted the same way.
+        BFNs pickled before the encoding cache existed start dirty.
+        """
+        self._children = None
+        self._dependencies = None
+        self._depend_on_me = None
+        self._sampler = None
+        self.children_shared = False
+        self.binary_cache = None
+        self.cone_weight_cache = None
+        for name, val in state.items():
+            if name == "_weights":
+                if val is not None:
+                    self.weights = val
+                continue
+            setattr(self, name, val)
     
     ########## Update according to dependencies ##########
 
@@ -189,6 +592,7 @@ class BinaryFieldNode(ABC):
         # Clear the `binary_content`
         self.binary_content = None
         self.update_on_dependencies_inner()
+        self.invalidate_binary_cache()
         now_binary_val = self.get_binary_expression()
 
         # return if you should recursively call the `update` function of other BFNs
@@ -200,31 +604,36 @@ class BinaryFieldNode(ABC):
         Update the BFNs depend on current BFN.
         parent node is not included in `depend_on_me`, 
         but is processed in `update_depend_on_me` function. 
+        The propagation is done by `update_scheduler`.
         """
-        for bfn in self.depend_on_me.values():
-            bfn.update()
-        if self.parent is not None:
-            # print(f"For debug: Calling update of parent {self.parent.get_bfn_name()}")
-            self.parent.update()
+        update_scheduler.schedule(changed=[self])
     
     def update(self):
         """
         Update the current status of the BFN.
         First update yourself on the dependencies, 
-        then recursively call the 
+        then update the BFNs depending on you if you have changed.
+        The propagation is done by `update_scheduler`.
         """
-        updated = self.update_on_dependencies()
-        if updated:
-            # You should recursively call the `update` functions 
-            self.update_depend_on_me()
+        update_scheduler.schedule(recompute=[self])
         
     def children_update(self):
         """
         Call `update` method for the children.
         This should be called when initializing the children of a BFN
         """
-        for bfn in self.children.values():
-            bfn.update()
+        update_scheduler.schedule(recompute=list(self.children.values()))
+
+    def transaction(self):
+        """
+        Return a context manager deferring the update propagation.
+        All set-functions called inside are propagated in one pass on exit:
+            with message_bfn.transaction():
+                message_bfn.set_length(0)
+                message_bfn.set_nlri([...])
+        Length fields may be stale when read inside the transaction.
+        """
+        return update_scheduler.transaction()
     
     def detach(self):
         """
@@ -273,18 +682,33 @@ class BinaryFieldNode(ABC):
         # Increase the overall children count.
         self.children_max_index = self.children_max_index+1
         # Create new key.
-        new_key = f"{child.get_bfn_name()}_{self.children_max_index}"
+        new_key = get_bfn_key(child.get_bfn_name(), self.children_max_index)
         assert new_key not in self.children
         # Insert.
-        self.children[new_key] = child
+        if self._children is None:
+            self._children = {}
+        self._children[new_key] = child
+        self.invalidate_binary_cache()
         return new_key
 
     def remove_child(self, child_key: str):
         """Remove a child with given key."""
         if child_key in self.children:
-            self.children.pop(child_key)
+            self._children.pop(child_key)
+            if not self._children:
+                self._children = None
+            self.invalidate_binary_cache()
         else:
             print(f"Child {child_key} does not exist!")
+
+    def clear_children(self):
+        """
+        Remove all children.
+        The parents of the removed children are NOT reset.
+        """
+        self._children = None
+        self.children_shared = False
+        self.invalidate_binary_cache()
     
     def set_parent(self, parent: "BinaryFieldNode"):
         """
@@ -304,16 +728,20 @@ class BinaryFieldNode(ABC):
         # Increase the overall dependencies count.
         self.dependencies_max_index = self.dependencies_max_index+1
         # Create new key.
-        new_key = f"{dependency.get_bfn_name()}_{self.dependencies_max_index}"
+        new_key = get_bfn_key(dependency.get_bfn_name(), self.dependencies_max_index)
         assert new_key not in self.dependencies
         # Insert.
-        self.dependencies[new_key] = dependency
+        if self._dependencies is None:
+            self._dependencies = {}
+        self._dependencies[new_key] = dependency
         return new_key
     
     def remove_dependency(self, dependency_key: str):
         """Remove a dependency with given key."""
         if dependency_key in self.dependencies:
-            self.dependencies.pop(dependency_key)
+            self._dependencies.pop(dependency_key)
+            if not self._dependencies:
+                self._dependencies = None
         else:
             print(f"Dependency {dependency_key} does not exist!")
         
@@ -326,16 +754,20 @@ class BinaryFieldNode(ABC):
         # Increase the overall depend-on-me count.
         self.depend_on_me_max_index = self.depend_on_me_max_index+1
         # Create new key.
-        new_key = f"{depend_on_me.get_bfn_name()}_{self.depend_on_me_max_index}"
+        new_key = get_bfn_key(depend_on_me.get_bfn_name(), self.depend_on_me_max_index)
         assert new_key not in self.depend_on_me
         # Insert.
-        self.depend_on_me[new_key] = depend_on_me
+        if self._depend_on_me is None:
+            self._depend_on_me = {}
+        self._depend_on_me[new_key] = depend_on_me
         return new_key
 
     def remove_depend_on_me(self, depend_on_me_key: str):
         """Remove a depend-on-me with given key."""
         if depend_on_me_key in self.depend_on_me:
-            self.depend_on_me.pop(depend_on_me_key)
+            self._depend_on_me.pop(depend_on_me_key)
+            if not self._depend_on_me:
+                self._depend_on_me = None
         else:
             print(f"Depend-on-me {depend_on_me_key} does not exist!")
     
@@ -432,6 +864,7 @@ class BinaryFieldNode(ABC):
         2. Update `self.depend_on_me` and `self.parent`
         3. Embed the overwriting rules of set-functions
            (So you do not need to worry about that in the set-function's).
+        4. Invalidate the encoding cache from current BFN up to the root.
         """
         @wraps(func)
         def wrapper(self, *args, **kwargs):
@@ -445,6 +878,8 @@ class BinaryFieldNode(ABC):
                 self.suffix = b''
             # Then execute the set-functions
             result = func(self, *args, **kwargs)
+            # The binary expression of myself and my ancestors is now stale.
+            self.invalidate_binary_cache()
             # Then update the BFNs depend on myself.
             self.update_depend_on_me()
             return result
@@ -521,9 +956,12 @@ class BinaryFieldNode(ABC):
 
     def select_mutation_strategy(self):
         """Return the strategy according to the weights."""
-        chosen_idx = np.random.choice(len(BinaryFieldNode.mutation_set), 
-                                      p=self.weights)
-        return BinaryFieldNode.mutation_set[chosen_idx]
+        return self.mutation_set[self.sampler.draw()]
+
+    def select_mutation_strategies(self, num: int) -> list[MutationItem]:
+        """Return `num` strategies drawn independently according to the weights, in one batch."""
+        mutation_set = self.mutation_set
+        return [mutation_set[idx] for idx in self.sampler.draw_batch(num).tolist()]
 
     def apply_mutation_strategy(self, strategy : MutationItem):
         """Apply the mutation strategy."""
@@ -531,18 +969,17 @@ class BinaryFieldNode(ABC):
 
     def update_weights(self, chosen_strategy : MutationItem, feedback: bool):
         """
-        Update the weight and normalize immediately.
+        Update the weight of the chosen strategy multiplicatively.
         `feedback` means the result of the strategy is positive or not. 
 
-        You may modify this function, 
-        but you have to make sure the weights are NORMALIZED.
+        You may modify this function.
+        The sampler keeps the weights unnormalized, `weights` returns the normalized ones.
         """
-        chosen_idx = self.mutation_set.index(chosen_strategy)
-        if feedback:
-            self.weights[chosen_idx] *= np.exp(self.eta)
-        else:
-            self.weights[chosen_idx] *= np.exp(-self.eta)
-        self.weights /= np.sum(self.weights)  # Normalization
+        chosen_idx = type(self).get_strategy_index(chosen_strategy)
+        if self._sampler is None:
+            # Copy the shared sampler before the first modification.
+            self._sampler = type(self).get_shared_sampler().copy()
+        self._sampler.scale_weight(chosen_idx, math.exp(self.eta if feedback else -self.eta))
 
     def set_weights(self, new_weights: Union[list[float], np.ndarray]):
         """
@@ -552,9 +989,8 @@ class BinaryFieldNode(ABC):
         if len(new_weights) != len(self.weights):
             # If the size of the new weights cannot match the original weight
             print(f"The size of the input weight ({len(new_weights)}) cannot match the original weight size ({len(self.weights)})")
-        self.weights = np.array(new_weights, dtype=float)
-        # Normalize.
-        self.weights = self.weights / np.sum(self.weights)
+        # The sampler normalizes lazily.
+        self._sampler = MutationSampler(new_weights)
 
     ########## Method for random selection ##########
 
@@ -581,6 +1017,29 @@ class BinaryFieldNode(ABC):
         from .path_attribute import BaseAttr_BFN
         return 1 if isinstance(other_self, BaseAttr_BFN) else 0
 
+    def get_cone_weight_sums(self, weight_func) -> tuple[tuple, tuple]:
+        """
+        Get `(cumulative_weights, child_keys)` of the current BFN for `weight_func`.
+        `cumulative_weights[0]` is the weight of the current BFN itself, 
+        and `cumulative_weights[i]` adds the cone weight of the child `child_keys[i-1]`.
+        The result is cached until the BFN or one of its descendents is modified,
+        so `weight_func` should only depend on the BFNs themselves.
+        """
+        if self.cone_weight_cache is not None:
+            cached = self.cone_weight_cache.get(weight_func)
+            if cached is not None:
+                return cached
+        # Keep the keys instead of the children, so the cache stays valid in the clones.
+        child_keys = tuple(self.children.keys())
+        cumulative_weights = [weight_func(self)]
+        for child in self.children.values():
+            cumulative_weights.append(cumulative_weights[-1] + child.get_cone_node_weight(weight_func))
+        cached = (tuple(cumulative_weights), child_keys)
+        if self.cone_weight_cache is None:
+            self.cone_weight_cache = {}
+        self.cone_weight_cache[weight_func] = cached
+        return cached
+
     def get_cone_node_weight(
             self,
             weight_func,
@@ -588,12 +1047,9 @@ class BinaryFieldNode(ABC):
         """
         Get the overall weight of BFNs in the cone under the current BFN (include itself).
         Can be used to calculate the number of BFNs satisfying some given criterion.
+        The weights of the cones are cached, see `get_cone_weight_sums`.
         """
-        # Count myself
-        total_weight = weight_func(self)
-        for child in self.children.values():
-            total_weight = total_weight + child.get_cone_node_weight(weight_func)
-        return total_weight
+        return self.get_cone_weight_sums(weight_func)[0][-1]
 
     def sample_under_cone(
             self,
@@ -602,16 +1058,56 @@ class BinaryFieldNode(ABC):
         """
         Sample and return a BFN in the BFN cone under the current BFN
         according to the weight computed by `weight_func`.
+        With the cached cone weights, each level costs one binary search.
+        """
+        bfn = self
+        while True:
+            cumulative_weights, child_keys = bfn.get_cone_weight_sums(weight_func)
+            total_weight = cumulative_weights[-1]
+            # Raise an error if the weights is all zero. 
+            if total_weight <= 0:
+                raise ValueError("The weight list is all zero!")
+            # Same as `random.choices` with `cum_weights`.
+            chosen = bisect_right(cumulative_weights, random.random() * total_weight, 
+                                  0, len(cumulative_weights)-1)
+            if chosen == 0:
+                return bfn
+            bfn = bfn.children[child_keys[chosen-1]]
+
+    def sample_under_cone_batch(
+            self,
+            weight_func,
+            k: int,
+        ) -> list["BinaryFieldNode"]:
+        """
+        Sample `k` BFNs (with replacement) in the BFN cone under the current BFN
+        according to the weight computed by `weight_func`.
+        The `k` draws descend the cone together, so each BFN is visited once per batch.
+        To mutate the samples in copies of the current BFN, copy them together:
+            message_copy, samples_copy = copy.deepcopy((message_bfn, samples))
         """
-        bfns = [None] + [child_key for child_key in self.children]
-        weights = [weight_func(self)] + [child.get_cone_node_weight(weight_func) for child in self.children.values()]
+        total_weight = self.get_cone_node_weight(weight_func)
         # Raise an error if the weights is all zero. 
-        if set(weights) == {0}:
+        if total_weight <= 0:
             raise ValueError("The weight list is all zero!")
-        chosen = random.choices(bfns, weights=weights, k=1)[0]
-        if chosen is None:
-            return self
-        return self.children[chosen].sample_under_cone(weight_func)
+        samples : list[BinaryFieldNode] = [None] * k
+        # Each pending item is a BFN and the draws (offset in the cone, sample index) reaching it.
+        pending = [(self, [(random.random() * total_weight, i) for i in range(k)])]
+        while pending:
+            bfn, draws = pending.pop()
+            cumulative_weights, child_keys = bfn.get_cone_weight_sums(weight_func)
+            draws_of_children : dict[int, list] = {}
+            for offset, i in draws:
+                chosen = bisect_right(cumulative_weights, offset, 0, len(cumulative_weights)-1)
+                if chosen == 0:
+                    samples[i] = bfn
+                else:
+                    # Make the offset relative to the cone of the chosen child.
+                    draws_of_children.setdefault(chosen, []).append(
+                        (offset - cumulative_weights[chosen-1], i))
+            for chosen, child_draws in draws_of_children.items():
+                pending.append((bfn.children[child_keys[chosen-1]], child_draws))
+        return samples
     
     def uniformly_apply_mutation(self):
         """
@@ -1,4 +1,5 @@
-from .msg_base import MessageType, HeaderMarker_BFN, MessageType_BFN, MessageContent_BFN, BaseMessage_BFN, Message
+from .msg_base import MessageType, HeaderMarker_BFN, MessageType_BFN, MessageContent_BFN, BaseMessage_BFN, Message, RawMessage
 from .msg_open import OptParmType, OptParmValue, BGPVersion_BFN, HoldTime_BFN, OpenOptParmType_BFN, OpenOptParmValue_BFN, OpenOptParm_BFN, OpenOptParmList_BFN, OpenMessageContent_BFN, OpenMessage_BFN, OpenMessage
 from .msg_keepalive import KeepAliveMessageContent_BFN, KeepAliveMessage_BFN, KeepAliveMessage
 from .msg_update import WithdrawnRoutes_BFN, PathAttributes_BFN, NLRI_BFN, UpdateMessageContent_BFN, UpdateMessage_BFN, UpdateMessage
+from .msg_parser import get_message_views, decode_ipv4_prefix_list, decode_path_attribute_list, parse_message_bfn, parse_message_bfns, parse_message
@@ -4,6 +4,7 @@ from basic_utils.binary_utils import num2bytes, bytes2num
 from enum import Enum
 from functools import partial
 from abc import ABC, abstractmethod
+import copy
 import random
 import numpy as np
 
@@ -24,6 +25,9 @@ class HeaderMarker_BFN(BinaryFieldNode):
     """
     BGP message header marker field.
     """
+
+    __slots__ = ()
+
     def __init__(self):
         """
         Initialize the BGP message header marker BFN. 
@@ -33,10 +37,6 @@ class HeaderMarker_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(HeaderMarker_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -79,6 +79,9 @@ class MessageType_BFN(BinaryFieldNode):
     """
     BGP message type field.
     """
+
+    __slots__ = ("message_type",)
+
     def __init__(self,
                  message_type : MessageType = MessageType.UNDEFINED):
         """
@@ -89,10 +92,6 @@ class MessageType_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MessageType_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.message_type = message_type
@@ -166,6 +165,8 @@ class MessageContent_BFN(BinaryFieldNode):
     BGP message content BFN.
     """
 
+    __slots__ = ()
+
     ########## Get binary info ##########
 
     def get_binary_expression_inner(self):
@@ -205,6 +206,9 @@ class BaseMessage_BFN(BinaryFieldNode):
     The top level of BinaryFieldNode.
     This can be inherited by more specific message types. 
     """
+
+    __slots__ = ("header_marker_key", "length_key", "message_type_key", "message_content_key")
+
     def __init__(self,
                  message_type_bfn: MessageType_BFN,
                  message_content_bfn: MessageContent_BFN,
@@ -227,10 +231,6 @@ class BaseMessage_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(BaseMessage_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -341,4 +341,37 @@ class Message(ABC):
         """Get the binary expression of the message."""
         return self.message_bfn.get_binary_expression()
 
+    def clone(self) -> "Message":
+        """Get a copy-on-write clone of the message, see `BinaryFieldNode.clone`."""
+        message = copy.copy(self)
+        if self.message_bfn is not None:
+            message.message_bfn = self.message_bfn.clone()
+        return message
+
     # TODO: Extend the functionality of the message.
+
+class RawMessage(Message):
+    """
+    BGP message given by its binary expression only, without a BFN tree.
+    E.g. the mutants generated from a `BFNTemplate`.
+    """
+    def __init__(self, binary_expression: bytes):
+        """Initialize the message."""
+        super().__init__(None)
+        self.binary_expression = binary_expression
+
+    def get_message_type(self):
+        """
+        Return the type of the message according to the type field of the header.
+        Return `MessageType.UNDEFINED` if the type is unknown.
+        """
+        if len(self.binary_expression) < 19:
+            return MessageType.UNDEFINED
+        try:
+            return MessageType(self.binary_expression[18])
+        except ValueError:
+            return MessageType.UNDEFINED
+
+    def get_binary_expression(self):
+        """Get the binary expression of the message."""
+        return self.binary_expression
@@ -9,6 +9,9 @@ class KeepAliveMessageContent_BFN(MessageContent_BFN):
     """
     BGP OPEN message content.
     """
+
+    __slots__ = ()
+
     def __init__(self):
         """Initialize the BGP OPEN message content BFN."""
         
@@ -16,10 +19,6 @@ class KeepAliveMessageContent_BFN(MessageContent_BFN):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(KeepAliveMessageContent_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -55,6 +54,8 @@ class KeepAliveMessage_BFN(BaseMessage_BFN):
     BGP KEEPALIVE message.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  message_content_bfn: KeepAliveMessageContent_BFN = KeepAliveMessageContent_BFN(),
                  header_marker_bfn: HeaderMarker_BFN = None,
@@ -78,10 +79,6 @@ class KeepAliveMessage_BFN(BaseMessage_BFN):
                          header_marker_bfn=header_marker_bfn,
                          length_bfn = length_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(KeepAliveMessage_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
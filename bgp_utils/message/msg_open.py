@@ -30,6 +30,9 @@ class BGPVersion_BFN(Number_BFN):
     """
     The BGP version field.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  version_num : int = 4):
         """Initialize the BGP version BFN."""
@@ -38,10 +41,6 @@ class BGPVersion_BFN(Number_BFN):
 
         super().__init__(num_val=version_num, num_len=1)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(BGPVersion_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -88,6 +87,9 @@ class HoldTime_BFN(Number_BFN):
     """
     The BGP hold time field.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  hold_time : int = 180):
         """Initialize the BGP hold time BFN."""
@@ -96,10 +98,6 @@ class HoldTime_BFN(Number_BFN):
 
         super().__init__(num_val=hold_time, num_len=2)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(HoldTime_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -146,6 +144,9 @@ class OpenOptParmType_BFN(BinaryFieldNode):
     """
     BGP Open Message optional parameter type.
     """
+
+    __slots__ = ("opt_parm_type",)
+
     def __init__(self,
                  opt_parm_type : OptParmType = OptParmType.UNDEFINED):
         """
@@ -156,10 +157,6 @@ class OpenOptParmType_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(OpenOptParmType_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.opt_parm_type = opt_parm_type
@@ -234,6 +231,9 @@ class OpenOptParmValue_BFN(BinaryFieldNode):
     """
     BGP Open Message optional parameter value.
     """
+
+    __slots__ = ("opt_parm_val",)
+
     def __init__(self,
                  opt_parm_val: OptParmValue = OptParmValue.UNDEFINED):
         """
@@ -244,10 +244,6 @@ class OpenOptParmValue_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(OpenOptParmValue_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.opt_parm_val : OptParmValue = opt_parm_val
@@ -322,6 +318,9 @@ class OpenOptParm_BFN(BinaryFieldNode):
     """
     BGP Open Message optional parameter.
     """
+
+    __slots__ = ("opt_parm_type_key", "opt_parm_len_key", "opt_parm_val_key")
+
     def __init__(self,
                  opt_parm_type: OpenOptParmType_BFN,
                  opt_parm_val: OpenOptParmValue_BFN,
@@ -339,10 +338,6 @@ class OpenOptParm_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(OpenOptParm_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -439,6 +434,9 @@ class OpenOptParmList_BFN(BinaryFieldList_BFN):
     BGP Open Message optional parameter list.
     When inheriting `BinaryFieldList_BFN`, only need to rewrite the `__init__` method
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  bfn_list : list[OpenOptParm_BFN]):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -467,6 +465,10 @@ class OpenMessageContent_BFN(MessageContent_BFN):
     """
     BGP OPEN message content.
     """
+
+    __slots__ = ("bgp_version_key", "asn_key", "hold_time_key", "bgp_identifier_key",
+                 "opt_parm_len_key", "opt_parm_key")
+
     def __init__(self,
                  bgp_version_bfn: BGPVersion_BFN,
                  asn_bfn: ASN_BFN,
@@ -488,10 +490,6 @@ class OpenMessageContent_BFN(MessageContent_BFN):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(OpenMessageContent_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -589,6 +587,8 @@ class OpenMessage_BFN(BaseMessage_BFN):
     BGP OPEN message.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  message_content_bfn: OpenMessageContent_BFN,
                  header_marker_bfn: HeaderMarker_BFN = None,
@@ -612,10 +612,6 @@ class OpenMessage_BFN(BaseMessage_BFN):
                          header_marker_bfn=header_marker_bfn,
                          length_bfn = length_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(OpenMessage_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
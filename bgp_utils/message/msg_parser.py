@@ -0,0 +1,383 @@
+from ..binary_field_node import BinaryFieldNode, update_scheduler
+from ..basic_bfn_types import Length_BFN, ASN_BFN, IPv4Address_BFN, IPv4PrefixValue_BFN, IPv4PrefixLength_BFN, IPv4Prefix_BFN, BinaryFieldList_BFN
+from ..path_attribute import PathAttributeType, AttrType_BFN, AttrLength_BFN, BaseAttr_BFN, OriginType, Origin_BFN, OriginAttr_BFN, PathSegementType, PathSegmentType_BFN, PathSegmentLength_BFN, PathSegmentValue_BFN, PathSegment_BFN, ASPath_BFN, ASPathAttr_BFN, NextHop_BFN, NextHopAttr_BFN, MED_BFN, MEDAttr_BFN, LOCPREF_BFN, LOCPREFAttr_BFN, SingleCommunity_BFN, Communities_BFN, CommunitiesAttr_BFN, Arbitrary_BFN
+from .msg_base import MessageType, MessageType_BFN, HeaderMarker_BFN, BaseMessage_BFN, Message, RawMessage
+from .msg_open import OptParmType, OptParmValue, BGPVersion_BFN, HoldTime_BFN, OpenOptParmType_BFN, OpenOptParmValue_BFN, OpenOptParm_BFN, OpenOptParmList_BFN, OpenMessageContent_BFN, OpenMessage_BFN, OpenMessage
+from .msg_keepalive import KeepAliveMessageContent_BFN, KeepAliveMessage_BFN, KeepAliveMessage
+from .msg_update import WithdrawnRoutes_BFN, PathAttributes_BFN, NLRI_BFN, UpdateMessageContent_BFN, UpdateMessage_BFN, UpdateMessage
+from basic_utils.binary_utils import bytes2num
+from functools import partial
+from typing import Callable, Iterator, Union
+
+# Decode BGP messages from the wire format into BFN trees.
+# Parsing never fails: every field that cannot be decoded into its semantic BFN
+# is kept as raw bytes (an `Arbitrary_BFN`, or a leaf BFN modified by `set_bval`),
+# so the binary expression of the parsed BFN is always the input bytes.
+# The input is sliced with `memoryview`, the bytes are only copied into the leaves.
+
+BGP_HEADER_LEN = 19
+BGP_HEADER_MARKER = b'\xff'*16
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# The valid values of the enumerated fields.
+MESSAGE_TYPE_VALUES = frozenset(member.value for member in MessageType if member != MessageType.UNDEFINED)
+OPT_PARM_VALUES = frozenset(member.value for member in OptParmValue)
+ORIGIN_TYPE_VALUES = frozenset(member.value for member in OriginType)
+PATH_SEGMENT_TYPE_VALUES = frozenset(member.value for member in PathSegementType)
+
+########## Framing ##########
+
+def get_message_views(data: BytesLike) -> Iterator[memoryview]:
+    """
+    Split the byte stream into BGP messages according to the length field of the headers.
+    The messages are yielded as `memoryview`s of `data` without copying.
+    A tail that cannot be framed (truncated header, or length out of range) is yielded as a whole.
+    """
+    view = memoryview(data)
+    offset = 0
+    total_len = len(view)
+    while offset < total_len:
+        if total_len - offset >= BGP_HEADER_LEN:
+            length = (view[offset+16] << 8) | view[offset+17]
+            if BGP_HEADER_LEN <= length <= total_len - offset:
+                yield view[offset:offset+length]
+                offset = offset + length
+                continue
+        yield view[offset:]
+        return
+
+########## Basic fields ##########
+
+def decode_ipv4_address(view: memoryview) -> str:
+    """Decode the 4-octet IPv4 address."""
+    return '.'.join(map(str, view))
+
+def decode_ipv4_prefix_list(view: memoryview) -> list[IPv4Prefix_BFN]:
+    """
+    Decode the list of IPv4 prefixes (withdrawn routes or NLRI).
+    The host bits of the last octet are kept as the padding bits.
+    A malformed tail is kept as the binary value of the last prefix.
+    """
+    prefix_list : list[IPv4Prefix_BFN] = []
+    offset = 0
+    while offset < len(view):
+        prefix_len = view[offset]
+        segment_num = (prefix_len+7) // 8
+        end = offset + 1 + segment_num
+        if prefix_len > 32 or end > len(view):
+            prefix_bfn = IPv4Prefix_BFN.get_bfn("0.0.0.0/0")
+            prefix_bfn.set_bval(bytes(view[offset:]))
+            prefix_list.append(prefix_bfn)
+            break
+        segments = list(view[offset+1:end]) + [0]*(4-segment_num)
+        padding_num = segment_num*8 - prefix_len
+        padding_bits = []
+        if padding_num > 0:
+            last_segment = segments[segment_num-1]
+            padding_bits = [(last_segment >> i) & 1 for i in reversed(range(padding_num))]
+            segments[segment_num-1] = last_segment & (0xff << padding_num) & 0xff
+        prefix_val_bfn = IPv4PrefixValue_BFN(f"{'.'.join(map(str, segments))}/{prefix_len}")
+        prefix_val_bfn.padding_bits = padding_bits
+        prefix_list.append(IPv4Prefix_BFN(prefix_val_bfn=prefix_val_bfn,
+                                          prefix_len_bfn=IPv4PrefixLength_BFN(prefix_len)))
+        offset = end
+    return prefix_list
+
+def get_bfn_list(list_class: type,
+                 view: memoryview,
+                 decode_func: Callable[[memoryview], list[BinaryFieldNode]],
+                 lazy: bool) -> BinaryFieldList_BFN:
+    """
+    Get the BFN list of `list_class` decoded from `view`.
+    If `lazy`, the elements are only decoded when the list is accessed.
+    """
+    if lazy and len(view) > 0:
+        bfn_list : BinaryFieldList_BFN = list_class([])
+        bfn_list.set_lazy_source(view, partial(construct, decode_func))
+        return bfn_list
+    return list_class(decode_func(view))
+
+def construct(decode_func: Callable[[memoryview], BinaryFieldNode], view: memoryview) -> BinaryFieldNode:
+    """
+    Decode `view` by `decode_func` without propagating the updates through the new BFNs.
+    The decoded values are consistent by construction, see `BFNUpdateScheduler.construction`.
+    """
+    with update_scheduler.construction():
+        return decode_func(view)
+
+########## Path attributes ##########
+
+def decode_as_path(view: memoryview, asn_byte_len: int) -> ASPath_BFN:
+    """Decode the AS_PATH attribute value. Return `None` if it is malformed."""
+    pathseg_list : list[PathSegment_BFN] = []
+    offset = 0
+    while offset < len(view):
+        if offset + 2 > len(view):
+            return None
+        pathseg_type, asn_num = view[offset], view[offset+1]
+        end = offset + 2 + asn_num*asn_byte_len
+        if end > len(view) or pathseg_type not in PATH_SEGMENT_TYPE_VALUES:
+            return None
+        pathseg_list.append(PathSegment_BFN(
+            PathSegmentType_BFN(PathSegementType(pathseg_type)),
+            PathSegmentLength_BFN(asn_num),
+            pathseg_val_bfn=PathSegmentValue_BFN([
+                ASN_BFN(bytes2num(view[i:i+asn_byte_len]), asn_byte_len)
+                for i in range(offset+2, end, asn_byte_len)
+            ])
+        ))
+        offset = end
+    return ASPath_BFN(pathseg_list=pathseg_list)
+
+def decode_attr_value(attr_type_code: int, view: memoryview, asn_byte_len: int) -> BinaryFieldNode:
+    """
+    Decode the value of the path attribute.
+    Return `None` if the type is not supported, or the value is malformed.
+    """
+    value_bfn = None
+    match attr_type_code:
+        case PathAttributeType.ORIGIN.value if len(view) == 1 and view[0] in ORIGIN_TYPE_VALUES:
+            value_bfn = Origin_BFN(OriginType(view[0]))
+        case PathAttributeType.AS_PATH.value:
+            value_bfn = decode_as_path(view, asn_byte_len)
+        case PathAttributeType.NEXT_HOP.value if len(view) == 4:
+            value_bfn = NextHop_BFN(decode_ipv4_address(view))
+        case PathAttributeType.MULTI_EXIT_DISC.value if len(view) == 4:
+            value_bfn = MED_BFN(bytes2num(view))
+        case PathAttributeType.LOCAL_PREF.value if len(view) == 4:
+            value_bfn = LOCPREF_BFN(bytes2num(view))
+        case PathAttributeType.COMMUNITIES.value if len(view) % 4 == 0:
+            value_bfn = Communities_BFN([
+                SingleCommunity_BFN(bytes2num(view[i:i+2]), bytes2num(view[i+2:i+4]))
+                for i in range(0, len(view), 4)
+            ])
+    return value_bfn
+
+def get_attr_flags(attr_type: PathAttributeType, ext_len: bool = False) -> int:
+    """Get the flags octet of the attribute type BFN created by the specific path attribute BFN."""
+    return AttrType_BFN(attr_type, ext_len=ext_len).get_binary_expression()[0]
+
+# The path attributes with a specific BFN class, keyed by the type code and the flags octet.
+# The factories build the path attribute BFN from the decoded value.
+ATTR_FACTORIES : dict[tuple[int, int], Callable[[BinaryFieldNode], BaseAttr_BFN]] = {
+    (PathAttributeType.ORIGIN.value, get_attr_flags(PathAttributeType.ORIGIN)): 
+        lambda value_bfn: OriginAttr_BFN(value_bfn),
+    (PathAttributeType.AS_PATH.value, get_attr_flags(PathAttributeType.AS_PATH)): 
+        lambda value_bfn: ASPathAttr_BFN(value_bfn),
+    (PathAttributeType.AS_PATH.value, get_attr_flags(PathAttributeType.AS_PATH, ext_len=True)): 
+        lambda value_bfn: ASPathAttr_BFN(value_bfn, ext_len=True),
+    (PathAttributeType.NEXT_HOP.value, get_attr_flags(PathAttributeType.NEXT_HOP)): 
+        lambda value_bfn: NextHopAttr_BFN(value_bfn),
+    (PathAttributeType.MULTI_EXIT_DISC.value, get_attr_flags(PathAttributeType.MULTI_EXIT_DISC)): 
+        lambda value_bfn: MEDAttr_BFN(value_bfn),
+    (PathAttributeType.LOCAL_PREF.value, get_attr_flags(PathAttributeType.LOCAL_PREF)): 
+        lambda value_bfn: LOCPREFAttr_BFN(value_bfn),
+    (PathAttributeType.COMMUNITIES.value, get_attr_flags(PathAttributeType.COMMUNITIES)): 
+        lambda value_bfn: CommunitiesAttr_BFN(value_bfn),
+    (PathAttributeType.COMMUNITIES.value, get_attr_flags(PathAttributeType.COMMUNITIES, ext_len=True)): 
+        lambda value_bfn: CommunitiesAttr_BFN(value_bfn, ext_len=True),
+}
+
+def decode_path_attribute(view: memoryview, asn_byte_len: int) -> BaseAttr_BFN:
+    """
+    Decode a complete path attribute (flags, type code, length and value).
+    The specific path attribute BFN is used if the flags are the ones it creates,
+    otherwise the flags are kept by a `BaseAttr_BFN`.
+    The value is kept as an `Arbitrary_BFN` if it cannot be decoded.
+    """
+    flags, attr_type_code = view[0], view[1]
+    length_byte_len = 2 if flags & 0x10 else 1
+    value_view = view[2+length_byte_len:]
+    value_bfn = decode_attr_value(attr_type_code, value_view, asn_byte_len)
+    if value_bfn is None:
+        value_bfn = Arbitrary_BFN(bytes(value_view))
+    elif (attr_type_code, flags) in ATTR_FACTORIES:
+        return ATTR_FACTORIES[(attr_type_code, flags)](value_bfn)
+    return BaseAttr_BFN(
+        attr_type_bfn=AttrType_BFN.get_bfn(attr_type_code,
+                                           higher_bits=[(flags >> i) & 1 for i in (7, 6, 5, 4)],
+                                           lower_bits=[(flags >> i) & 1 for i in (3, 2, 1, 0)]),
+        attr_len_bfn=AttrLength_BFN(length_val=len(value_view), length_byte_len=length_byte_len),
+        attr_value_bfn=value_bfn
+    )
+
+def decode_path_attribute_list(view: memoryview, asn_byte_len: int = 2) -> list[BinaryFieldNode]:
+    """
+    Decode the path attributes of the UPDATE message.
+    A truncated tail is kept as an `Arbitrary_BFN`.
+    """
+    attr_list : list[BinaryFieldNode] = []
+    offset = 0
+    while offset + 3 <= len(view):
+        header_len = 4 if view[offset] & 0x10 else 3
+        if offset + header_len > len(view):
+            break
+        end = offset + header_len + bytes2num(view[offset+2:offset+header_len])
+        if end > len(view):
+            break
+        attr_list.append(decode_path_attribute(view[offset:end], asn_byte_len))
+        offset = end
+    if offset < len(view):
+        attr_list.append(Arbitrary_BFN(bytes(view[offset:])))
+    return attr_list
+
+########## Message contents ##########
+
+def decode_update_content(view: memoryview, lazy: bool, asn_byte_len: int) -> UpdateMessageContent_BFN:
+    """Decode the content of the UPDATE message. Return `None` if the lengths do not fit."""
+    if len(view) < 4:
+        return None
+    wroutes_end = 2 + bytes2num(view[0:2])
+    if wroutes_end + 2 > len(view):
+        return None
+    path_attr_end = wroutes_end + 2 + bytes2num(view[wroutes_end:wroutes_end+2])
+    if path_attr_end > len(view):
+        return None
+    return UpdateMessageContent_BFN(
+        wroutes_len_bfn=Length_BFN(0,2),
+        wroutes_bfn=get_bfn_list(WithdrawnRoutes_BFN, view[2:wroutes_end],
+                                 decode_ipv4_prefix_list, lazy),
+        path_attr_len_bfn=Length_BFN(0,2),
+        path_attr_bfn=get_bfn_list(PathAttributes_BFN, view[wroutes_end+2:path_attr_end],
+                                   partial(decode_path_attribute_list, asn_byte_len=asn_byte_len), lazy),
+        nlri_bfn=get_bfn_list(NLRI_BFN, view[path_attr_end:], decode_ipv4_prefix_list, lazy)
+    )
+
+def decode_open_opt_parm(view: memoryview) -> OpenOptParm_BFN:
+    """Decode an optional parameter of the OPEN message."""
+    opt_parm_type_bfn = OpenOptParmType_BFN(OptParmType.CAPABILITY)
+    if view[0] != OptParmType.CAPABILITY.value:
+        opt_parm_type_bfn.set_bval(bytes(view[0:1]))
+    opt_parm_val = bytes(view[2:])
+    if opt_parm_val in OPT_PARM_VALUES:
+        opt_parm_val_bfn = OpenOptParmValue_BFN(OptParmValue(opt_parm_val))
+    else:
+        opt_parm_val_bfn = Arbitrary_BFN(opt_parm_val)
+    return OpenOptParm_BFN(opt_parm_type=opt_parm_type_bfn,
+                           opt_parm_val=opt_parm_val_bfn)
+
+def decode_open_content(view: memoryview) -> OpenMessageContent_BFN:
+    """Decode the content of the OPEN message. Return `None` if the lengths do not fit."""
+    if len(view) < 10 or view[9] != len(view) - 10:
+        return None
+    opt_parm_list : list[OpenOptParm_BFN] = []
+    offset = 10
+    while offset < len(view):
+        if offset + 2 > len(view) or offset + 2 + view[offset+1] > len(view):
+            return None
+        end = offset + 2 + view[offset+1]
+        opt_parm_list.append(decode_open_opt_parm(view[offset:end]))
+        offset = end
+    return OpenMessageContent_BFN(
+        bgp_version_bfn=BGPVersion_BFN(view[0]),
+        asn_bfn=ASN_BFN(bytes2num(view[1:3])),
+        hold_time_bfn=HoldTime_BFN(bytes2num(view[3:5])),
+        bgp_identifier_bfn=IPv4Address_BFN(decode_ipv4_address(view[5:9])),
+        opt_parm_bfn=OpenOptParmList_BFN(opt_parm_list)
+    )
+
+########## Messages ##########
+
+def decode_message_inner(view: memoryview, lazy: bool, asn_byte_len: int) -> BinaryFieldNode:
+    """The inner function called by `decode_message`."""
+    if len(view) < BGP_HEADER_LEN:
+        return Arbitrary_BFN(bytes(view))
+    header_marker_bfn = HeaderMarker_BFN()
+    if view[0:16] != BGP_HEADER_MARKER:
+        header_marker_bfn.set_bval(bytes(view[0:16]))
+    length_val = bytes2num(view[16:18])
+    length_bfn = Length_BFN(length_val=length_val,
+                            length_byte_len=2,
+                            include_myself=True)
+    if length_val != len(view):
+        # Detach the length field, so it is not recomputed from the content.
+        length_bfn.set_length(length_val)
+    message_type_val = view[18]
+    content_view = view[BGP_HEADER_LEN:]
+    message_bfn : BaseMessage_BFN = None
+    if message_type_val == MessageType.UPDATE.value:
+        content_bfn = decode_update_content(content_view, lazy, asn_byte_len)
+        if content_bfn is not None:
+            message_bfn = UpdateMessage_BFN(content_bfn,
+                                            header_marker_bfn=header_marker_bfn,
+                                            length_bfn=length_bfn)
+    elif message_type_val == MessageType.OPEN.value:
+        content_bfn = decode_open_content(content_view)
+        if content_bfn is not None:
+            message_bfn = OpenMessage_BFN(content_bfn,
+                                          header_marker_bfn=header_marker_bfn,
+                                          length_bfn=length_bfn)
+    elif message_type_val == MessageType.KEEPALIVE.value and len(content_view) == 0:
+        message_bfn = KeepAliveMessage_BFN(KeepAliveMessageContent_BFN(),
+                                           header_marker_bfn=header_marker_bfn,
+                                           length_bfn=length_bfn)
+    if message_bfn is None:
+        # Keep the content as raw bytes.
+        if message_type_val in MESSAGE_TYPE_VALUES:
+            message_type_bfn = MessageType_BFN(MessageType(message_type_val))
+        else:
+            message_type_bfn = MessageType_BFN()
+            message_type_bfn.set_bval(bytes(view[18:19]))
+        message_bfn = BaseMessage_BFN(message_type_bfn=message_type_bfn,
+                                      message_content_bfn=Arbitrary_BFN(bytes(content_view)),
+                                      header_marker_bfn=header_marker_bfn,
+                                      length_bfn=length_bfn)
+    return message_bfn
+
+def decode_message(view: memoryview, lazy: bool, asn_byte_len: int) -> BinaryFieldNode:
+    """
+    Decode a single BGP message into its BFN tree. See `parse_message_bfn`.
+    `view` must refer to an immutable buffer, since the lazy BFN lists keep referring to it.
+    """
+    # The BFNs are built bottom-up from the decoded values, so the updates are not propagated
+    # (the lengths are computed from the siblings only), the check below guards the result.
+    message_bfn = construct(partial(decode_message_inner, lazy=lazy, asn_byte_len=asn_byte_len), view)
+    if message_bfn.get_binary_expression() != view:
+        # Should not happen, but never return a BFN that cannot reproduce the input.
+        return Arbitrary_BFN(bytes(view))
+    return message_bfn
+
+def parse_message_bfn(data: BytesLike,
+                      lazy: bool = True,
+                      asn_byte_len: int = 2) -> BinaryFieldNode:
+    """
+    Parse a single BGP message into its BFN tree.
+    --------------------
+    If `lazy` is set to be True, the withdrawn routes, path attributes and NLRI
+    are kept undecoded until their BFN lists are accessed (e.g. by a mutation).
+    The lazy lists refer to `data`, mutable buffers are copied first.
+    --------------------
+    `asn_byte_len` is the byte length of the AS numbers in AS_PATH (4 if the 4-octet AS capability is used).
+    --------------------
+    The binary expression of the returned BFN is always `data`.
+    Fields that cannot be decoded are kept as raw bytes,
+    and the length field is detached if it does not match the message.
+    """
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    return decode_message(memoryview(data), lazy, asn_byte_len)
+
+def parse_message_bfns(data: BytesLike,
+                       lazy: bool = True,
+                       asn_byte_len: int = 2) -> list[BinaryFieldNode]:
+    """Parse the byte stream of BGP messages into BFN trees. See `parse_message_bfn`."""
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    return [decode_message(view, lazy, asn_byte_len) for view in get_message_views(data)]
+
+def parse_message(data: BytesLike,
+                  lazy: bool = True,
+                  asn_byte_len: int = 2) -> Message:
+    """
+    Parse a single BGP message into a `Message`.
+    Messages without a specific message class are returned as `RawMessage`.
+    """
+    message_bfn = parse_message_bfn(data, lazy, asn_byte_len)
+    if isinstance(message_bfn, UpdateMessage_BFN):
+        return UpdateMessage(message_bfn)
+    if isinstance(message_bfn, OpenMessage_BFN):
+        return OpenMessage(message_bfn)
+    if isinstance(message_bfn, KeepAliveMessage_BFN):
+        return KeepAliveMessage(message_bfn)
+    return RawMessage(message_bfn.get_binary_expression())
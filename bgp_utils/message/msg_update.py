@@ -7,6 +7,9 @@ class WithdrawnRoutes_BFN(BinaryFieldList_BFN):
     """
     BGP Withdrawn Routes field in the BGP UPDATE message.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  bfn_list : list[IPv4Prefix_BFN]):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -16,6 +19,9 @@ class PathAttributes_BFN(BinaryFieldList_BFN):
     """
     BGP Path Attributes field in the BGP UPDATE message.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  bfn_list : list[BaseAttr_BFN]):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -25,6 +31,9 @@ class NLRI_BFN(BinaryFieldList_BFN):
     """
     BGP Network Layer Reachability Information (NLRI) field in the BGP UPDATE message.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  bfn_list : list[IPv4Prefix_BFN]):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -46,6 +55,9 @@ class UpdateMessageContent_BFN(MessageContent_BFN):
     """
     BGP UPDATE message content.
     """
+
+    __slots__ = ("wroutes_len_key", "wroutes_key", "path_attr_len_key", "path_attr_key", "nlri_key")
+
     def __init__(self,
                  wroutes_len_bfn: Length_BFN,
                  wroutes_bfn: WithdrawnRoutes_BFN,
@@ -58,10 +70,6 @@ class UpdateMessageContent_BFN(MessageContent_BFN):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(UpdateMessageContent_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -139,6 +147,9 @@ class UpdateMessage_BFN(BaseMessage_BFN):
     """
     BGP UPDATE message.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  message_content_bfn: UpdateMessageContent_BFN,
                  header_marker_bfn: HeaderMarker_BFN = None,
@@ -162,10 +173,6 @@ class UpdateMessage_BFN(BaseMessage_BFN):
                          header_marker_bfn=header_marker_bfn,
                          length_bfn = length_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(UpdateMessage_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
@@ -0,0 +1,169 @@
+from typing import Iterable, Union
+import random
+import numpy as np
+
+class MutationSampler:
+    """
+    Sample the index of a mutation strategy according to unnormalized weights.
+    -----------------------------
+    The weights are kept in a Fenwick tree, so multiplying one weight costs O(log n)
+    and the weights are never normalized explicitly.
+    An alias table is built lazily once the weights have stayed unchanged for `len(self)` draws,
+    then each draw costs O(1) (two random numbers and one comparison).
+    `draw_batch` draws many indices with the alias table in one vectorized NumPy call.
+    -----------------------------
+    The tree is updated with deltas, which accumulates rounding errors when the total weight
+    shrinks or grows a lot, so it is rebuilt from the exact weights (and rescaled) once
+    the total weight leaves `[base_total / RESCALE_RATIO, base_total * RESCALE_RATIO]`.
+    """
+
+    __slots__ = ("raw_weights", "tree", "total", "base_total",
+                 "alias_prob", "alias_index", "alias_arrays", "draws_since_update")
+
+    # See the docstring of the class.
+    RESCALE_RATIO = 2.0 ** 20
+
+    def __init__(self, weights: Union[Iterable[float], np.ndarray]):
+        """Initialize the sampler, the weights need not be normalized."""
+        self.set_weights(weights)
+
+    @classmethod
+    def uniform(cls, size: int) -> "MutationSampler":
+        """Get a sampler with `size` uniform weights."""
+        return cls([1.0] * size)
+
+    def __len__(self) -> int:
+        return len(self.raw_weights)
+
+    def copy(self) -> "MutationSampler":
+        """Get an independent copy of the sampler."""
+        sampler = object.__new__(MutationSampler)
+        sampler.raw_weights = list(self.raw_weights)
+        sampler.tree = list(self.tree)
+        sampler.total = self.total
+        sampler.base_total = self.base_total
+        # The alias table is never modified in place, so it can be shared.
+        sampler.alias_prob = self.alias_prob
+        sampler.alias_index = self.alias_index
+        sampler.alias_arrays = self.alias_arrays
+        sampler.draws_since_update = self.draws_since_update
+        return sampler
+
+    def __getstate__(self):
+        """Only pickle the weights, the tree and the alias table are rebuilt."""
+        return {"raw_weights": self.raw_weights}
+
+    def __setstate__(self, state: dict):
+        self.set_weights(state["raw_weights"])
+
+    ########## Weights ##########
+
+    def set_weights(self, weights: Union[Iterable[float], np.ndarray]):
+        """Replace all the weights, the weights need not be normalized."""
+        self.raw_weights = [float(weight) for weight in weights]
+        if any(weight < 0 for weight in self.raw_weights) or sum(self.raw_weights) <= 0:
+            raise ValueError(f"Invalid weights {self.raw_weights}, they must be non-negative with a positive sum.")
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Rescale the weights to sum to 1 and rebuild the Fenwick tree from them, in O(n).
+        The probabilities do not change.
+        """
+        total = sum(self.raw_weights)
+        self.raw_weights = [weight / total for weight in self.raw_weights]
+        # tree[i] (1-indexed) is the sum of the weights in (i - lowbit(i), i].
+        tree = [0.0] + self.raw_weights
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.total = 1.0
+        self.base_total = 1.0
+        self.invalidate_alias_table()
+
+    def scale_weight(self, index: int, factor: float):
+        """Multiply the weight of `index` by `factor` in O(log n)."""
+        old_weight = self.raw_weights[index]
+        new_weight = old_weight * factor
+        self.raw_weights[index] = new_weight
+        delta = new_weight - old_weight
+        tree = self.tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+        self.total += delta
+        self.invalidate_alias_table()
+        if not (self.base_total / self.RESCALE_RATIO <= self.total <= self.base_total * self.RESCALE_RATIO):
+            self.rebuild()
+
+    def get_probabilities(self) -> np.ndarray:
+        """Get the normalized weights."""
+        weights = np.array(self.raw_weights)
+        return weights / np.sum(weights)
+
+    ########## Draw ##########
+
+    def invalidate_alias_table(self):
+        self.alias_prob = None
+        self.alias_index = None
+        self.alias_arrays = None
+        self.draws_since_update = 0
+
+    def build_alias_table(self):
+        """Build the alias table (Vose's method) from the current weights in O(n)."""
+        size = len(self.raw_weights)
+        total = sum(self.raw_weights)
+        scaled = [weight * size / total for weight in self.raw_weights]
+        alias_prob = [1.0] * size
+        alias_index = list(range(size))
+        small = [i for i, prob in enumerate(scaled) if prob < 1.0]
+        large = [i for i, prob in enumerate(scaled) if prob >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            alias_prob[less] = scaled[less]
+            alias_index[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # The remaining ones are 1 up to rounding errors, keep them.
+        self.alias_prob = alias_prob
+        self.alias_index = alias_index
+
+    def draw(self) -> int:
+        """Draw one index according to the weights."""
+        if self.alias_prob is not None:
+            i = int(random.random() * len(self.alias_prob))
+            return i if random.random() < self.alias_prob[i] else self.alias_index[i]
+        self.draws_since_update += 1
+        if self.draws_since_update >= len(self.raw_weights):
+            # The weights seem to be stable, switch to the alias table.
+            self.build_alias_table()
+        return self.draw_from_tree()
+
+    def draw_from_tree(self) -> int:
+        """Draw one index by descending the Fenwick tree in O(log n)."""
+        tree = self.tree
+        size = len(tree) - 1
+        target = random.random() * self.total
+        pos = 0
+        mask = 1 << (size.bit_length() - 1)
+        while mask:
+            next_pos = pos + mask
+            if next_pos <= size and tree[next_pos] <= target:
+                target -= tree[next_pos]
+                pos = next_pos
+            mask >>= 1
+        # `pos` is the 0-indexed result, the rounding errors may push it out of range.
+        return min(pos, size - 1)
+
+    def draw_batch(self, num: int) -> np.ndarray:
+        """Draw `num` indices according to the weights, return an int64 array."""
+        if self.alias_prob is None:
+            self.build_alias_table()
+        if self.alias_arrays is None:
+            self.alias_arrays = (np.array(self.alias_prob), np.array(self.alias_index, dtype=np.int64))
+        alias_prob, alias_index = self.alias_arrays
+        columns = np.random.randint(0, len(alias_prob), size=num)
+        return np.where(np.random.random(num) < alias_prob[columns], columns, alias_index[columns])
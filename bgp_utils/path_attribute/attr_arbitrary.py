@@ -6,6 +6,9 @@ class Arbitrary_BFN(BinaryFieldNode):
     """
     Value of arbitrary BGP path attribute.
     """
+
+    __slots__ = ("value",)
+
     def __init__(self,
                  value: bytes):
         """Initialize the Arbitrary attribute value BFN."""
@@ -14,10 +17,6 @@ class Arbitrary_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(Arbitrary_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.value = value
@@ -69,6 +68,9 @@ class ArbitraryAttr_BFN(BaseAttr_BFN):
     """
     Arbitrary BGP path attribute.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  attr_type_bfn: AttrType_BFN,
                  attr_value_bfn: Arbitrary_BFN):
@@ -80,10 +82,6 @@ class ArbitraryAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=AttrLength_BFN(length_val=1),
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(ArbitraryAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
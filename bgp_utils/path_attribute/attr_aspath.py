@@ -19,6 +19,9 @@ class PathSegmentType_BFN(BinaryFieldNode):
     """
     Path segment type BFN.
     """
+
+    __slots__ = ("path_segment_type",)
+
     def __init__(self, 
                  path_segment_type: PathSegementType):
         """Initialize the path segment type BFN."""
@@ -27,10 +30,6 @@ class PathSegmentType_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(PathSegmentType_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.path_segment_type : PathSegmentType_BFN = path_segment_type
@@ -89,6 +88,8 @@ class PathSegmentLength_BFN(Length_BFN):
     Inherit the `Length_BFN` field.
     """
 
+    __slots__ = ()
+
     def __init__(self,
                  length_val: int):
         """
@@ -101,16 +102,18 @@ class PathSegmentLength_BFN(Length_BFN):
                          length_byte_len=1,
                          include_myself=False)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(PathSegmentLength_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
         return "PathSegmentLength_BFN"
     
     ######### Update according to dependencies ##########
+
+    def get_length_dependencies(self) -> list[BinaryFieldNode]:
+        """
+        The value is the number of ASes, not a sum of binary lengths.
+        """
+        return []
     
     def update_on_dependencies_inner(self):
         """
@@ -127,6 +130,9 @@ class ASNList_BFN(BinaryFieldList_BFN):
     BGP AS number list.
     When inheriting `BinaryFieldList_BFN`, only need to rewrite the `__init__` method
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  bfn_list : list[ASN_BFN]):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -138,6 +144,8 @@ class PathSegment_BFN(BinaryFieldNode):
     """
     BGP Path Segment path attribute BFN.
     """
+
+    __slots__ = ("pathseg_type_key", "pathseg_len_key", "pathseg_val_key")
     
     def __init__(self,
                  pathseg_type_bfn: PathSegmentType_BFN,
@@ -151,10 +159,6 @@ class PathSegment_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(PathSegment_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -237,6 +241,9 @@ class ASPath_BFN(BinaryFieldList_BFN):
     """
     Value of BGP AS_PATH path attribute. 
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  pathseg_list: list[PathSegment_BFN]):
         """Initialize the Origin attribute type BFN."""
@@ -246,10 +253,6 @@ class ASPath_BFN(BinaryFieldList_BFN):
         super().__init__(bfn_list=pathseg_list,
                          list_element_name=PathSegment_BFN.get_bfn_name())
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(ASPath_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     ########## Factory methods: Create an instance of the class ##########
 
     @classmethod
@@ -331,6 +334,9 @@ class ASPathAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute AS_PATH.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: ASPath_BFN, 
                  attr_len_bfn: AttrLength_BFN = None,
@@ -348,10 +354,6 @@ class ASPathAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=attr_len_bfn,
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(ASPathAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
@@ -61,6 +61,10 @@ class AttrType_BFN(BinaryFieldNode):
     """
     BGP path attribute type.
     """
+
+    __slots__ = ("is_optional", "is_transitive", "is_partial", "ext_len", "lower_bits",
+                 "attr_type_code", "attr_type")
+
     def __init__(self,
                  attr_type: PathAttributeType = PathAttributeType.RESERVED,
                  is_partial: bool = False,
@@ -71,10 +75,6 @@ class AttrType_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(AttrType_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         is_optional, is_transitive = calculate_attr_type_property(attr_type)
@@ -230,6 +230,8 @@ class AttrLength_BFN(Length_BFN):
     Inherit the `Length_BFN` field.
     """
 
+    __slots__ = ()
+
     def __init__(self, 
                  length_val: int, 
                  length_byte_len: int = 1):
@@ -241,16 +243,20 @@ class AttrLength_BFN(Length_BFN):
                          length_byte_len=length_byte_len,
                          include_myself=False)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(AttrLength_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
         return "AttrLength_BFN"
 
     ######### Update according to dependencies ##########
+
+    def get_length_dependencies(self) -> list[BinaryFieldNode]:
+        """
+        Get the dependencies whose binary lengths are summed up in the length value.
+        The attribute type only decides the byte length of the field.
+        """
+        return [dependency_value for dependency_key, dependency_value in self.dependencies.items()
+                if not dependency_key.startswith(AttrType_BFN.get_bfn_name())]
     
     def update_on_dependencies_inner(self):
         """
@@ -272,6 +278,9 @@ class BaseAttr_BFN(BinaryFieldNode):
     BGP Base Path Attribute.
     This can be inherited by more specific path attribute types. 
     """
+
+    __slots__ = ("attr_type_key", "attr_len_key", "attr_value_key")
+
     def __init__(self,
                  attr_type_bfn: AttrType_BFN,
                  attr_len_bfn: AttrLength_BFN,
@@ -282,10 +291,6 @@ class BaseAttr_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(BaseAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
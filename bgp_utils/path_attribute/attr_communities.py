@@ -30,6 +30,9 @@ class WellKnownCommunities(Enum):
 
 class SingleCommunity_BFN(BinaryFieldNode):
     """Single BGP Community."""
+
+    __slots__ = ("asn", "operation")
+
     def __init__(self,
                  asn: int,
                  operation: int):
@@ -39,10 +42,6 @@ class SingleCommunity_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(SingleCommunity_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.asn : int = asn
@@ -149,6 +148,9 @@ class Communities_BFN(BinaryFieldList_BFN):
     """
     Value of BGP COMMUNITIES attribute.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  single_community_list: list[SingleCommunity_BFN]):
         """Iitialize the BGP COMMUNITIES value."""
@@ -158,14 +160,14 @@ class Communities_BFN(BinaryFieldList_BFN):
         super().__init__(bfn_list=single_community_list,
                          list_element_name=SingleCommunity_BFN.get_bfn_name())
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(Communities_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
 
 class CommunitiesAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute COMMUNITIES.
     """    
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: Communities_BFN,
                  ext_len: bool = False):
@@ -177,10 +179,6 @@ class CommunitiesAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=AttrLength_BFN(length_val=4),
                          attr_value_bfn=attr_value_bfn,)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(CommunitiesAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
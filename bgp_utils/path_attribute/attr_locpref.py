@@ -6,6 +6,9 @@ class LOCPREF_BFN(Number_BFN):
     """
     Value of BGP LOCAL_PREF (MED) attribute.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  local_pref: int):
         """Initialize the LOCAL_PREF BFN."""
@@ -14,10 +17,6 @@ class LOCPREF_BFN(Number_BFN):
 
         super().__init__(num_val=local_pref, num_len=4)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(LOCPREF_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -64,6 +63,9 @@ class LOCPREFAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute LOCAL_PREF.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: LOCPREF_BFN):
         """Initialize the BGP LOCAL_PREF path attribute."""
@@ -74,10 +76,6 @@ class LOCPREFAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=AttrLength_BFN(length_val=4),
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(LOCPREFAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
@@ -6,6 +6,9 @@ class MED_BFN(Number_BFN):
     """
     Value of BGP MULTI_EXIT_DISC (MED) attribute.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  med: int):
         """Initialize the MED BFN."""
@@ -14,10 +17,6 @@ class MED_BFN(Number_BFN):
 
         super().__init__(num_val=med, num_len=4)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MED_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -64,6 +63,9 @@ class MEDAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute MULTI_EXIT_DISC.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: MED_BFN):
         """Initialize the BGP MULTI_EXIT_DISC path attribute."""
@@ -74,10 +76,6 @@ class MEDAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=AttrLength_BFN(length_val=4),
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MEDAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
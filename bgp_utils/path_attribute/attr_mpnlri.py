@@ -28,6 +28,9 @@ class AFI_BFN(BinaryFieldNode):
     """
     Address Family Identifier (AFI) BFN
     """
+
+    __slots__ = ("afi",)
+
     def __init__(self, 
                  afi: AFI):
         """Initialize the AFI BFN."""
@@ -36,10 +39,6 @@ class AFI_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(AFI_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.afi : AFI = afi
@@ -112,6 +111,9 @@ class SAFI_BFN(BinaryFieldNode):
     """
     Subsequent Address Family Identifier (SAFI)
     """
+
+    __slots__ = ("safi",)
+
     def __init__(self, 
                  safi: SAFI):
         """Initialize the SAFI BFN."""
@@ -120,10 +122,6 @@ class SAFI_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(SAFI_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.safi : SAFI = safi
@@ -196,6 +194,9 @@ class MPNLRI_BFN(BinaryFieldList_BFN):
     """
     BGP Network Layer Reachability Information (NLRI) for MultiProtocol BGP.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  bfn_list : list):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -207,6 +208,9 @@ class MPWithdrawnRoutes_BFN(BinaryFieldList_BFN):
     """
     BGP Withdrawn Routes field for MultiProtocol BGP.
     """
+
+    __slots__ = ()
+
     def __init__(self,
                  bfn_list : list):
         """Initialize by calling BinaryFieldList_BFN's `__init__` method."""
@@ -230,6 +234,10 @@ class MPReachNLRI_BFN(BinaryFieldNode):
     """
     Value of BGP MP_REACH_NLRI path attribute. 
     """
+
+    __slots__ = ("afi_key", "safi_key", "mp_nexthop_len_key", "mp_nexthop_key",
+                 "reserved_key", "mp_nlri_key")
+
     def __init__(self,
                  afi_bfn: AFI_BFN,
                  safi_bfn: SAFI_BFN,
@@ -250,10 +258,6 @@ class MPReachNLRI_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MPReachNLRI_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -367,6 +371,9 @@ class MPUnreachNLRI_BFN(BinaryFieldNode):
     """
     Value of BGP MP_UNREACH_NLRI path attribute. 
     """
+
+    __slots__ = ("afi_key", "safi_key", "mp_wroutes_key")
+
     def __init__(self,
                  afi_bfn: AFI_BFN,
                  safi_bfn: SAFI_BFN,
@@ -377,10 +384,6 @@ class MPUnreachNLRI_BFN(BinaryFieldNode):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MPUnreachNLRI_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         # No special attributes
@@ -465,6 +468,9 @@ class MPReachNLRIAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute MP_REACH_NLRI.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: MPReachNLRI_BFN, 
                  attr_len_bfn: AttrLength_BFN = None):
@@ -481,10 +487,6 @@ class MPReachNLRIAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=attr_len_bfn,
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MPReachNLRIAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
@@ -580,6 +582,9 @@ class MPUnreachNLRIAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute MP_UNREACH_NLRI.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: MPUnreachNLRI_BFN, 
                  attr_len_bfn: AttrLength_BFN = None):
@@ -596,10 +601,6 @@ class MPUnreachNLRIAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=attr_len_bfn,
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(MPUnreachNLRIAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
@@ -8,6 +8,9 @@ class NextHopAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute NEXT_HOP.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: NextHop_BFN):
         """Initialize the BGP NEXT_HOP path attribute."""
@@ -18,10 +21,6 @@ class NextHopAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=AttrLength_BFN(length_val=4),
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(NextHopAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
@@ -17,6 +17,9 @@ class Origin_BFN(AttrValue_BFN):
     """
     Value of BGP ORIGIN path attribute. 
     """
+
+    __slots__ = ("origin_type",)
+
     def __init__(self,
                  origin_type: OriginType):
         """Initialize the Origin attribute type BFN."""
@@ -25,10 +28,6 @@ class Origin_BFN(AttrValue_BFN):
 
         super().__init__()
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(Origin_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-
         ###### special attributes ######
 
         self.origin_type : OriginType = origin_type
@@ -86,6 +85,9 @@ class OriginAttr_BFN(BaseAttr_BFN):
     """
     BGP path attribute ORIGIN.
     """
+
+    __slots__ = ()
+
     def __init__(self, 
                  attr_value_bfn: Origin_BFN):
         """Initialize the BGP ORIGIN path attribute."""
@@ -96,10 +98,6 @@ class OriginAttr_BFN(BaseAttr_BFN):
                          attr_len_bfn=AttrLength_BFN(length_val=1),
                          attr_value_bfn=attr_value_bfn)
 
-        ###### Set the weights ######
-        self.weights = np.ones(len(OriginAttr_BFN.mutation_set))
-        self.weights /= np.sum(self.weights)
-    
     @classmethod
     def get_bfn_name(cls) -> str:
         """Get the name of the BFN."""
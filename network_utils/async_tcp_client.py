@@ -0,0 +1,52 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from .tcp_client import BGPClient, TCPClientConfiguration
+from .mrt_tap import MRTTap
+
+class AsyncBGPClient:
+    """
+    The asyncio version of `BGPClient`, so the replies of the speaker are read and framed the same way
+    (e.g. a NOTIFICATION ends the testcase) by the reader thread of `BGPClient`.
+    The blocking calls run in a thread of their own: `TCPClient.start` enters the network namespace
+    in the calling thread until `end`, so the other threads (and the event loop) are not affected.
+    You must use `TCPClientConfiguration` to initialize.
+    """
+    def __init__(self, configuration: TCPClientConfiguration):
+        self.client = BGPClient(configuration)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bgp_client")
+
+    @property
+    def configuration(self) -> TCPClientConfiguration:
+        return self.client.configuration
+
+    @property
+    def tap(self) -> MRTTap:
+        return self.client.tap
+
+    @tap.setter
+    def tap(self, tap: MRTTap):
+        self.client.tap = tap
+
+    async def call(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def start(self) -> bool:
+        return await self.call(self.client.start)
+
+    async def send(self, message: bytes) -> bool:
+        return await self.call(self.client.send, message)
+
+    async def send_burst(self, messages: list[bytes]) -> bool:
+        return await self.call(self.client.send_burst, messages)
+
+    async def end(self):
+        await self.call(self.client.end)
+
+    def is_session_closed(self) -> bool:
+        return self.client.is_session_closed()
+
+    def describe_close(self) -> str:
+        return self.client.describe_close()
+
+    async def dump_received(self, path: str):
+        await self.call(self.client.dump_received, path)
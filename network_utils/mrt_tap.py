@@ -0,0 +1,83 @@
+"""
+The capture tap writing the messages of the tester session as MRT records (RFC 6396),
+so the messages of a testcase are dumped by the tester instead of by the routing software.
+"""
+
+import socket, struct, threading
+from time import time
+
+# The MRT type BGP4MP_ET (BGP4MP with microsecond timestamps), and its subtypes of the messages.
+# The tester does not advertise the 4-octet AS capability, so the messages carry 2-byte AS numbers
+# and the subtypes are the 2-byte ones (not `BGP4MP_MESSAGE_AS4`), otherwise the AS_PATHs are misread.
+MRT_TYPE_BGP4MP_ET = 17
+BGP4MP_MESSAGE = 1
+BGP4MP_MESSAGE_LOCAL = 6
+AFI_IPV4 = 1
+# Stands for the AS numbers beyond 2 bytes (RFC 6793).
+AS_TRANS = 23456
+# The buffer size of the MRT file (in bytes), the records are written when the tap is closed at the latest.
+MRT_BUFFER_SIZE = 1 << 16
+
+def get_2byte_asn(asn: int) -> int:
+    return asn if asn <= 0xffff else AS_TRANS
+
+class MRTTap:
+    """
+    Write the messages between the tester and the routing software as BGP4MP_ET records,
+    from the point of view of the routing software (the peer is the tester), like its own dump:
+    the messages sent by the tester are `BGP4MP_MESSAGE` (received by the routing software),
+    the ones sent by the routing software are `BGP4MP_MESSAGE_LOCAL`.
+    The records are timestamped when the messages are handed to the kernel or framed from the stream,
+    and written by both the sending thread and the reader of `BGPClient`.
+    """
+    def __init__(self,
+                 path: str,
+                 tester_ip: str,
+                 tester_asn: int,
+                 router_ip: str,
+                 router_asn: int):
+        self.path = path
+        self.file = open(path, 'wb', buffering=MRT_BUFFER_SIZE)
+        self.lock = threading.Lock()
+        # The part of the records after the MRT header:
+        # peer AS, local AS, interface index, AFI, peer IP, local IP.
+        self.peer_header = struct.pack('!HHHH4s4s', get_2byte_asn(tester_asn), get_2byte_asn(router_asn), 0, AFI_IPV4,
+                                       socket.inet_aton(tester_ip), socket.inet_aton(router_ip))
+        self.record_num = 0
+
+    def write_record(self, subtype: int, message: bytes, timestamp: float):
+        seconds = int(timestamp)
+        microseconds = int((timestamp - seconds) * 1e6)
+        # The length covers the microsecond timestamp of the _ET types.
+        header = struct.pack('!IHHII', seconds, MRT_TYPE_BGP4MP_ET, subtype,
+                             4 + len(self.peer_header) + len(message), microseconds)
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(header)
+            self.file.write(self.peer_header)
+            self.file.write(message)
+            self.record_num += 1
+
+    def record_sent(self, messages: list[bytes]):
+        """
+        Record the messages sent by the tester.
+        """
+        timestamp = time()
+        for message in messages:
+            self.write_record(BGP4MP_MESSAGE, message, timestamp)
+
+    def record_received(self, message: bytes):
+        """
+        Record a message sent by the routing software.
+        """
+        self.write_record(BGP4MP_MESSAGE_LOCAL, message, time())
+
+    def close(self):
+        """
+        Flush the records and close the file.
+        """
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -1,6 +1,12 @@
-import socket, os
+import socket, os, select, threading, struct, fcntl, termios, json
 from dataclasses import dataclass
+from collections import deque
+from time import monotonic, sleep
 from pyroute2 import netns
+from basic_utils.wait_utils import wait_until
+from bgp_utils.message import MessageType
+from bgp_utils.message.msg_parser import BGP_HEADER_LEN
+from .mrt_tap import MRTTap
 
 @dataclass
 class TCPClientConfiguration:
@@ -15,6 +21,16 @@ class TCPClientConfiguration:
     bind_val : tuple
     # the name of the network namespace
     netns: str = None
+    # send the consecutive messages of a testcase (not separated by `Halt`) in one go, see `TCPClient.send_burst`
+    burst : bool = False
+    # if set, a burst is written in chunks of `segment_size` bytes with `TCP_NODELAY`,
+    # e.g. a small size splits the messages across TCP segments
+    segment_size : int = None
+    # the pause (in seconds) between the chunks, so they are not coalesced into one segment
+    segment_interval : float = 0
+    # the messages of the session are dumped by the client itself instead of by the routing software,
+    # see `MRTTap` and `TapCapture`
+    mrt_tap : bool = False
 
 class TCPClient:
     """
@@ -47,6 +63,9 @@ class TCPClient:
             if self.configuration.bind_val is not None:
                 self.socket.bind(self.configuration.bind_val)
             self.socket.connect((self.configuration.host, self.configuration.port))
+            if self.configuration.segment_size is not None:
+                # Write each chunk of a burst as soon as possible, see `send_segmented`.
+                self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.connected = True
             print(f"Connected to {self.configuration.host}:{self.configuration.port}")
             return True
@@ -70,6 +89,43 @@ class TCPClient:
             self.connected = False
             return False
 
+    def send_burst(self, messages: list[bytes]):
+        """
+        Send the messages in one go instead of one `sendall` per message:
+        they are joined into one buffer written by a single `sendall`
+        (much cheaper than a `sendmsg` scatter-gather over many small messages),
+        or in chunks of `segment_size` bytes if it is configured (see `send_segmented`).
+        """
+        if not self.connected:
+            print("Not connected to server")
+            return False
+        try:
+            if self.configuration.segment_size is None:
+                self.socket.sendall(b''.join(messages))
+            else:
+                self.send_segmented(b''.join(messages),
+                                    self.configuration.segment_size,
+                                    self.configuration.segment_interval)
+            return True
+        except Exception as e:
+            print(f"Send failed: {e}")
+            self.connected = False
+            return False
+
+    def send_segmented(self, data: bytes, segment_size: int, segment_interval: float = 0):
+        """
+        Write the data in chunks of `segment_size` bytes, pausing `segment_interval` seconds in between.
+        With `TCP_NODELAY` (set by `start`) and a pause, each chunk is sent in its own TCP segment,
+        so a message can be deliberately split across segments.
+        """
+        if segment_size <= 0:
+            raise ValueError(f"Invalid segment size {segment_size}!")
+        view = memoryview(data)
+        for offset in range(0, len(view), segment_size):
+            if offset > 0 and segment_interval > 0:
+                sleep(segment_interval)
+            self.socket.sendall(view[offset:offset+segment_size])
+
     def receive(self, buffer_size=1024):
         """
         Receive data from the server
@@ -120,8 +176,290 @@ class TCPClient:
         """
         self.end()
 
+@dataclass
+class ReceivedMessage:
+    """
+    A BGP message received from the remote BGP speaker.
+    """
+    # the time it is received (by `time.monotonic`)
+    time : float
+    # the type code in the header (not necessarily a valid `MessageType`)
+    message_type : int
+    # the whole message, including the header
+    data : bytes
+
+    def describe(self) -> str:
+        if self.message_type == MessageType.NOTIFICATION.value and len(self.data) >= BGP_HEADER_LEN + 2:
+            return f"NOTIFICATION {self.data[BGP_HEADER_LEN]}/{self.data[BGP_HEADER_LEN+1]}"
+        try:
+            return MessageType(self.message_type).name
+        except ValueError:
+            return f"type {self.message_type}"
+
 class BGPClient(TCPClient):
     """
     The BGP client used for communicating with the remote BGP speaker. 
+    A background thread reads the messages of the speaker (OPEN, KEEPALIVE, NOTIFICATION, ...),
+    framed by the length field of their headers, so a NOTIFICATION or the close of the session
+    is noticed as soon as it arrives instead of from the log of the speaker.
+    The sent bytes are tracked, so the caller can wait until the speaker
+    has acknowledged them at the TCP level (see `send_messages`).
     """
-    pass
+    # The interval (in seconds) the reader checks if it should stop.
+    READ_POLL_INTERVAL = 0.1
+    # The interval (in seconds) the reader checks the acknowledged bytes while some are pending.
+    ACK_POLL_INTERVAL = 0.002
+    # The maximum length of a BGP message (RFC 8654 extended messages).
+    MAX_MESSAGE_LEN = 65535
+
+    def __init__(self, configuration = TCPClientConfiguration):
+        super().__init__(configuration)
+        self.reader_thread : threading.Thread = None
+        self.stop_event = threading.Event()
+        # Written to wake up the reader, e.g. when acknowledgements become pending.
+        self.wakeup_fds : tuple[int, int] = None
+        # Record the sent and received messages if set, see `TapCapture`.
+        self.tap : MRTTap = None
+        self.reset_session_state()
+
+    def reset_session_state(self):
+        self.received_messages : list[ReceivedMessage] = []
+        # The first NOTIFICATION received, if any.
+        self.notification : ReceivedMessage = None
+        self.notification_event = threading.Event()
+        # Set when the speaker closes the connection (or the stream cannot be framed).
+        self.closed_event = threading.Event()
+        # Notified when a message is received or the connection is closed.
+        self.message_condition = threading.Condition()
+        self.buffer = bytearray()
+        # The number of bytes handed to the kernel, and the pending acknowledgements
+        # as `(end offset in the stream, event)`.
+        self.bytes_sent = 0
+        self.pending_acks : deque[tuple[int, threading.Event]] = deque()
+        self.ack_lock = threading.Lock()
+
+    ########## Connection ##########
+
+    def start(self):
+        """
+        Connect to the speaker and start reading its messages, see `TCPClient.start`.
+        """
+        self.reset_session_state()
+        if not super().start():
+            return False
+        self.stop_event.clear()
+        self.wakeup_fds = os.pipe()
+        os.set_blocking(self.wakeup_fds[1], False)
+        self.reader_thread = threading.Thread(target=self.read_loop, daemon=True)
+        self.reader_thread.start()
+        return True
+
+    def end(self):
+        """
+        Stop the reader and close the connection.
+        """
+        self.stop_event.set()
+        if self.reader_thread is not None:
+            # Wake up the reader.
+            try:
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.reader_thread.join()
+            self.reader_thread = None
+        if self.wakeup_fds is not None:
+            for fd in self.wakeup_fds:
+                os.close(fd)
+            self.wakeup_fds = None
+        super().end()
+
+    def is_session_closed(self) -> bool:
+        """
+        Return if the speaker has sent a NOTIFICATION or closed the connection.
+        """
+        return self.notification_event.is_set() or self.closed_event.is_set()
+
+    def describe_close(self) -> str:
+        if self.notification is not None:
+            return self.notification.describe()
+        return "connection closed"
+
+    ########## Send ##########
+
+    def send(self, message):
+        """
+        Send a message to the server
+        the message must be of type `bytes`
+        """
+        if not super().send(message):
+            return False
+        with self.ack_lock:
+            self.bytes_sent += len(message)
+        tap = self.tap
+        if tap is not None:
+            tap.record_sent([message])
+        return True
+
+    def send_burst(self, messages: list[bytes]):
+        """
+        Send the messages in one go, see `TCPClient.send_burst`.
+        """
+        if not super().send_burst(messages):
+            return False
+        with self.ack_lock:
+            self.bytes_sent += sum(len(message) for message in messages)
+        tap = self.tap
+        if tap is not None:
+            tap.record_sent(messages)
+        return True
+
+    def send_messages(self, messages: list[bytes], ack: bool = False) -> list[threading.Event]:
+        """
+        Send the messages back to back without waiting for the speaker in between.
+        If `ack`, return an event per message, set when the speaker has acknowledged
+        all its bytes at the TCP level (i.e. they are in the socket of the speaker);
+        the events of the unacknowledged messages are never set if the session closes.
+        Return `None` if a message cannot be sent.
+        """
+        events = []
+        for message in messages:
+            if not self.send(message):
+                return None
+            if ack:
+                event = threading.Event()
+                with self.ack_lock:
+                    self.pending_acks.append((self.bytes_sent, event))
+                events.append(event)
+        if events:
+            self.wake_up_reader()
+        return events
+
+    def get_unacked_bytes(self) -> int:
+        """
+        Get the number of sent bytes not acknowledged by the speaker yet (`SIOCOUTQ`).
+        """
+        return struct.unpack('i', fcntl.ioctl(self.socket.fileno(), termios.TIOCOUTQ, b'\0'*4))[0]
+
+    def wait_for_ack(self, timeout: float = None) -> bool:
+        """
+        Wait until the speaker has acknowledged all the sent bytes,
+        return False if the session closes or `timeout` seconds have passed.
+        """
+        if not self.connected:
+            return False
+        event = threading.Event()
+        with self.ack_lock:
+            self.pending_acks.append((self.bytes_sent, event))
+        self.wake_up_reader()
+        return wait_until(lambda: event.is_set() or self.is_session_closed(),
+                          timeout, self.ACK_POLL_INTERVAL) and event.is_set()
+
+    def wake_up_reader(self):
+        if self.wakeup_fds is None:
+            return
+        try:
+            os.write(self.wakeup_fds[1], b'\0')
+        except BlockingIOError:
+            # The reader has not consumed the previous wake-ups yet.
+            pass
+
+    ########## Receive ##########
+
+    def wait_for_message(self,
+                         message_type: MessageType = None,
+                         timeout: float = None,
+                         start_index: int = 0) -> ReceivedMessage:
+        """
+        Wait for the first message (of `message_type` if given) whose index in
+        `received_messages` is at least `start_index`,
+        return `None` if the session closes or `timeout` seconds have passed.
+        """
+        def find_message():
+            for message in self.received_messages[start_index:]:
+                if message_type is None or message.message_type == message_type.value:
+                    return message
+            return None
+        with self.message_condition:
+            self.message_condition.wait_for(lambda: find_message() is not None or self.closed_event.is_set(),
+                                            timeout)
+            return find_message()
+
+    def read_loop(self):
+        """
+        Read and frame the messages of the speaker until the connection is closed or `end` is called.
+        """
+        sock = self.socket
+        wakeup_fd = self.wakeup_fds[0]
+        while not self.stop_event.is_set():
+            with self.ack_lock:
+                interval = self.ACK_POLL_INTERVAL if self.pending_acks else self.READ_POLL_INTERVAL
+            try:
+                readable, _, _ = select.select([sock, wakeup_fd], [], [], interval)
+                if wakeup_fd in readable:
+                    os.read(wakeup_fd, 4096)
+                if sock in readable:
+                    data = sock.recv(self.MAX_MESSAGE_LEN)
+                    if not data:
+                        break
+                    self.buffer += data
+                    if not self.frame_messages():
+                        break
+                self.update_acks()
+            except (OSError, ValueError):
+                break
+        if not self.stop_event.is_set():
+            self.connected = False
+        with self.message_condition:
+            self.closed_event.set()
+            self.message_condition.notify_all()
+
+    def frame_messages(self) -> bool:
+        """
+        Move the complete messages out of the buffer,
+        return False if the stream cannot be framed.
+        """
+        while len(self.buffer) >= BGP_HEADER_LEN:
+            length = (self.buffer[16] << 8) | self.buffer[17]
+            if length < BGP_HEADER_LEN:
+                print(f"Received a message of invalid length {length}")
+                return False
+            if len(self.buffer) < length:
+                return True
+            message = ReceivedMessage(time=monotonic(),
+                                      message_type=self.buffer[18],
+                                      data=bytes(self.buffer[:length]))
+            del self.buffer[:length]
+            tap = self.tap
+            if tap is not None:
+                tap.record_received(message.data)
+            with self.message_condition:
+                self.received_messages.append(message)
+                if message.message_type == MessageType.NOTIFICATION.value and self.notification is None:
+                    self.notification = message
+                    self.notification_event.set()
+                self.message_condition.notify_all()
+        return True
+
+    def update_acks(self):
+        """
+        Set the events of the messages acknowledged by the speaker.
+        """
+        with self.ack_lock:
+            if not self.pending_acks:
+                return
+            acked_bytes = self.bytes_sent - self.get_unacked_bytes()
+            while self.pending_acks and self.pending_acks[0][0] <= acked_bytes:
+                self.pending_acks.popleft()[1].set()
+
+    ########## Dump ##########
+
+    def dump_received(self, path: str):
+        """
+        Write the received messages (in hex) to a JSON file.
+        """
+        with open(path, 'w') as file:
+            json.dump([{
+                "time": message.time,
+                "type": message.describe(),
+                "data": message.data.hex(),
+            } for message in self.received_messages], file, indent=4)
@@ -121,6 +121,20 @@ def is_valid_ipv4_prefix(ip_str: str):
 
     return True
 
+def ipv4_to_int(ip_str: str) -> int:
+    """
+    Convert the IPv4 address in dotted-decimal string into a 32-bit integer.
+    The address is not validated, check it with `is_valid_ipv4` first.
+    """
+    a, b, c, d = ip_str.split('.')
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+def int_to_ipv4(ip_val: int) -> str:
+    """
+    Convert the 32-bit integer into the IPv4 address in dotted-decimal string.
+    """
+    return f"{ip_val >> 24}.{(ip_val >> 16) & 0xff}.{(ip_val >> 8) & 0xff}.{ip_val & 0xff}"
+
 def get_ipv4_prefix_parts(ip_str: str):
     """
     Get the address and prefix length parts of the ipv4 prefix.
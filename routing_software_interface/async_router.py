@@ -0,0 +1,106 @@
+"""
+The asyncio interface of the router.
+"""
+
+import asyncio
+from basic_utils.async_utils import wait_for_file_stable
+from basic_utils.trace_utils import Tracer
+from .basic_types import RouterConfiguration, RouterSoftwareType
+from .router_base import BaseRouter
+from .capture_strategy import CaptureStrategy
+
+class AsyncRouter:
+    """
+    The asyncio version of the router interface wrapping a `BaseRouter`.
+    The blocking calls (e.g. vtysh/birdc subprocesses) run in the default executor,
+    so the event loop keeps running (e.g. writing the dumps of the previous testcase),
+    and the waits are awaitable conditions on the log and the MRT files instead of fixed sleeps.
+    """
+
+    def __init__(self, router: BaseRouter):
+        self.router : BaseRouter = router
+
+    @property
+    def router_configuration(self) -> RouterConfiguration:
+        return self.router.router_configuration
+
+    @property
+    def tracer(self) -> Tracer:
+        return self.router.tracer
+
+    @tracer.setter
+    def tracer(self, tracer: Tracer):
+        self.router.tracer = tracer
+
+    def get_software_type(self) -> RouterSoftwareType:
+        return self.router.get_software_type()
+
+    ########## Turn on/off the instance ##########
+
+    async def start_bgp_instance(self):
+        await asyncio.to_thread(self.router.start_bgp_instance)
+
+    async def end_bgp_instance(self):
+        await asyncio.to_thread(self.router.end_bgp_instance)
+
+    async def reset_neighbor_session(self, peer_ip: str):
+        await asyncio.to_thread(self.router.reset_neighbor_session, peer_ip)
+
+    ########## Dump MRT file ##########
+
+    async def wait_for_routing_table(self, path: str, timeout: float = None) -> bool:
+        """
+        Wait until the dump of `dump_routing_table` is written to `path`,
+        return False if it is not written within `timeout` seconds (`ROUTE_DUMP_TIMEOUT` by default).
+        """
+        if timeout is None:
+            timeout = self.router.ROUTE_DUMP_TIMEOUT
+        return await wait_for_file_stable(path, timeout=timeout)
+
+    ########## Log manipulation ##########
+
+    async def read_log(self) -> str:
+        return await asyncio.to_thread(self.router.read_log)
+
+    async def clear_log(self):
+        await asyncio.to_thread(self.router.clear_log)
+
+    ########## Crash management ##########
+
+    async def is_crashed(self) -> bool:
+        # Cheap enough to be checked in the event loop, see `ProcessMonitor`.
+        return self.router.is_crashed()
+
+    async def recover_from_crash(self):
+        await asyncio.to_thread(self.router.recover_from_crash)
+
+    ########## Other utils ##########
+
+    async def wait_for_log(self,
+                           time_duration: float = 0.1,
+                           pattern: str = None,
+                           timeout: float = None):
+        """
+        The awaitable version of `BaseRouter.wait_for_log`.
+        """
+        with self.router.trace("wait_for_log"):
+            if pattern is not None:
+                return await self.router.log_follower.async_wait_for_pattern(pattern, timeout)
+            return await self.router.log_follower.async_wait_for_quiescence(time_duration, timeout)
+
+class AsyncCapture:
+    """
+    The asyncio version of a `CaptureStrategy`, capturing from the router interfaces wrapped by `AsyncRouter`.
+    """
+
+    def __init__(self, capture: CaptureStrategy):
+        self.capture : CaptureStrategy = capture
+
+    async def start_message_dump(self, router_interface: AsyncRouter, path: str):
+        await asyncio.to_thread(self.capture.start_message_dump, router_interface.router, path)
+
+    async def dump_routing_table(self, router_interface: AsyncRouter, path: str):
+        await asyncio.to_thread(self.capture.dump_routing_table, router_interface.router, path)
+
+    async def stop(self, router_interface: AsyncRouter):
+        await asyncio.to_thread(self.capture.stop, router_interface.router)
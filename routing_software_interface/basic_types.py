@@ -1,7 +1,7 @@
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
 from enum import Enum
 
 class RouterSoftwareType(Enum):
@@ -22,6 +22,17 @@ class Neighbor:
     # local source used for communication
     local_source : str
 
+@dataclass
+class RouterSandbox:
+    """
+    The private resources of a routing daemon instance running in its own network namespace,
+    so several instances can run on the same host.
+    """
+    # the network namespace the daemon runs in (also the FRR pathspace)
+    namespace : str
+    # the directory holding the config, log, control socket and pid files
+    work_dir : str
+
 class RouterConfiguration:
     """
     This class is used to configure the BGP instance.
@@ -47,6 +58,17 @@ class RouterConfiguration:
         """Get the router software type."""
         return self.router_type
 
+    def get_signature(self) -> tuple:
+        """
+        Get a snapshot of the configuration.
+        Two configurations with equal signatures set up the same BGP instance.
+        """
+        return (self.router_type,
+                self.asn,
+                self.router_id,
+                tuple(str(prefix) for prefix in self.local_prefixes),
+                tuple(astuple(neighbor) for neighbor in self.neighbors))
+
     def append_local_prefix(self, prefix: str):
         """
         Append a local prefix for the BGP instance.
@@ -0,0 +1,78 @@
+"""
+The in-memory model of the section of the BIRD config file managed by `BIRDRouter`
+(below `BIRD_CONF_MARKER`), diffed against the section BIRD runs with,
+so only the changes are applied.
+"""
+
+from dataclasses import dataclass, field, replace
+
+@dataclass
+class BIRDProtocol:
+    """
+    A protocol block `protocol <kind> <name> { <statements> }`.
+    """
+    kind : str
+    name : str
+    # the statements in the block, e.g. `local as 65001;`
+    statements : list[str]
+    # rendered as `disabled yes;`, so the file agrees with `birdc disable <name>`
+    disabled : bool = False
+
+    def is_same_instance(self, other: 'BIRDProtocol') -> bool:
+        """
+        Return if the blocks differ at most in `disabled`, i.e. the protocol can be switched
+        by `birdc enable/disable` instead of reconfiguring.
+        """
+        return self.kind == other.kind and self.statements == other.statements
+
+    def render(self) -> str:
+        statements = self.statements + (["disabled yes;"] if self.disabled else [])
+        body = "".join(f"  {statement}\n" for statement in statements)
+        return f"protocol {self.kind} {self.name} {{\n{body}}}\n"
+
+@dataclass
+class ConfigDiff:
+    """
+    The changes from the running section to the new one.
+    """
+    # if BIRD has to read the config file again, i.e. a global option or a protocol is added, removed or changed
+    reconfigure : bool
+    # the protocols only switched on/off, used if not `reconfigure`
+    enabled : list[str] = field(default_factory=list)
+    disabled : list[str] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.reconfigure or self.enabled or self.disabled)
+
+@dataclass
+class BIRDConfigSection:
+    """
+    The global options (keyed by the option, e.g. `mrtdump`) and the protocol blocks (keyed by the name).
+    """
+    options : dict[str, str] = field(default_factory=dict)
+    protocols : dict[str, BIRDProtocol] = field(default_factory=dict)
+
+    def copy(self) -> 'BIRDConfigSection':
+        return BIRDConfigSection(options=dict(self.options),
+                                 protocols={name: replace(protocol, statements=list(protocol.statements))
+                                            for name, protocol in self.protocols.items()})
+
+    def render(self) -> str:
+        blocks = ["".join(f"{option}\n" for option in self.options.values())] if self.options else []
+        blocks += [protocol.render() for protocol in self.protocols.values()]
+        return "\n".join(blocks)
+
+    def diff(self, running: 'BIRDConfigSection') -> ConfigDiff:
+        """
+        Get the changes from `running` (`None` if unknown) to this section.
+        """
+        if running is None or self.options != running.options or self.protocols.keys() != running.protocols.keys():
+            return ConfigDiff(reconfigure=True)
+        diff = ConfigDiff(reconfigure=False)
+        for name, protocol in self.protocols.items():
+            running_protocol = running.protocols[name]
+            if not protocol.is_same_instance(running_protocol):
+                return ConfigDiff(reconfigure=True)
+            if protocol.disabled != running_protocol.disabled:
+                (diff.disabled if protocol.disabled else diff.enabled).append(name)
+        return diff
@@ -0,0 +1,147 @@
+"""
+The strategies capturing the MRT dumps of a testcase from the routing software.
+"""
+
+from abc import ABC, abstractmethod
+from network_utils.mrt_tap import MRTTap
+from .basic_types import RouterConfiguration, RouterSoftwareType
+from .router_base import BaseRouter
+from .router_frr import FRRRouter
+from .router_bird import BIRDRouter
+
+class CaptureStrategy(ABC):
+    """
+    How the messages and the RIB of a testcase are dumped by the routing software.
+    """
+
+    @abstractmethod
+    def start_message_dump(self, router_interface: BaseRouter, path: str):
+        """
+        Start dumping the messages received by the routing software to `path`.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def dump_routing_table(self, router_interface: BaseRouter, path: str):
+        """
+        Request a dump of the whole BGP routing table to `path`,
+        the dump is written within `router_interface.ROUTE_DUMP_TIMEOUT` seconds.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stop(self, router_interface: BaseRouter):
+        """
+        Stop `start_message_dump` and `dump_routing_table`.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stop_routing_table_dump(self, router_interface: BaseRouter):
+        """
+        Stop only `dump_routing_table`.
+        """
+        raise NotImplementedError()
+
+class FRRCapture(CaptureStrategy):
+    """
+    FRRouting bgpd dumps ONLY the BGP UPDATE messages, 
+    and dumping the RIB is like taking a snapshot.
+    """
+
+    def start_message_dump(self, router_interface: FRRRouter, path: str):
+        router_interface.dump_updates(path)
+
+    def dump_routing_table(self, router_interface: FRRRouter, path: str):
+        router_interface.dump_routing_table(path)
+
+    def stop(self, router_interface: FRRRouter):
+        router_interface.stop_dump_updates()
+        router_interface.stop_dump_routing_table()
+
+    def stop_routing_table_dump(self, router_interface: FRRRouter):
+        router_interface.stop_dump_routing_table()
+
+class BIRDCapture(CaptureStrategy):
+    """
+    BIRD dumps ALL the BGP messages,
+    and dumping the RIB is periodic (every 1 second).
+    """
+
+    def start_message_dump(self, router_interface: BIRDRouter, path: str):
+        router_interface.dump_messages(path)
+
+    def dump_routing_table(self, router_interface: BIRDRouter, path: str):
+        router_interface.dump_routing_table(path)
+
+    def stop(self, router_interface: BIRDRouter):
+        # Reconfigure BIRD once.
+        with router_interface.batch_config():
+            router_interface.stop_dump_messages()
+            router_interface.stop_dump_routing_table()
+
+    def stop_routing_table_dump(self, router_interface: BIRDRouter):
+        router_interface.stop_dump_routing_table()
+
+class TapCapture(CaptureStrategy):
+    """
+    The tester client dumps the messages of its session itself (see `MRTTap`) as they are sent and received,
+    so the dump is complete as soon as the testcase ends, and it is the same for all the routing software.
+    The RIB is still dumped by the routing software, through `route_capture`.
+    """
+    def __init__(self,
+                 tcp_client,
+                 router_configuration: RouterConfiguration,
+                 route_capture: CaptureStrategy):
+        """
+        `tcp_client` is the tester client (`BGPClient` or `AsyncBGPClient`), its `tap` is set while dumping.
+        """
+        self.tcp_client = tcp_client
+        self.router_configuration = router_configuration
+        self.route_capture = route_capture
+        self.route_dump_started = False
+
+    def get_tap(self, path: str) -> MRTTap:
+        tcp_client_config = self.tcp_client.configuration
+        tester_ip = tcp_client_config.bind_val[0] if tcp_client_config.bind_val is not None else "0.0.0.0"
+        tester_asn = next((neighbor.peer_asn for neighbor in self.router_configuration.neighbors
+                           if neighbor.peer_ip == tester_ip), 0)
+        return MRTTap(path,
+                      tester_ip=tester_ip,
+                      tester_asn=tester_asn,
+                      router_ip=tcp_client_config.host,
+                      router_asn=self.router_configuration.asn)
+
+    def start_message_dump(self, router_interface: BaseRouter, path: str):
+        # The tap of a testcase interrupted before `stop`.
+        if self.tcp_client.tap is not None:
+            self.tcp_client.tap.close()
+        self.tcp_client.tap = self.get_tap(path)
+
+    def dump_routing_table(self, router_interface: BaseRouter, path: str):
+        self.route_capture.dump_routing_table(router_interface, path)
+        self.route_dump_started = True
+
+    def stop(self, router_interface: BaseRouter):
+        tap, self.tcp_client.tap = self.tcp_client.tap, None
+        if tap is not None:
+            tap.close()
+        self.stop_routing_table_dump(router_interface)
+
+    def stop_routing_table_dump(self, router_interface: BaseRouter):
+        if self.route_dump_started:
+            self.route_capture.stop_routing_table_dump(router_interface)
+            self.route_dump_started = False
+
+def get_capture_strategy(router_interface: BaseRouter) -> CaptureStrategy:
+    """
+    Return the capture strategy according to the type of the routing software.
+    """
+    software_type: RouterSoftwareType = router_interface.get_software_type()
+    match software_type:
+        case RouterSoftwareType.FRR:
+            return FRRCapture()
+        case RouterSoftwareType.BIRD:
+            return BIRDCapture()
+        case _:
+            raise ValueError("Unexpected type of the router interface!")
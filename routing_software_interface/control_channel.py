@@ -0,0 +1,231 @@
+"""
+The long-lived control sessions with the routing software daemons,
+used instead of spawning `sudo vtysh`/`sudo birdc` for every command.
+"""
+
+import socket, threading, re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+# The upper bound of the time to wait for the reply of a command (in seconds).
+CONTROL_TIMEOUT = 10
+# The code of the failed reply of a command whose session is lost after it is sent,
+# it may or may not have been executed (see `ControlChannel.execute`).
+SESSION_LOST_CODE = -1
+
+@dataclass
+class ControlReply:
+    """
+    The reply of the daemon to a command.
+    """
+    command : str
+    # if the daemon reports the command as successful
+    success : bool
+    # the return code of FRR (see `VTYChannel`), the last reply code of BIRD (see `BIRDControlChannel`),
+    # or `SESSION_LOST_CODE`
+    code : int
+    output : str
+
+class ControlChannel(ABC):
+    """
+    A control session over the unix socket of a daemon.
+    The commands of all threads are serialized by a lock (e.g. `AsyncRouter` runs them in threads),
+    the replies are framed according to the protocol of the daemon.
+    The session is (re)connected on demand, e.g. after the daemon restarts.
+    `execute` returns `None` if the socket cannot be used (e.g. no permission, or the daemon is down),
+    so the caller can fall back to the command line client.
+    """
+    def __init__(self, socket_path: str, timeout: float = CONTROL_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.socket : socket.socket = None
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.socket = sock
+        self.buffer = bytearray()
+        self.on_connect()
+
+    def close(self):
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+        self.socket = None
+
+    def execute(self, command: str) -> ControlReply:
+        """
+        Execute a command and get its reply, `None` if the daemon cannot be reached through the socket.
+        A broken session (e.g. the daemon has restarted) is reconnected once, as long as the command is not sent.
+        A sent command is never sent again, since it may have been executed: if the session is lost
+        before its reply (e.g. the reply times out), a failed reply with `SESSION_LOST_CODE` is returned.
+        """
+        with self.lock:
+            return self.execute_in_session(command, reconnect=True)
+
+    def execute_all(self, commands: list[str]) -> list[ControlReply]:
+        """
+        Execute the commands one by one in one session, `None` if the daemon cannot be reached through the socket
+        (then none of them is executed, so they can all be executed by the command line client).
+        A failed command is reported but the following ones are still executed, like `vtysh -c`.
+        The commands rely on the state of the session (e.g. the VTY node entered by the previous ones),
+        so they are not continued on a new session: if the session is lost, the replies end with
+        the failed reply (`SESSION_LOST_CODE`) and the remaining commands are not executed.
+        """
+        replies = []
+        with self.lock:
+            for command in commands:
+                reply = self.execute_in_session(command, reconnect=len(replies) == 0)
+                if reply is None:
+                    if len(replies) == 0:
+                        return None
+                    reply = self.get_lost_reply(command, "the session is lost before sending the command")
+                if not reply.success:
+                    print(f"Warning: `{command}` failed ({reply.code}): {reply.output.strip()}")
+                replies.append(reply)
+                if reply.code == SESSION_LOST_CODE:
+                    print(f"Warning: the control session is lost, "
+                          f"the remaining {len(commands) - len(replies)} commands are not executed.")
+                    break
+        return replies
+
+    def execute_in_session(self, command: str, reconnect: bool) -> ControlReply:
+        """
+        Execute a command in the current session (connected on demand), `None` if it cannot be sent.
+        If `reconnect`, a broken session is reconnected once before giving up.
+        The caller holds `self.lock`.
+        """
+        for retry in ((False, True) if reconnect else (True,)):
+            try:
+                if self.socket is None:
+                    self.connect()
+                self.send_command(command)
+            except socket.timeout:
+                # The command may be partially sent, it cannot be sent again.
+                self.close()
+                return self.get_lost_reply(command, "sending the command timed out")
+            except OSError:
+                self.close()
+                if retry:
+                    return None
+                continue
+            try:
+                return self.read_reply(command)
+            except OSError as error:
+                self.close()
+                return self.get_lost_reply(command, f"no reply to the command ({error})")
+
+    def get_lost_reply(self, command: str, reason: str) -> ControlReply:
+        return ControlReply(command=command, success=False, code=SESSION_LOST_CODE,
+                            output=f"The control session is lost: {reason}")
+
+    def receive(self) -> bytes:
+        """
+        Receive from the socket into the buffer, raise `ConnectionError` if the daemon closes the session.
+        """
+        data = self.socket.recv(65536)
+        if not data:
+            raise ConnectionError("The control session is closed by the daemon.")
+        self.buffer += data
+        return data
+
+    @abstractmethod
+    def on_connect(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def send_command(self, command: str):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def read_reply(self, command: str) -> ControlReply:
+        raise NotImplementedError()
+
+class VTYChannel(ControlChannel):
+    """
+    The session with the VTY socket of an FRR daemon (e.g. `bgpd.vty`), the one used by vtysh:
+    a command is terminated by a NUL byte, and its output is followed by
+    three NUL bytes and the return code (`CMD_SUCCESS`, `CMD_WARNING`, ...).
+    The session starts in the view node, so `enable` is executed first.
+    """
+    # `CMD_SUCCESS` and `CMD_SUCCESS_DAEMON` of `lib/command.h`.
+    SUCCESS_CODES = (0, 10)
+    REPLY_END = b'\0\0\0'
+
+    def on_connect(self):
+        self.send_command("enable")
+        reply = self.read_reply("enable")
+        if not reply.success:
+            raise ConnectionError(f"Cannot enable the VTY session: {reply.output}")
+
+    def send_command(self, command: str):
+        self.socket.sendall(command.encode() + b'\0')
+
+    def read_reply(self, command: str) -> ControlReply:
+        while True:
+            end = self.buffer.find(self.REPLY_END)
+            if end >= 0 and len(self.buffer) > end + len(self.REPLY_END):
+                break
+            self.receive()
+        code = self.buffer[end + len(self.REPLY_END)]
+        output = self.buffer[:end].decode(errors="replace")
+        del self.buffer[:end + len(self.REPLY_END) + 1]
+        return ControlReply(command=command, success=code in self.SUCCESS_CODES, code=code, output=output)
+
+class BIRDControlChannel(ControlChannel):
+    """
+    The session with the control socket of BIRD (`bird.ctl`), the one used by birdc:
+    a command is a line, and its reply is a list of lines `DDDD-text` (continued by ` text`),
+    ended by a line `DDDD text`. The codes 8xxx (runtime error) and 9xxx (syntax error)
+    are errors, the lines starting with `+` are asynchronous messages and ignored.
+    The daemon greets with a reply (`0001 BIRD ... ready.`) when connected.
+    """
+    LAST_LINE_PATTERN = re.compile(r'^(\d{4}) ')
+    LINE_PATTERN = re.compile(r'^(\d{4})[ -]')
+
+    def on_connect(self):
+        reply = self.read_reply("")
+        if not reply.success:
+            raise ConnectionError(f"Unexpected greeting of BIRD: {reply.output}")
+
+    def send_command(self, command: str):
+        self.socket.sendall(command.encode() + b'\n')
+
+    def read_line(self) -> str:
+        while True:
+            end = self.buffer.find(b'\n')
+            if end >= 0:
+                line = self.buffer[:end].decode(errors="replace")
+                del self.buffer[:end+1]
+                return line
+            self.receive()
+
+    def read_reply(self, command: str) -> ControlReply:
+        output_lines = []
+        success = True
+        code = None
+        while True:
+            line = self.read_line()
+            if line.startswith('+'):
+                continue
+            match = self.LINE_PATTERN.match(line)
+            if match is None:
+                # Continuation of the previous line.
+                output_lines.append(line[1:])
+                continue
+            code = int(match.group(1))
+            if code >= 8000:
+                success = False
+            if line[5:]:
+                output_lines.append(line[5:])
+            if self.LAST_LINE_PATTERN.match(line):
+                return ControlReply(command=command, success=success, code=code, output="\n".join(output_lines))
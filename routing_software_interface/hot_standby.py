@@ -0,0 +1,103 @@
+"""
+The hot standby of a sandboxed routing daemon, so a crash is recovered from without waiting for a restart.
+"""
+
+import os, threading
+from network_utils.vnet_utils import *
+from .basic_types import RouterSandbox
+from .router_base import BaseRouter
+
+# Appended to the namespace and the work directory of the sandbox for the standby.
+STANDBY_SUFFIX = "b"
+
+class HotStandby:
+    """
+    A second daemon, pre-spawned in its own namespace (with its own config, log and sockets),
+    with the same software as the router of a sandbox.
+    When the daemon of the router crashes, the veth of the router is moved into the namespace
+    of the standby (so the clients keep the same peer address), the router controls the standby from now on,
+    and a new standby is spawned in the background in the namespace of the crashed daemon.
+    """
+    def __init__(self, router_interface: BaseRouter, router_vnet: dict):
+        """
+        `router_vnet` is the vnet configuration of the router software of the sandbox, see `get_sandbox_vnet_config`.
+        """
+        if router_interface.sandbox is None:
+            raise ValueError("The hot standby needs a sandboxed router interface!")
+        self.veth : str = router_vnet["veth"]
+        self.prefix : str = router_vnet["ip"]
+        sandbox = router_interface.sandbox
+        self.standby_sandbox = RouterSandbox(namespace=f"{sandbox.namespace}{STANDBY_SUFFIX}",
+                                             work_dir=f"{sandbox.work_dir}{STANDBY_SUFFIX}")
+        # The namespace created for the standby, the other one is the namespace of the sandbox.
+        self.namespace : str = self.standby_sandbox.namespace
+        # Another interface of the same software controls the standby daemon.
+        self.standby_router : BaseRouter = type(router_interface)(router_interface.router_configuration,
+                                                                  self.standby_sandbox)
+        self.spawn_thread : threading.Thread = None
+        self.swap_num = 0
+
+    def start(self):
+        """
+        Create the namespace of the standby and spawn the standby daemon in the background.
+        """
+        execute_under_namespace(create_network_namespace(self.namespace))
+        execute_under_namespace(start_veth("lo"), namespace=self.namespace)
+        os.makedirs(self.standby_sandbox.work_dir, exist_ok=True)
+        self.spawn()
+
+    def spawn(self):
+        """
+        Spawn the standby daemon in the background, from a fresh config.
+        """
+        def spawn_daemon():
+            self.standby_router.prepare_sandbox_config()
+            self.standby_router.start_daemon()
+        self.spawn_thread = threading.Thread(target=spawn_daemon, daemon=True)
+        self.spawn_thread.start()
+
+    def is_ready(self) -> bool:
+        """
+        Return if the standby daemon is spawned and ready to take the sessions.
+        """
+        return not self.spawn_thread.is_alive() and self.standby_router.is_ready()
+
+    def swap_in(self, router_interface: BaseRouter) -> bool:
+        """
+        Replace the crashed daemon of `router_interface` by the standby daemon,
+        return False (and do nothing) if the standby is not ready yet.
+        """
+        if not self.is_ready():
+            return False
+        crashed_sandbox, standby_sandbox = router_interface.sandbox, self.standby_sandbox
+
+        ###### Move the veth of the router ######
+
+        # The addresses of an interface are flushed when it moves to another namespace.
+        execute_under_namespace(bind_interface_with_network_namespace(self.veth, standby_sandbox.namespace),
+                                namespace=crashed_sandbox.namespace)
+        execute_under_namespace(start_veth(self.veth), namespace=standby_sandbox.namespace)
+        execute_under_namespace(assign_prefix_to_interface(self.prefix, self.veth),
+                                namespace=standby_sandbox.namespace)
+
+        ###### Swap the daemons ######
+
+        router_interface.set_sandbox(standby_sandbox)
+        router_interface.process_monitor.watch()
+        # Clean up what is left of the crashed instance (e.g. the other FRR daemons) before respawning.
+        self.standby_sandbox = crashed_sandbox
+        self.standby_router.set_sandbox(crashed_sandbox)
+        self.standby_router.process_monitor.watch()
+        self.standby_router.stop_daemon()
+        self.spawn()
+        self.swap_num = self.swap_num + 1
+        return True
+
+    def tear_down(self):
+        """
+        Shut down the standby daemon and delete the namespace created for it
+        (the veth of the router, if it is in there, is deleted along with it).
+        """
+        self.spawn_thread.join()
+        self.standby_router.stop_daemon()
+        execute_under_namespace(delete_network_namespace(self.namespace))
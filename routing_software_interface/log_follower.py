@@ -0,0 +1,166 @@
+"""
+Follow the log of the routing software by its offset.
+"""
+
+import os, re, codecs
+from time import monotonic
+from typing import Generator, Union
+from basic_utils.wait_utils import run_poll
+from basic_utils.async_utils import run_poll as async_run_poll
+
+class LogFollower:
+    """
+    Follow a log file by tracking the offset already read.
+    Only the appended bytes are read, the file is re-read from the beginning
+    if it is truncated (e.g. by `clear_log`) or replaced (e.g. by logrotate).
+    """
+
+    def __init__(self,
+                 path: str,
+                 idle_window: float = 0.1,
+                 poll_interval: float = 0.01):
+        """
+        Initialize the follower of the log at `path`.
+        `idle_window`: the log is quiescent if nothing is appended within this duration (in seconds).
+        `poll_interval`: the interval between two checks of the log size (in seconds).
+        """
+        self.path = path
+        self.idle_window = idle_window
+        self.poll_interval = poll_interval
+        # The number of bytes already read, and the inode of the file they belong to.
+        self.offset = 0
+        self.inode = None
+        # Keeps the incomplete UTF-8 sequence at the end of the last read.
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    ########## Read the log ##########
+
+    def reset(self):
+        """Read the log from the beginning next time."""
+        self.offset = 0
+        self.inode = None
+        self.decoder.reset()
+
+    def skip_to_end(self):
+        """Ignore the current content of the log."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset()
+            return
+        self.offset = stat.st_size
+        self.inode = stat.st_ino
+        self.decoder.reset()
+
+    def read_new(self) -> str:
+        """Read the content appended since the last read."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset()
+            return ""
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # The log has been replaced or truncated.
+            self.offset = 0
+            self.inode = stat.st_ino
+            self.decoder.reset()
+        if stat.st_size == self.offset:
+            return ""
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            content = file.read()
+        self.offset = self.offset + len(content)
+        return self.decoder.decode(content)
+
+    ########## Wait for the log ##########
+
+    def poll_quiescence(self,
+                        idle_window: float = None,
+                        timeout: float = None) -> Generator[float, None, str]:
+        """
+        The poll loop of `wait_for_quiescence`, yielding the seconds to sleep between two reads.
+        """
+        idle_window = self.idle_window if idle_window is None else idle_window
+        self.read_new()
+        start_time = last_change_time = monotonic()
+        content_list = []
+        while True:
+            new_content = self.read_new()
+            now = monotonic()
+            if new_content:
+                content_list.append(new_content)
+                last_change_time = now
+            elif now - last_change_time >= idle_window:
+                break
+            if timeout is not None and now - start_time >= timeout:
+                break
+            yield self.poll_interval
+        return "".join(content_list)
+
+    def poll_pattern(self,
+                     pattern: Union[str, re.Pattern],
+                     timeout: float = None,
+                     include_unread: bool = False) -> Generator[float, None, Union[re.Match, None]]:
+        """
+        The poll loop of `wait_for_pattern`, yielding the seconds to sleep between two reads.
+        """
+        pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        if not include_unread:
+            self.read_new()
+        start_time = monotonic()
+        # The incomplete last line is kept until the rest of it is appended.
+        pending = ""
+        while True:
+            pending = pending + self.read_new()
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                match = pattern.search(line)
+                if match is not None:
+                    return match
+            if timeout is not None and monotonic() - start_time >= timeout:
+                return pattern.search(pending)
+            yield self.poll_interval
+
+    def wait_for_quiescence(self,
+                            idle_window: float = None,
+                            timeout: float = None) -> str:
+        """
+        Wait until nothing is appended to the log within `idle_window` seconds
+        (`self.idle_window` by default), or until `timeout` seconds have passed.
+        The content appended before the call is skipped.
+        Return the content appended during the wait.
+        """
+        return run_poll(self.poll_quiescence(idle_window, timeout))
+
+    def wait_for_pattern(self,
+                         pattern: Union[str, re.Pattern],
+                         timeout: float = None,
+                         include_unread: bool = False) -> Union[re.Match, None]:
+        """
+        Wait until a line matching the regex `pattern` is appended to the log,
+        or until `timeout` seconds have passed.
+        If `include_unread`, the content appended since the last read is searched as well,
+        otherwise only the content appended after the call.
+        Return the match, or `None` on timeout.
+        """
+        return run_poll(self.poll_pattern(pattern, timeout, include_unread))
+
+    ########## Await the log ##########
+
+    async def async_wait_for_quiescence(self,
+                                        idle_window: float = None,
+                                        timeout: float = None) -> str:
+        """
+        The awaitable version of `wait_for_quiescence`, the event loop runs while polling.
+        """
+        return await async_run_poll(self.poll_quiescence(idle_window, timeout))
+
+    async def async_wait_for_pattern(self,
+                                     pattern: Union[str, re.Pattern],
+                                     timeout: float = None,
+                                     include_unread: bool = False) -> Union[re.Match, None]:
+        """
+        The awaitable version of `wait_for_pattern`, the event loop runs while polling.
+        """
+        return await async_run_poll(self.poll_pattern(pattern, timeout, include_unread))
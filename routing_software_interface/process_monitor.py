@@ -0,0 +1,189 @@
+"""
+Watch the daemon processes of the routing software without spawning any process
+(`systemctl`, `ps aux`, `kill -0`), so crashes can be checked after every message.
+"""
+
+import os, select, threading
+from time import sleep
+from typing import Callable
+
+# The interval (in seconds) the watcher thread checks the process without a pidfd,
+# and checks if the process to watch has changed.
+WATCH_INTERVAL = 0.05
+
+def read_pid_file(pid_file: str) -> int:
+    """
+    Read the pid written in `pid_file`, `None` if it cannot be read.
+    """
+    try:
+        with open(pid_file, 'r') as file:
+            return int(file.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def get_process_start_time(pid: int) -> int:
+    """
+    Get the start time (in clock ticks since boot) of the process, `None` if it is not running
+    (or is a zombie). It tells a process from a later one reusing its pid.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as file:
+            stat = file.read()
+    except OSError:
+        return None
+    # The command name (2nd field) may contain spaces, the other fields follow the last ')'.
+    fields = stat[stat.rfind(')')+2:].split()
+    if fields[0] in ('Z', 'X'):
+        return None
+    return int(fields[19])
+
+def is_pid_alive(pid: int) -> bool:
+    """
+    Return if the process is running.
+    """
+    return pid is not None and get_process_start_time(pid) is not None
+
+def find_pid_by_name(names: tuple[str, ...]) -> int:
+    """
+    Find a running process whose command name is one of `names`, `None` if there is none.
+    """
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/comm", 'r') as file:
+                if file.read().strip() not in names:
+                    continue
+        except OSError:
+            continue
+        pid = int(entry.name)
+        if is_pid_alive(pid):
+            return pid
+    return None
+
+def is_port_listening(pid: int, port: int) -> bool:
+    """
+    Return if a TCP socket listens on `port` in the network namespace of the process,
+    by `/proc/<pid>/net/tcp{,6}` (e.g. the BGP port of a daemon in a sandbox).
+    """
+    for path in (f"/proc/{pid}/net/tcp", f"/proc/{pid}/net/tcp6"):
+        try:
+            with open(path, 'r') as file:
+                lines = file.readlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            # `sl local_address rem_address st ...`, the addresses are `<hex ip>:<hex port>`
+            # and the state 0A is LISTEN.
+            fields = line.split()
+            if fields[3] == '0A' and int(fields[1].rsplit(':', 1)[1], 16) == port:
+                return True
+    return False
+
+class ProcessMonitor:
+    """
+    Watch a daemon process, whose pid is resolved once by `resolve_pid` (see `watch`).
+    The process is watched through a pidfd (`pidfd_open`, readable once the process exits),
+    or through `/proc/<pid>/stat` if pidfds are not supported.
+    Once the watched process exits, it is regarded as crashed until `watch` is called again
+    (e.g. after restarting the daemon), even if the daemon has been restarted by others (e.g. watchfrr).
+    """
+    def __init__(self, resolve_pid: Callable[[], int]):
+        self.resolve_pid = resolve_pid
+        self.pid : int = None
+        self.start_time : int = None
+        self.pidfd : int = None
+        self.crashed = False
+        self.lock = threading.RLock()
+        # Called with the pid once the watched process exits, see `add_callback`.
+        self.callbacks : list[Callable[[int], None]] = []
+        self.watcher_thread : threading.Thread = None
+
+    def watch(self) -> bool:
+        """
+        Resolve the pid of the daemon and start watching it,
+        return if the daemon is running.
+        """
+        with self.lock:
+            self.close_pidfd()
+            self.pid = self.resolve_pid()
+            self.start_time = get_process_start_time(self.pid) if self.pid is not None else None
+            if self.start_time is None:
+                self.pid = None
+                return False
+            try:
+                self.pidfd = os.pidfd_open(self.pid)
+            except (AttributeError, OSError):
+                # Not supported by Python or the kernel.
+                self.pidfd = None
+            self.crashed = False
+            # The process may have exited between reading its start time and opening the pidfd.
+            return not self.has_exited()
+
+    def close_pidfd(self):
+        if self.pidfd is not None:
+            os.close(self.pidfd)
+            self.pidfd = None
+
+    def has_exited(self) -> bool:
+        """
+        Check (without blocking) if the watched process has exited, and record it.
+        """
+        with self.lock:
+            if self.crashed:
+                return True
+            if self.pidfd is not None:
+                exited = bool(select.select([self.pidfd], [], [], 0)[0])
+            else:
+                exited = get_process_start_time(self.pid) != self.start_time
+            if exited:
+                self.crashed = True
+            return exited
+
+    def is_crashed(self) -> bool:
+        """
+        Return if the daemon is not running: the watched process has exited,
+        or no process is watched and none can be resolved.
+        """
+        with self.lock:
+            if self.pid is None and not self.watch():
+                return True
+            return self.has_exited()
+
+    ########## Callbacks ##########
+
+    def add_callback(self, callback: Callable[[int], None]):
+        """
+        Call `callback(pid)` (in the watcher thread) as soon as the watched process exits.
+        """
+        with self.lock:
+            self.callbacks.append(callback)
+            if self.watcher_thread is None:
+                self.watcher_thread = threading.Thread(target=self.watch_loop, daemon=True)
+                self.watcher_thread.start()
+
+    def watch_loop(self):
+        # The process whose exit has been notified, as `(pid, start time)`.
+        notified = None
+        while True:
+            with self.lock:
+                pid, pidfd, process = self.pid, self.pidfd, (self.pid, self.start_time)
+            if pid is not None and process != notified:
+                if pidfd is not None:
+                    # Wake up at once when the process exits, or regularly to follow `watch`.
+                    try:
+                        select.select([pidfd], [], [], WATCH_INTERVAL)
+                    except (OSError, ValueError):
+                        # The pidfd is closed by `watch`.
+                        continue
+                else:
+                    sleep(WATCH_INTERVAL)
+                with self.lock:
+                    if process != (self.pid, self.start_time) or not self.has_exited():
+                        continue
+                    callbacks = list(self.callbacks)
+                notified = process
+                for callback in callbacks:
+                    callback(pid)
+            else:
+                sleep(WATCH_INTERVAL)
@@ -4,21 +4,46 @@ The basic type of the router.
 
 from abc import ABC, abstractmethod
 from .basic_types import *
+from contextlib import nullcontext
+from basic_utils.trace_utils import Tracer
+from basic_utils.wait_utils import wait_for_file_stable
+from .log_follower import LogFollower
+from .process_monitor import ProcessMonitor, read_pid_file, is_pid_alive
+
+# The port the routing daemons listen on for BGP.
+BGP_PORT = 179
 
 class BaseRouter(ABC):
     """
     The base type of the router. 
     """
 
+    # The upper bound of the time to wait for the RIB dump to be written (in seconds).
+    ROUTE_DUMP_TIMEOUT : float = 2
+    # Record the spans of the calls to the routing software if set, see `trace`.
+    # A class attribute, since the subclasses do not call `BaseRouter.__init__`.
+    tracer : Tracer = None
+    # The pre-spawned daemon swapped in by `recover_from_crash` if set, see `HotStandby`.
+    standby = None
+
     ########## Initialization ##########
 
     @abstractmethod
-    def __init__(self, configuration : RouterConfiguration):
+    def __init__(self, 
+                 configuration : RouterConfiguration,
+                 sandbox : RouterSandbox = None):
         """
         Initialize the BGP router. 
+        If `sandbox` is given, the interface controls a private daemon instance
+        running in the sandbox instead of the system-wide one.
         """
         self.software_type : RouterSoftwareType = None
         self.router_configuration : RouterConfiguration = configuration
+        self.sandbox : RouterSandbox = sandbox
+        # Follow the log of the routing software, set by the subclasses.
+        self.log_follower : LogFollower = None
+        # Watch the daemon process for crashes, set by the subclasses.
+        self.process_monitor : ProcessMonitor = None
 
     ########## Turn on/off the instance ##########
 
@@ -43,6 +68,14 @@ class BaseRouter(ABC):
         """
         raise NotImplementedError("`restart_bgp_instance` not implemented!")
 
+    @abstractmethod
+    def reset_neighbor_session(self, peer_ip: str):
+        """
+        Reset the BGP session with the neighbor `peer_ip`, keeping the BGP instance.
+        The routes learned from the neighbor are withdrawn.
+        """
+        raise NotImplementedError("`reset_neighbor_session` not implemented!")
+
     ########## Get methods ##########
 
     def get_software_type(self):
@@ -89,6 +122,13 @@ class BaseRouter(ABC):
         """
         raise NotImplementedError()
 
+    def is_crashed(self) -> bool:
+        """
+        Return if the router software controlled by this interface has crashed.
+        Sandboxed interfaces check their own daemon instance.
+        """
+        return self.if_crashed()
+
     @abstractmethod
     def recover_from_crash(self):
         """
@@ -96,11 +136,82 @@ class BaseRouter(ABC):
         """
         raise NotImplementedError()
 
+    def is_ready(self) -> bool:
+        """
+        Return if the restarted routing daemon is ready to take the sessions.
+        """
+        return not self.is_crashed()
+
+    def swap_in_standby(self) -> bool:
+        """
+        Replace the crashed daemon by the standby one, return False if there is no standby ready.
+        """
+        if self.standby is None:
+            return False
+        with self.trace("standby_swap"):
+            return self.standby.swap_in(self)
+
+    @abstractmethod
+    def set_sandbox(self, sandbox: RouterSandbox):
+        """
+        Control the daemon instance of `sandbox` from now on, see `HotStandby`.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def start_daemon(self):
+        """
+        Start the routing daemon controlled by this interface.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stop_daemon(self):
+        """
+        Shut down the routing daemon controlled by this interface.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def is_pid_file_alive(pid_file: str) -> bool:
+        """
+        Return if the process whose pid is written in `pid_file` is running.
+        """
+        return is_pid_alive(read_pid_file(pid_file))
+
     ########## Other utils ##########
 
     @abstractmethod
-    def wait_for_log(self, time_duration: float):
+    def wait_for_log(self, 
+                     time_duration: float, 
+                     pattern: str = None,
+                     timeout: float = None):
         """
         Waiting until the log does not update anymore.
+        Only the bytes appended to the log are read (see `LogFollower`):
+        - If `pattern` is None, return the content appended until nothing
+          is appended for `time_duration` seconds.
+        - Otherwise return the match of the first line matching the regex `pattern`,
+          or None if `timeout` seconds have passed.
         """
-        raise NotImplementedError()
+        with self.trace("wait_for_log"):
+            if pattern is not None:
+                return self.log_follower.wait_for_pattern(pattern, timeout)
+            return self.log_follower.wait_for_quiescence(time_duration, timeout)
+
+    def wait_for_routing_table(self, path: str, timeout: float = None) -> bool:
+        """
+        Wait until the RIB dump (see `CaptureStrategy.dump_routing_table`) is written to `path`,
+        return False if it is not written within `timeout` seconds (`ROUTE_DUMP_TIMEOUT` by default).
+        """
+        if timeout is None:
+            timeout = self.ROUTE_DUMP_TIMEOUT
+        return wait_for_file_stable(path, timeout=timeout)
+
+    def trace(self, name: str):
+        """
+        Record the span of the block in `self.tracer` if it is set.
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(name, "router")
@@ -3,250 +3,284 @@ The BIRD router.
 """
 
 from .basic_types import *
-from .router_base import BaseRouter
+from .router_base import BaseRouter, BGP_PORT
+from .log_follower import LogFollower
+from .control_channel import BIRDControlChannel, ControlReply
+from .process_monitor import ProcessMonitor, read_pid_file, find_pid_by_name, is_port_listening
+from .bird_config import BIRDConfigSection, BIRDProtocol
+from basic_utils.wait_utils import wait_until
 from time import sleep
+from contextlib import contextmanager
 import subprocess, re
 
 BIRD_CONF = "/etc/bird/bird.conf"
 BIRD_CONF = "/usr/local/etc/bird.conf"
 BIRD_CONF_MARKER = "###### Configure below ######"
 BIRD_LOG = "/var/log/bird.log"
+# The default control socket, for BIRD installed under `/usr/local` (like `BIRD_CONF`).
+BIRD_CONTROL_SOCKET = "/usr/local/var/run/bird.ctl"
+# The name of the MRT protocol dumping the routing table.
+ROUTES_DUMP_PROTOCOL = "routes_dump"
+# The command names of the BIRD daemon.
+BIRD_PROCESS_NAMES = ("bird", "bird2")
+# The upper bound of the time to wait for BIRD to start (in seconds).
+BIRD_START_TIMEOUT = 15
 
 class BIRDRouter(BaseRouter):
     """
     The interface for BIRD router.
     """
 
+    # BIRD dumps the RIB periodically (every 1 second).
+    ROUTE_DUMP_TIMEOUT : float = 2
+    control_channel : BIRDControlChannel = None
+
     ########## Initialization ##########
 
-    def __init__(self, configuration : RouterConfiguration):
+    def __init__(self, 
+                 configuration : RouterConfiguration,
+                 sandbox : RouterSandbox = None):
         """
         Initialize the BGP router. 
+        If `sandbox` is given, a private BIRD instance is used,
+        with its config, log, control socket and pid file in `sandbox.work_dir`.
         """
         if configuration.get_router_type() != RouterSoftwareType.BIRD:
             raise ValueError(f"Initializing BIRD router with router type {configuration.get_router_type()}!")
         self.software_type : RouterSoftwareType = RouterSoftwareType.BIRD
         self.router_configuration : RouterConfiguration = configuration
+        self.config : BIRDConfigSection = BIRDConfigSection()
+        self.config_batch_depth = 0
+        self.set_sandbox(sandbox)
+        # Crashes are detected by watching the daemon.
+        self.process_monitor : ProcessMonitor = ProcessMonitor(self.get_daemon_pid)
+
+    def set_sandbox(self, sandbox: RouterSandbox):
+        """
+        Control the BIRD instance of `sandbox` (the system-wide one if `None`).
+        The section of the config is applied to it in full next time, see `apply_config`.
+        """
+        self.sandbox : RouterSandbox = sandbox
+        if sandbox is None:
+            self.conf_path = BIRD_CONF
+            self.log_path = BIRD_LOG
+            self.control_socket = None
+            self.pid_file = None
+        else:
+            self.conf_path = f"{sandbox.work_dir}/bird.conf"
+            self.log_path = f"{sandbox.work_dir}/bird.log"
+            self.control_socket = f"{sandbox.work_dir}/bird.ctl"
+            self.pid_file = f"{sandbox.work_dir}/bird.pid"
+        self.log_follower : LogFollower = LogFollower(self.log_path)
+        # The commands are executed through the persistent session with the control socket
+        # if possible, see `execute_birdc`.
+        if self.control_channel is not None:
+            self.control_channel.close()
+        self.control_channel = BIRDControlChannel(self.control_socket or BIRD_CONTROL_SOCKET)
+        # The part of the config file above the marker, and the section BIRD runs with (`None` if unknown),
+        # see `apply_config`.
+        self.config_head : str = None
+        self.running_config : BIRDConfigSection = None
+
+    def get_birdc_command(self, *args: str) -> list[str]:
+        """
+        Get the birdc command talking to the BIRD instance of this interface.
+        """
+        socket_args = ["-s", self.control_socket] if self.control_socket is not None else []
+        return ["sudo", "birdc"] + socket_args + list(args)
+
+    def execute_birdc(self, *args: str) -> ControlReply:
+        """
+        Execute a birdc command (e.g. `execute_birdc("show", "status")`) through the persistent
+        session with the control socket, or by spawning birdc if the socket cannot be used.
+        The failed commands are reported.
+        """
+        command = " ".join(args)
+        reply = self.control_channel.execute(command)
+        if reply is None:
+            process = subprocess.run(self.get_birdc_command(*args),
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT,
+                                     text=True)
+            reply = ControlReply(command=command,
+                                 success=process.returncode == 0,
+                                 code=process.returncode,
+                                 output=process.stdout)
+        if not reply.success:
+            print(f"Warning: `birdc {command}` failed ({reply.code}): {reply.output.strip()}")
+        return reply
     
     ########## Turn on/off the instance ##########
 
     def start_bgp_instance(self):
         """
-        Start the BGP instance using `self.router_configuration` 
-        """
-
-        # Preparing BIRD config file content.
-        peer_count = 1
-        neighbor_conf_list = []
-        for neighbor in self.router_configuration.neighbors:
-            neighbor_conf = f"""
-protocol bgp peer{peer_count} {{
-  debug all;
-  mrtdump {{messages}};
-  local as {self.router_configuration.asn};
-  neighbor {neighbor.peer_ip} as {neighbor.peer_asn};
-  enforce first as;
-  enable extended messages on;
-  interpret communities on;
-  passive yes;
-  ipv4 {{ import all; export all; }};
-}}
-"""
-            neighbor_conf_list.append(neighbor_conf)
-            peer_count = peer_count + 1
-        overall_conf = "".join(neighbor_conf_list)
-        
-        # Edit BIRD config file.
-        with open(BIRD_CONF, 'r') as f:
-            lines = f.readlines()
-        found = False
-        for i, line in enumerate(lines):
-            if line.strip() == BIRD_CONF_MARKER.strip():
-                found = True
-                break
-        if not found:
-            raise ValueError("BIRD configuration file marker not found! ({BIRD_CONF_MARKER})")
-        new_lines = lines[:i+1] + ['\n' + overall_conf + '\n']
-        # Write the configuration file of BIRD
-        with open(BIRD_CONF, 'w') as f:
-            f.writelines(new_lines)
-
-        # Apply configuration
-        self.config_instance()
+        Start the BGP instance using `self.router_configuration`.
+        The protocols left disabled by `end_bgp_instance` are enabled again if they are unchanged.
+        """
+        peers = {}
+        for peer_count, neighbor in enumerate(self.router_configuration.neighbors, start=1):
+            name = BIRDRouter.get_protocol_name(peer_count)
+            peers[name] = BIRDProtocol(kind="bgp", name=name, statements=[
+                "debug all;",
+                "mrtdump {messages};",
+                f"local as {self.router_configuration.asn};",
+                f"neighbor {neighbor.peer_ip} as {neighbor.peer_asn};",
+                "enforce first as;",
+                "enable extended messages on;",
+                "interpret communities on;",
+                "passive yes;",
+                "ipv4 { import all; export all; };",
+            ])
+        # Replace the BGP protocols of the previous instance.
+        others = {name: protocol for name, protocol in self.config.protocols.items() if protocol.kind != "bgp"}
+        self.config.protocols = peers | others
+        self.apply_config()
 
     def end_bgp_instance(self):
         """
-        Shut down the BGP instance
+        Shut down the BGP instance.
+        The protocols are disabled instead of removed, so restarting the same instance needs no reconfiguration.
         """
-        # Edit BIRD config file.
-        with open(BIRD_CONF, 'r') as f:
-            lines = f.readlines()
-        found = False
-        for i, line in enumerate(lines):
-            if line.strip() == BIRD_CONF_MARKER.strip():
-                found = True
-                break
-        if not found:
-            raise ValueError("BIRD configuration file marker not found! ({BIRD_CONF_MARKER})")
-        new_lines = lines[:i+1]
-        # Write the configuration file of BIRD
-        with open(BIRD_CONF, 'w') as f:
-            f.writelines(new_lines)
-        
-        # Apply configuration
-        self.config_instance()
+        self.config.options.clear()
+        for protocol in self.config.protocols.values():
+            protocol.disabled = True
+        self.apply_config()
 
     def restart_bgp_instance(self):
         """
         Restart the BGP instance.
         """
         raise NotImplementedError("`restart_bgp_instance` not implemented!")
+
+    @classmethod
+    def get_protocol_name(cls, peer_count: int) -> str:
+        """
+        Get the name of the BGP protocol of the `peer_count`-th neighbor (from 1) in the BIRD config file.
+        """
+        return f"peer{peer_count}"
+
+    def reset_neighbor_session(self, peer_ip: str):
+        """
+        Reset the BGP session with the neighbor `peer_ip`, keeping the BGP instance.
+        The routes learned from the neighbor are withdrawn.
+        """
+        for peer_count, neighbor in enumerate(self.router_configuration.neighbors, start=1):
+            if neighbor.peer_ip == peer_ip:
+                with self.trace("birdc_restart"):
+                    self.execute_birdc("restart", BIRDRouter.get_protocol_name(peer_count))
+                return
+        print(f"Warning: {peer_ip} is not a neighbor of the BIRD router, no session is reset.")
     
     ########## BIRD config file management ##########
 
-    def add_routes_mrt_config(self, dump_path: str):
+    def get_config_head(self) -> str:
         """
-        Add the MRT config for dumping the routing table in the BIRD config file.
+        Get the part of the BIRD config file up to `BIRD_CONF_MARKER`, which is kept as it is.
         """
-        new_config = f'''protocol mrt {{
-\ttable "master4";
-\tfilename "{dump_path}";
-\tperiod 1;
-}}
-'''
-        with open(BIRD_CONF, 'r') as f:
-            content = f.read()
+        if self.config_head is None:
+            with open(self.conf_path, 'r') as f:
+                lines = f.readlines()
+            for i, line in enumerate(lines):
+                if line.strip() == BIRD_CONF_MARKER.strip():
+                    break
+            else:
+                raise ValueError(f"BIRD configuration file marker not found! ({BIRD_CONF_MARKER})")
+            self.config_head = "".join(lines[:i+1])
+        return self.config_head
 
-        # Regex match protocol mrt { ... }
-        pattern = re.compile(r'protocol\s+mrt\s*{[^}]*}', re.IGNORECASE | re.DOTALL)
+    def write_config(self):
+        """
+        Write `self.config` below the marker of the BIRD config file.
+        """
+        content = self.get_config_head() + '\n' + self.config.render()
+        with open(self.conf_path, 'w') as f:
+            f.write(content)
 
-        if pattern.search(content):
-            # Why there is a `protocol mrt` configuration?
-            print(f"Warning: There is a existing mrt protocol configuration:\n {content}")
-            content = pattern.sub(new_config.strip(), content)
+    @contextmanager
+    def batch_config(self):
+        """
+        Apply the changes of `self.config` made in the block at once.
+        """
+        self.config_batch_depth += 1
+        try:
+            yield
+        finally:
+            self.config_batch_depth -= 1
+        self.apply_config()
+
+    def apply_config(self):
+        """
+        Apply the changes of `self.config` since the last time (unless in `batch_config`).
+        If the protocols are only switched on/off, they are switched through the control socket,
+        otherwise the config file is read again (BIRD restarts only the changed protocols).
+        The file is written in both cases, so a restarted BIRD runs the same section.
+        """
+        if self.config_batch_depth > 0:
+            return
+        diff = self.config.diff(self.running_config)
+        if diff.is_empty():
+            return
+        self.write_config()
+        if diff.reconfigure:
+            self.config_instance()
         else:
-            # Append a configuration
-            content = content.strip()
-            content += '\n'
-            content += '\n' + new_config.strip() + '\n'
+            with self.trace("birdc_switch"):
+                for name in diff.enabled:
+                    self.execute_birdc("enable", name)
+                for name in diff.disabled:
+                    self.execute_birdc("disable", name)
+        self.running_config = self.config.copy()
 
-        with open(BIRD_CONF, 'w') as f:
-            f.write(content)
+    def add_routes_mrt_config(self, dump_path: str):
+        """
+        Add the MRT config for dumping the routing table in the BIRD config file.
+        """
+        self.config.protocols[ROUTES_DUMP_PROTOCOL] = BIRDProtocol(kind="mrt", name=ROUTES_DUMP_PROTOCOL, statements=[
+            'table "master4";',
+            f'filename "{dump_path}";',
+            "period 1;",
+        ])
     
     def remove_routes_mrt_config(self):
         """
         Remove the MRT config for dumping the routing table in the BIRD config file.
+        The protocol is only disabled, it is reconfigured by the next `add_routes_mrt_config`.
         """
-        with open(BIRD_CONF, "r") as f:
-            content = f.read()
-
-        # match the protocol mrt { ... } section
-        pattern = re.compile(r'protocol\s+mrt\s*{[^}]*}', re.IGNORECASE | re.DOTALL)
-
-        if pattern.search(content):
-            content = pattern.sub('', content, count=1)
-            content = re.sub(r'\n{2,}', '\n\n', content) 
-            content = content.strip() + '\n'  # Maintain a newline in the end
-            with open(BIRD_CONF, 'w') as f:
-                f.write(content)
+        if ROUTES_DUMP_PROTOCOL in self.config.protocols:
+            self.config.protocols[ROUTES_DUMP_PROTOCOL].disabled = True
 
     def add_messages_mrt_config(self, dump_path: str):
         """
         Add the MRT config for dumping the BGP messages in the BIRD config file.
         """
-        new_line = f'mrtdump "{dump_path}";'
-
-        with open(BIRD_CONF, 'r') as f:
-            content = f.read()
-
-        # Find all protocol {...} sections
-        protocol_blocks = [m.span() for m in re.finditer(r'protocol\s+\w+\s*{[^}]*}', content, re.DOTALL | re.IGNORECASE)]
-
-        # Check if the position is in any protocol block
-        def in_protocol_block(pos):
-            return any(start <= pos < end for start, end in protocol_blocks)
-
-        mrtdump_pattern = re.compile(r'mrtdump\s+"[^"]*"\s*;', re.IGNORECASE)
-        for match in mrtdump_pattern.finditer(content):
-            if not in_protocol_block(match.start()):
-                # Found an existing global config of mrtdump?
-                content = content[:match.start()] + new_line + content[match.end():]
-                print(f"Warning: There is a existing mrt protocol configuration:\n {content}")
-                break
-        else:
-            # Append a configuration
-            content = content.strip()
-            content += '\n'
-            content += '\n' + new_line + '\n'
-
-        with open(BIRD_CONF, 'w') as f:
-            f.write(content)
+        self.config.options["mrtdump"] = f'mrtdump "{dump_path}";'
     
     def remove_messages_mrt_config(self):
         """
         Remove the MRT config for dumping the BGP messages in the BIRD config file.
         """
-        with open(BIRD_CONF, "r") as f:
-            content = f.read()
-
-        # Gather all positions of protocol {...}
-        proto_spans = [
-            m.span()
-            for m in re.finditer(
-                r'protocol\s+\w+\s*{[^}]*}',
-                content,
-                flags=re.IGNORECASE | re.DOTALL,
-            )
-        ]
-
-        # Check if the position is in any protocol block
-        def inside_protocol(pos: int) -> bool:
-            return any(start <= pos < end for start, end in proto_spans)
-
-        # Matche all lines look like mrtdump "xxx";
-        mrtdump_pat = re.compile(
-            r'^[ \t]*mrtdump\s+"[^"]*"\s*;\s*$', flags=re.IGNORECASE | re.MULTILINE
-        )
-
-        new_chunks = []
-        last_end = 0
-        removed = False
-
-        for m in mrtdump_pat.finditer(content):
-            if not inside_protocol(m.start()):
-                new_chunks.append(content[last_end : m.start()])
-                last_end = m.end()
-                removed = True
-                break
-
-        new_chunks.append(content[last_end:])  # Append the other contents
-
-        if removed:
-            # Write back, and make sure there is a newline in the end.
-            new_content = "".join(new_chunks).rstrip() + "\n"
-            with open(BIRD_CONF, "w") as f:
-                f.write(new_content)
+        self.config.options.pop("mrtdump", None)
     
     def config_in_progress(self):
         """
         Check if the configuration is in progress
         """
-        output = subprocess.check_output(['sudo', 'birdc', 'show', 'status'], stderr=subprocess.STDOUT, text=True)
-        return "reconfiguration in progress" in output.lower()
+        return "reconfiguration in progress" in self.execute_birdc("show", "status").output.lower()
                 
     def config_instance(self):
         """
         Configure the BIRD router daemon instance.
         """
-        counter = 0
-        while self.config_in_progress():
-            sleep(0.1)
-            counter = counter + 1
-            if counter>50:
-                print("BIRD routing daemon configure for too long! Regard as a failure.")
-                os.system("sudo kill -9 $(pidof bird)")
-                return
-        os.system("sudo birdc configure")
+        with self.trace("birdc_configure"):
+            counter = 0
+            while self.config_in_progress():
+                sleep(0.1)
+                counter = counter + 1
+                if counter>50:
+                    print("BIRD routing daemon configure for too long! Regard as a failure.")
+                    self.kill_daemon()
+                    return
+            self.execute_birdc("configure")
 
     ########## Dump MRT file ##########
 
@@ -255,28 +289,28 @@ protocol bgp peer{peer_count} {{
         Dump only BGP messages to `path`.
         """
         self.add_messages_mrt_config(path)
-        self.config_instance()
+        self.apply_config()
 
     def dump_routing_table(self, path: str):
         """
         Dump the whole BGP routing table to `path`.
         """
         self.add_routes_mrt_config(path)
-        self.config_instance()
+        self.apply_config()
     
     def stop_dump_messages(self):
         """
         Stop `dump_updates`.
         """
         self.remove_messages_mrt_config()
-        self.config_instance()
+        self.apply_config()
 
     def stop_dump_routing_table(self):
         """
         Stop `dump_routing_table`.
         """
         self.remove_routes_mrt_config()
-        self.config_instance()
+        self.apply_config()
 
     ########## Log manipulation ##########
 
@@ -285,66 +319,142 @@ protocol bgp peer{peer_count} {{
         Read (all) the content from the routing softwares' log.
         Must execute with sudo-command.
         """
-        return super().read_log(BIRD_LOG)
+        return super().read_log(self.log_path)
 
     def clear_log(self):
         """
         Clear the content from the routing softwares' log.
         Must execute with sudo-command.
         """
-        super().clear_log(BIRD_LOG)
+        super().clear_log(self.log_path)
+        self.log_follower.reset()
     
     ########## Crash management ##########
     
     @classmethod
     def if_crashed(cls) -> bool:
         """
-        Return if the router software has crashed.
+        Return if the router software has crashed, i.e. no BIRD process is running.
         """
-        # Get all process
-        ps_output = subprocess.check_output(["ps", "aux"]).decode("utf-8")
+        return find_pid_by_name(BIRD_PROCESS_NAMES) is None
 
-        # find bird
-        lines = [line for line in ps_output.split("\n") 
-                if "bird" in line and "grep bird" not in line and line.strip() != ""]
-
-        # Check if there is real BIRD process
-        for line in lines:
-            if re.search(r"bird(\s|$|2)", line):  # match bird or bird2
-                # BIRD is running.
-                return False
+    def get_daemon_pid(self) -> int:
+        """
+        Get the pid of the BIRD instance of this interface, `None` if it is not found.
+        """
+        if self.sandbox is None:
+            return find_pid_by_name(BIRD_PROCESS_NAMES)
+        return read_pid_file(self.pid_file)
 
-        # BIRD is NOT running.
-        return True
+    def is_crashed(self) -> bool:
+        """
+        Return if the BIRD instance of this interface has crashed, see `ProcessMonitor`.
+        """
+        return self.process_monitor.is_crashed()
 
     def recover_from_crash(self):
         """
         Recover the software from crash.
         """
-        started = not self.if_crashed()
+        started = not self.is_crashed() or self.swap_in_standby()
         counter = 0
         while not started:
-            os.system("sudo bird")
-            sleep(15)
-            started = not self.if_crashed()
+            self.start_daemon()
+            # Wait until BIRD answers on the control socket instead of a fixed sleep.
+            started = wait_until(self.is_ready, timeout=BIRD_START_TIMEOUT, poll_interval=0.05)
             counter  = counter + 1
             if counter>=5:
                 raise ValueError("Restarting BIRD failed for 5 times.")
+
+    def is_ready(self) -> bool:
+        """
+        Return if BIRD is running (the new one is watched) and answers on the control socket,
+        and if a BGP protocol is enabled in its config, if it listens on the BGP port.
+        """
+        if not (self.process_monitor.watch() and self.is_control_socket_responsive()):
+            return False
+        if self.running_config is None \
+            or all(protocol.kind != "bgp" or protocol.disabled for protocol in self.running_config.protocols.values()):
+            return True
+        return is_port_listening(self.process_monitor.pid, BGP_PORT)
+
+    def is_control_socket_responsive(self) -> bool:
+        """
+        Return if BIRD answers on the control socket.
+        """
+        reply = self.control_channel.execute("show status")
+        if reply is not None:
+            return reply.success
+        return subprocess.run(self.get_birdc_command("show", "status"),
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
     
-    ########## Other utils ##########
+    ########## Daemon management ##########
+
+    def prepare_sandbox_config(self):
+        """
+        Write the private config file of the sandbox from the system-wide one,
+        keeping the part above the marker and logging into the private log.
+        """
+        with open(BIRD_CONF, 'r') as f:
+            lines = f.readlines()
+        for i, line in enumerate(lines):
+            if line.strip() == BIRD_CONF_MARKER.strip():
+                lines = lines[:i+1]
+                break
+        else:
+            lines = lines + [BIRD_CONF_MARKER + '\n']
+        content = "".join(lines)
+        # BIRD starts with the section of the new file.
+        self.config_head = None
+        self.running_config = None
+        log_pattern = re.compile(r'^([ \t]*log\s+)"[^"]*"', re.MULTILINE)
+        if log_pattern.search(content):
+            content = log_pattern.sub(lambda m: f'{m.group(1)}"{self.log_path}"', content)
+        else:
+            content = f'log "{self.log_path}" all;\n' + content
+        os.makedirs(self.sandbox.work_dir, exist_ok=True)
+        with open(self.conf_path, 'w') as f:
+            f.write(content)
 
-    def wait_for_log(self, time_duration: float = 0.1):
+    def start_daemon(self):
         """
-        Waiting until the log does not update anymore.
+        Start the BIRD daemon of this interface.
+        A sandboxed daemon runs in the network namespace of the sandbox with a private config.
         """
-        no_updates = False
-        prev_content = None
-        while not no_updates:
-            cur_content = self.read_log()
-            no_updates = prev_content==cur_content
-            prev_content = cur_content
-            sleep(time_duration) # Sleep for 0.1 second
+        if self.sandbox is None:
+            os.system("sudo bird")
+            return
+        if not os.path.exists(self.conf_path):
+            self.prepare_sandbox_config()
+        os.system(f"sudo ip netns exec {self.sandbox.namespace} bird "
+                  f"-c {self.conf_path} -s {self.control_socket} -P {self.pid_file}")
 
-            # if not no_updates:
-            #     print("For debug")
-            #     print(f"Previous content:\n{prev_content}\nCurrent content:\n{cur_content}")
\ No newline at end of file
+    def stop_daemon(self):
+        """
+        Shut down the BIRD daemon of this interface.
+        """
+        if not self.is_crashed():
+            self.execute_birdc("down")
+        self.control_channel.close()
+
+    def kill_daemon(self):
+        """
+        Kill the BIRD daemon of this interface.
+        """
+        if self.sandbox is None:
+            os.system("sudo kill -9 $(pidof bird)")
+        else:
+            os.system(f"sudo kill -9 $(cat {self.pid_file})")
+
+    ########## Other utils ##########
+
+    def wait_for_log(self, 
+                     time_duration: float = 0.1,
+                     pattern: str = None,
+                     timeout: float = None):
+        """
+        Waiting until the log does not update anymore (for `time_duration` seconds),
+        or until a line matching `pattern` is appended if `pattern` is given.
+        """
+        return super().wait_for_log(time_duration, pattern, timeout)
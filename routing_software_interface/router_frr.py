@@ -4,32 +4,97 @@ The FRR router.
 
 from .basic_types import *
 from .router_base import BaseRouter
-from time import sleep
+from .log_follower import LogFollower
+from .control_channel import VTYChannel
+from .process_monitor import ProcessMonitor, read_pid_file, is_pid_alive
+from basic_utils.wait_utils import wait_until
 import subprocess
 
 FRR_LOG = "/var/log/frr/bgpd.log"
+# Used by the sandboxed instances, each one uses its namespace name as the FRR pathspace.
+FRR_INIT_SCRIPT = "/usr/lib/frr/frrinit.sh"
+FRR_CONF_DIR = "/etc/frr"
+FRR_RUN_DIR = "/var/run/frr"
+# The upper bound of the time to wait for FRR to start (in seconds).
+FRR_START_TIMEOUT = 15
 
 class FRRRouter(BaseRouter):
     """
     The interface for FRR router.
     """
 
+    # FRR takes a snapshot of the RIB at once.
+    ROUTE_DUMP_TIMEOUT : float = 1.5
+    control_channel : VTYChannel = None
+
     ########## Initialization ##########
 
-    def __init__(self, configuration : RouterConfiguration):
+    def __init__(self, 
+                 configuration : RouterConfiguration,
+                 sandbox : RouterSandbox = None):
         """
         Initialize the BGP router. 
+        If `sandbox` is given, a private FRR instance is used, running in the namespace
+        of the sandbox with the namespace name as its pathspace (`frrinit.sh start <namespace>`).
         """
         if configuration.get_router_type() != RouterSoftwareType.FRR:
             raise ValueError(f"Initializing FRR router with router type {configuration.get_router_type()}!")
         self.software_type : RouterSoftwareType = RouterSoftwareType.FRR
         self.router_configuration : RouterConfiguration = configuration
-    
-    # This should be attached to the begining of the command you want to execute.
-    FRR_CONFIG_TERMINAL = [
-        "sudo vtysh",
-        "-c 'configure terminal'"
-    ]
+        self.set_sandbox(sandbox)
+        # Crashes are detected by watching bgpd.
+        self.process_monitor : ProcessMonitor = ProcessMonitor(self.get_daemon_pid)
+
+    def set_sandbox(self, sandbox: RouterSandbox):
+        """
+        Control the FRR instance of `sandbox` (the system-wide one if `None`).
+        """
+        self.sandbox : RouterSandbox = sandbox
+        self.log_path = FRR_LOG if sandbox is None else f"{sandbox.work_dir}/bgpd.log"
+        self.log_follower : LogFollower = LogFollower(self.log_path)
+        # The commands are executed through the VTY socket of bgpd if possible, see `execute_commands`.
+        self.run_dir = FRR_RUN_DIR if sandbox is None else f"{FRR_RUN_DIR}/{sandbox.namespace}"
+        if self.control_channel is not None:
+            self.control_channel.close()
+        self.control_channel = VTYChannel(f"{self.run_dir}/bgpd.vty")
+
+    def get_vtysh_command(self) -> str:
+        """
+        Get the vtysh command talking to the FRR instance of this interface.
+        """
+        if self.sandbox is None:
+            return "sudo vtysh"
+        return f"sudo vtysh -N {self.sandbox.namespace}"
+
+    def get_config_terminal_command(self) -> list[str]:
+        """
+        This should be attached to the begining of the command you want to execute.
+        """
+        return [self.get_vtysh_command(), "-c 'configure terminal'"]
+
+    def execute_commands(self, commands: list[str]):
+        """
+        Execute the commands from the enable level, e.g. `configure terminal` first to configure.
+        They are sent through the persistent VTY session of bgpd (all the commands used here are
+        handled by bgpd), or by `vtysh -c ...` if the socket cannot be used.
+        The failed commands are reported.
+        If the VTY session is lost partway, the remaining commands are dropped (see `ControlChannel.execute_all`),
+        rather than executing the sent ones again by vtysh.
+        """
+        with self.trace("vtysh"):
+            session_commands = list(commands)
+            if len(commands) > 0 and commands[0] == "configure terminal":
+                # Go back to the enable level in the same session, for the next commands.
+                session_commands.append("end")
+            replies = self.control_channel.execute_all(session_commands)
+            if replies is not None:
+                return
+            modified_commands = [
+                f"-c '{command}'" for command in commands
+            ]
+            single_command = " ".join([self.get_vtysh_command()] + modified_commands)
+            if os.system(single_command) != 0:
+                print(f"Warning: `{single_command}` failed.")
 
     def execute_commands_in_config_level(self, commands: list[str]):
         """
@@ -37,12 +102,7 @@ class FRRRouter(BaseRouter):
         the `commands` should be a list of the commands you want to execute
         no need to care about the `sudo vtysh -c` stuff...
         """
-        modified_commands = [
-            f"-c '{command}'" for command in commands
-        ]
-        full_commands = FRRRouter.FRR_CONFIG_TERMINAL + modified_commands
-        single_command = " ".join(full_commands)
-        os.system(single_command)
+        self.execute_commands(["configure terminal"] + commands)
     
     def execute_commands_in_router_level(self, commands: list[str]):
         """
@@ -50,12 +110,15 @@ class FRRRouter(BaseRouter):
         the `commands` should be a list of the commands you want to execute
         no need to care about the `sudo vtysh -c` stuff...
         """
-        modified_commands = [
-            f"-c '{command}'" for command in commands
-        ]
-        full_commands = FRRRouter.FRR_CONFIG_TERMINAL + [f"-c 'router bgp {self.router_configuration.asn}'"] + modified_commands
-        single_command = " ".join(full_commands)
-        os.system(single_command)
+        self.execute_commands(["configure terminal", f"router bgp {self.router_configuration.asn}"] + commands)
+
+    def execute_commands_in_enable_level(self, commands: list[str]):
+        """
+        Execute the commands in the enable level (e.g. `clear` commands)
+        the `commands` should be a list of the commands you want to execute
+        no need to care about the `sudo vtysh -c` stuff...
+        """
+        self.execute_commands(commands)
 
     ########## Turn on/off the instance ##########
 
@@ -106,6 +169,13 @@ class FRRRouter(BaseRouter):
         """
         raise NotImplementedError("`restart_bgp_instance` not implemented!")
 
+    def reset_neighbor_session(self, peer_ip: str):
+        """
+        Reset the BGP session with the neighbor `peer_ip`, keeping the BGP instance.
+        The routes learned from the neighbor are withdrawn.
+        """
+        self.execute_commands_in_enable_level([f"clear bgp {peer_ip}"])
+
     ########## Modification ##########
 
     def append_local_prefix(self, prefix):
@@ -204,53 +274,111 @@ class FRRRouter(BaseRouter):
         Read (all) the content from the routing softwares' log.
         Must execute with sudo-command.
         """
-        return super().read_log(FRR_LOG)
+        return super().read_log(self.log_path)
 
     def clear_log(self):
         """
         Clear the content from the routing softwares' log.
         Must execute with sudo-command.
         """
-        super().clear_log(FRR_LOG)
+        super().clear_log(self.log_path)
+        self.log_follower.reset()
 
     ########## Crash management ##########
 
     @classmethod
     def if_crashed(cls) -> bool:
         """
-        Return if the router software has crashed.
+        Return if the router software has crashed, i.e. the system-wide bgpd is not running.
+        """
+        return not is_pid_alive(read_pid_file(f"{FRR_RUN_DIR}/bgpd.pid"))
+
+    def get_daemon_pid(self) -> int:
+        """
+        Get the pid of the bgpd of this interface, `None` if it is unknown.
+        """
+        return read_pid_file(f"{self.run_dir}/bgpd.pid")
+
+    def is_crashed(self) -> bool:
+        """
+        Return if the FRR instance of this interface has crashed, see `ProcessMonitor`.
         """
-        output = subprocess.getoutput("systemctl is-active frr")
-        return output!="active"
+        return self.process_monitor.is_crashed()
 
     def recover_from_crash(self):
         """
         Recover the software from crash.
         """
-        started = not self.if_crashed()
+        started = not self.is_crashed() or self.swap_in_standby()
         counter = 0
         while not started:
-            os.system("sudo systemctl start frr")
-            sleep(0.5)
-            started = not self.if_crashed()
+            self.start_daemon()
+            # Wait until bgpd answers instead of a fixed sleep.
+            started = wait_until(self.is_ready, timeout=FRR_START_TIMEOUT, poll_interval=0.05)
             counter  = counter + 1
             if counter>=5:
                 raise ValueError("Restarting FRRouting failed for 5 times.")
 
-    ########## Other utils ##########
+    def is_ready(self) -> bool:
+        """
+        Return if bgpd is running (the new one is watched) and answers on its VTY socket.
+        """
+        return self.process_monitor.watch() and self.is_control_socket_responsive()
+
+    def is_control_socket_responsive(self) -> bool:
+        """
+        Return if bgpd answers on its VTY socket.
+        """
+        reply = self.control_channel.execute("show version")
+        if reply is not None:
+            return reply.success
+        return subprocess.run(f"{self.get_vtysh_command()} -c 'show version'", shell=True,
+                              stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
+
+    ########## Daemon management ##########
 
-    def wait_for_log(self, time_duration: float = 0.1):
+    def prepare_sandbox_config(self):
         """
-        Waiting until the log does not update anymore.
+        Create the config directory of the sandbox pathspace from the system-wide one.
         """
-        no_updates = False
-        prev_content = None
-        while not no_updates:
-            cur_content = self.read_log()
-            no_updates = prev_content==cur_content
-            prev_content = cur_content
-            sleep(time_duration) # Sleep for 0.1 second
+        conf_dir = f"{FRR_CONF_DIR}/{self.sandbox.namespace}"
+        os.system(f"sudo mkdir -p {conf_dir}")
+        os.system(f"sudo cp {FRR_CONF_DIR}/daemons {conf_dir}/daemons")
+        os.system(f"sudo touch {conf_dir}/frr.conf {conf_dir}/vtysh.conf")
+        os.system(f"sudo chown -R frr:frr {conf_dir}")
+        os.makedirs(self.sandbox.work_dir, exist_ok=True)
 
-            # if not no_updates:
-            #     print("For debug")
-            #     print(f"Previous content:\n{prev_content}\nCurrent content:\n{cur_content}")
+    def start_daemon(self):
+        """
+        Start the FRR daemons of this interface.
+        A sandboxed instance logs into the private log of the sandbox.
+        """
+        if self.sandbox is None:
+            os.system("sudo systemctl start frr")
+            return
+        if not os.path.exists(f"{FRR_CONF_DIR}/{self.sandbox.namespace}/daemons"):
+            self.prepare_sandbox_config()
+        os.system(f"sudo {FRR_INIT_SCRIPT} start {self.sandbox.namespace}")
+        self.execute_commands_in_config_level([f"log file {self.log_path} debugging"])
+
+    def stop_daemon(self):
+        """
+        Shut down the FRR daemons of this interface.
+        """
+        if self.sandbox is None:
+            os.system("sudo systemctl stop frr")
+            return
+        os.system(f"sudo {FRR_INIT_SCRIPT} stop {self.sandbox.namespace}")
+
+    ########## Other utils ##########
+
+    def wait_for_log(self, 
+                     time_duration: float = 0.1,
+                     pattern: str = None,
+                     timeout: float = None):
+        """
+        Waiting until the log does not update anymore (for `time_duration` seconds),
+        or until a line matching `pattern` is appended if `pattern` is given.
+        """
+        return super().wait_for_log(time_duration, pattern, timeout)
@@ -1,18 +1,20 @@
 from .router_base import BaseRouter
 from .router_frr import FRRRouter
 from .router_bird import BIRDRouter
-from .basic_types import RouterSoftwareType, RouterConfiguration
+from .basic_types import RouterSoftwareType, RouterConfiguration, RouterSandbox
 import os
 
-def get_router_interface(router_config : RouterConfiguration) -> BaseRouter:
+def get_router_interface(router_config : RouterConfiguration,
+                         sandbox : RouterSandbox = None) -> BaseRouter:
     """
     Return the router interface according to its configuration.
+    If `sandbox` is given, the interface controls the private daemon instance of the sandbox.
     """
     router_type: RouterSoftwareType = router_config.get_router_type()
     match router_type:
         case RouterSoftwareType.FRR:
-            return FRRRouter(router_config)
+            return FRRRouter(router_config, sandbox)
         case RouterSoftwareType.BIRD:
-            return BIRDRouter(router_config)
+            return BIRDRouter(router_config, sandbox)
         case _:
             raise ValueError(f"Router type {router_type} undefined!")
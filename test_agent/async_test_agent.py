@@ -0,0 +1,107 @@
+"""
+This file defines the asyncio version of the agent used to advertise malformed messages.
+It runs the same steps as `TestAgent`, but with the asyncio versions of the clients and the router interface,
+so the waits are awaited, and the dumps of testcase i are written (and post-processed)
+while testcase i+1 is running.
+"""
+
+import asyncio, inspect
+from typing import Any, Callable, Generator
+from network_utils.async_tcp_client import AsyncBGPClient
+from routing_software_interface.basic_types import RouterConfiguration
+from routing_software_interface.async_router import AsyncRouter, AsyncCapture
+from routing_software_interface.utils import get_router_interface
+from .exabgp_agent import AsyncExaBGPClient
+from .testcase_source import TestcaseItem, TestcaseSource
+from .test_agent import TestAgent, TRACE_FILE_PREFIX
+
+async def async_run_steps(steps: Generator) -> Any:
+    """
+    Run the steps of `TestAgent` with the asyncio clients and router interface:
+    the awaitables yielded by the steps are awaited, and their results (or exceptions) are sent back.
+    Return the value returned by the steps.
+    """
+    value, error = None, None
+    while True:
+        try:
+            step = steps.send(value) if error is None else steps.throw(error)
+        except StopIteration as stop:
+            return stop.value
+        value, error = None, None
+        try:
+            value = await step if inspect.isawaitable(step) else step
+        except Exception as exception:
+            error = exception
+
+class AsyncTestAgent(TestAgent):
+    """
+    BGP software test agent running on asyncio.
+    """
+    tcp_client_class = AsyncBGPClient
+    exabgp_client_class = AsyncExaBGPClient
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The writing of the dumps of the previous testcase, see `submit_dumps`.
+        self.pending_dump : asyncio.Future = None
+
+    ########## Router session management ##########
+
+    async def start_session(self, router_interface: AsyncRouter, warm: bool = False):
+        await async_run_steps(self.start_session_steps(router_interface, warm))
+
+    async def end_session(self, router_interface: AsyncRouter, warm: bool = False):
+        await async_run_steps(self.end_session_steps(router_interface, warm))
+
+    ########## Run testcases ##########
+
+    def run_source(self,
+                   source: TestcaseSource,
+                   router_configuration: RouterConfiguration,
+                   warm: bool = False,
+                   post_process: Callable[[int, str], None] = None):
+        """
+        Run the testcases of `source` on a new interface of the routing software, in a new event loop.
+        `post_process` is called in a worker thread, while the next testcase is running.
+        """
+        router_interface = AsyncRouter(get_router_interface(router_configuration))
+        asyncio.run(self.run(source, router_interface, router_configuration, warm, post_process))
+
+    async def run(self,
+                  source: TestcaseSource,
+                  router_interface: AsyncRouter,
+                  router_configuration: RouterConfiguration,
+                  warm: bool = False,
+                  post_process: Callable[[int, str], None] = None,
+                  trace_name: str = TRACE_FILE_PREFIX):
+        """
+        Run the testcases of `source` one by one, see `TestAgent.source_steps`.
+        """
+        await async_run_steps(self.source_steps(source, router_interface, router_configuration,
+                                                warm, post_process, trace_name))
+
+    def get_capture(self,
+                    router_interface: AsyncRouter,
+                    router_configuration: RouterConfiguration) -> AsyncCapture:
+        return AsyncCapture(super().get_capture(router_interface, router_configuration))
+
+    ########## Write the dumps ##########
+
+    async def submit_dumps(self,
+                           item: TestcaseItem,
+                           log_contents: dict[str, str],
+                           router_configuration: RouterConfiguration,
+                           post_process: Callable[[int, str], None] = None):
+        """
+        Write the dumps of a finished testcase in a worker thread, while the next testcase is running.
+        At most one testcase is being written, so the dumps do not pile up.
+        """
+        wait_records = self.wait_recorder.pop_records()
+        await self.flush_dumps()
+        self.pending_dump = asyncio.ensure_future(asyncio.to_thread(
+            self.write_dumps, item, log_contents, wait_records, router_configuration, post_process))
+
+    async def flush_dumps(self):
+        if self.pending_dump is not None:
+            pending_dump, self.pending_dump = self.pending_dump, None
+            await pending_dump
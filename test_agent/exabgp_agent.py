@@ -5,9 +5,15 @@ This file defines the agent observing the behavior of the routing software.
 from configparser import ConfigParser
 from dataclasses import dataclass
 from basic_utils.const import REPO_ROOT_PATH
-import re, subprocess, os, signal, atexit
+from basic_utils.wait_utils import run_poll
+from basic_utils.async_utils import run_poll as async_run_poll
+from routing_software_interface.log_follower import LogFollower
+from time import monotonic
+from typing import Generator
+import re, subprocess, os, signal, atexit, asyncio
 
 EXA_BGP_LOG = f"{REPO_ROOT_PATH}/log/exabgp.log"
+EXA_BGP_CONF = "config/exabgp.conf"
 
 # This function is currently unused.
 def parse_exabgp_config(file_path):
@@ -83,6 +89,10 @@ class ExaBGPClientConfiguration:
     """
     # the namespace used by the ExaBGP client
     namespace : str
+    # the configuration file of the ExaBGP client
+    config_path : str = EXA_BGP_CONF
+    # the log file of the ExaBGP client
+    log_path : str = EXA_BGP_LOG
 
 class ExaBGPClient:
     """
@@ -92,6 +102,10 @@ class ExaBGPClient:
     def __init__(self, configuration : ExaBGPClientConfiguration):
         self.configuration = configuration
         self.process = None
+        # Follow the log, so the content of each testcase can be read while the client keeps running.
+        self.log_follower = LogFollower(self.configuration.log_path)
+        # Watch the log without consuming the content read by `read_new_log`.
+        self.watch_follower = LogFollower(self.configuration.log_path)
 
     def start(self):
         """
@@ -114,15 +128,23 @@ class ExaBGPClient:
             # You should replace this place with your own user home
             site_package_path = site_package_path.replace("/root", "/home/xinpeilin", 1)
 
-        os.system(f"sudo rm {EXA_BGP_LOG}")
+        os.system(f"sudo rm {self.configuration.log_path}")
+        self.log_follower.reset()
+        self.watch_follower.reset()
         process = subprocess.Popen(
-            f"sudo ip netns exec {self.configuration.namespace} env PYTHONPATH={site_package_path} {exabgp_path} config/exabgp.conf --debug > {EXA_BGP_LOG}",
+            f"sudo ip netns exec {self.configuration.namespace} env PYTHONPATH={site_package_path} {exabgp_path} {self.configuration.config_path} --debug > {self.configuration.log_path}",
             shell=True,
             stdout=subprocess.PIPE,
             preexec_fn=os.setsid
         )
         self.process = process
 
+    def is_running(self) -> bool:
+        """
+        Return if the ExaBGP client is started and still running.
+        """
+        return self.process is not None and self.process.poll() is None
+
     def end(self):
         """
         Shut down the ExaBGP client
@@ -135,15 +157,47 @@ class ExaBGPClient:
         """
         Read the content from the ExaBGP client's log.
         """
-        with open(EXA_BGP_LOG, 'r') as file:
+        with open(self.configuration.log_path, 'r') as file:
             content = file.read()
         return content
 
+    def read_new_log(self):
+        """
+        Read the content appended to the ExaBGP client's log since the last call (or the start).
+        The log is not truncated, since ExaBGP keeps writing at its own offset.
+        """
+        return self.log_follower.read_new()
+
+    def skip_new_log(self):
+        """
+        Skip the content appended to the log so far, so `read_new_log` starts from here.
+        """
+        self.log_follower.skip_to_end()
+
+    def poll_log(self,
+                 idle_window: float = None,
+                 timeout: float = None) -> Generator[float, None, bool]:
+        """
+        The poll loop of `wait_for_log`, see `LogFollower.poll_quiescence`.
+        """
+        start_time = monotonic()
+        yield from self.watch_follower.poll_quiescence(idle_window, timeout)
+        return timeout is None or monotonic() - start_time < timeout
+
+    def wait_for_log(self,
+                     idle_window: float = None,
+                     timeout: float = None) -> bool:
+        """
+        Wait until nothing is appended to the log within `idle_window` seconds,
+        return False if `timeout` seconds have passed first.
+        """
+        return run_poll(self.poll_log(idle_window, timeout))
+
     def clear_log(self):
         """
         Clear the content from the ExaBGP client's log.
         """
-        with open(EXA_BGP_LOG, 'w') as file:
+        with open(self.configuration.log_path, 'w') as file:
             file.write('')
         return
 
@@ -151,7 +205,51 @@ class ExaBGPClient:
         """
         Destructor to ensure proper cleanup
         """
-        os.system("sudo pkill -f exabgp")
+        if self.configuration.config_path == EXA_BGP_CONF:
+            os.system("sudo pkill -f exabgp")
+        else:
+            # Only kill the ExaBGP process of this client, other sandboxes may be running.
+            os.system(f"sudo pkill -f {self.configuration.config_path}")
+
+class AsyncExaBGPClient:
+    """
+    The asyncio version of `ExaBGPClient`.
+    """
+    def __init__(self, configuration : ExaBGPClientConfiguration):
+        self.client = ExaBGPClient(configuration)
+
+    @property
+    def configuration(self) -> ExaBGPClientConfiguration:
+        return self.client.configuration
+
+    async def start(self):
+        """
+        Initialize the ExaBGP client, see `ExaBGPClient.start`.
+        """
+        await asyncio.to_thread(self.client.start)
+
+    def is_running(self) -> bool:
+        return self.client.is_running()
+
+    async def end(self):
+        self.client.end()
+
+    async def read_log(self) -> str:
+        return await asyncio.to_thread(self.client.read_log)
+
+    async def read_new_log(self) -> str:
+        return await asyncio.to_thread(self.client.read_new_log)
+
+    def skip_new_log(self):
+        self.client.skip_new_log()
+
+    async def wait_for_log(self,
+                           idle_window: float = None,
+                           timeout: float = None) -> bool:
+        """
+        The awaitable version of `ExaBGPClient.wait_for_log`.
+        """
+        return await async_run_poll(self.client.poll_log(idle_window, timeout))
 
 #################### Deprecated ####################
 
@@ -0,0 +1,183 @@
+"""
+This file defines the worker pool running a test batch across several isolated sandboxes.
+Each sandbox has its own virtual network (the router software in its own namespace),
+routing daemon instance and ExaBGP client, so the testcases can run concurrently.
+"""
+
+import os, copy, shutil
+import multiprocessing as mp
+from dataclasses import dataclass, replace
+from typing import Iterator
+from basic_utils.const import REPO_ROOT_PATH
+from basic_utils.trace_utils import Tracer, TRACE_JSONL_SUFFIX
+from network_utils.tcp_client import TCPClientConfiguration
+from routing_software_interface.basic_types import RouterConfiguration, RouterSandbox
+from routing_software_interface.hot_standby import HotStandby
+from routing_software_interface.utils import get_router_interface
+from vnet_config import VNET_CONFIG, set_up_vnet, tear_down_vnet, get_sandbox_vnet_config, get_sandbox_name
+from .exabgp_agent import ExaBGPClientConfiguration
+from .test_agent import TestAgent, TRACE_FILE_PREFIX
+from .testcase_source import BatchTestcaseSource, load_test_batch, prepare_batch_dump_dir
+
+SANDBOX_DIR = f"{REPO_ROOT_PATH}/log/sandboxes"
+
+@dataclass
+class SandboxSetting:
+    """
+    The resources of a sandbox.
+    """
+    # the index of the sandbox
+    index : int
+    # the vnet configuration of the sandbox, see `get_sandbox_vnet_config`
+    vnet_config : dict
+    # the private daemon instance of the sandbox
+    router_sandbox : RouterSandbox
+    # the BGP instance configuration using the veths of the sandbox
+    router_configuration : RouterConfiguration
+    # the clients running in the namespaces of the sandbox
+    tcp_client_config : TCPClientConfiguration
+    exabgp_client_config : ExaBGPClientConfiguration
+
+def get_sandbox_setting(index: int,
+                        vnet_config: dict,
+                        router_configuration: RouterConfiguration,
+                        tcp_client_config: TCPClientConfiguration,
+                        exabgp_client_config: ExaBGPClientConfiguration) -> SandboxSetting:
+    """
+    Get the setting of the sandbox `index` from the settings of the single-router test.
+    """
+    if tcp_client_config.netns is None:
+        raise ValueError("The TCP client must run in a network namespace to be sandboxed!")
+    sandbox_vnet_config = get_sandbox_vnet_config(vnet_config, index)
+    work_dir = f"{SANDBOX_DIR}/sandbox_{index}"
+    sandbox_router_configuration = copy.deepcopy(router_configuration)
+    for neighbor in sandbox_router_configuration.neighbors:
+        if neighbor.local_source == vnet_config["router_software"]["veth"]:
+            neighbor.local_source = sandbox_vnet_config["router_software"]["veth"]
+    return SandboxSetting(
+        index=index,
+        vnet_config=sandbox_vnet_config,
+        router_sandbox=RouterSandbox(namespace=sandbox_vnet_config["router_software"]["namespace"],
+                                     work_dir=work_dir),
+        router_configuration=sandbox_router_configuration,
+        tcp_client_config=replace(tcp_client_config,
+                                  netns=get_sandbox_name(tcp_client_config.netns, index)),
+        exabgp_client_config=replace(exabgp_client_config,
+                                     namespace=get_sandbox_name(exabgp_client_config.namespace, index),
+                                     config_path=f"{work_dir}/exabgp.conf",
+                                     log_path=f"{work_dir}/exabgp.log"),
+    )
+
+def iterate_queue(queue: mp.Queue) -> Iterator[int]:
+    """
+    Yield the testcase ids from the queue until the `None` sentinel.
+    """
+    while True:
+        testcase_id = queue.get()
+        if testcase_id is None:
+            return
+        yield testcase_id
+
+def run_sandbox_worker(setting: SandboxSetting,
+                       test_batch_name: str,
+                       testcase_list: list,
+                       testcase_queue: mp.Queue,
+                       dump_dir_path: str,
+                       original_exabgp_config_path: str,
+                       warm: bool,
+                       standby: bool,
+                       route_dump: bool):
+    """
+    Set up the sandbox, run the testcases taken from `testcase_queue`, then tear down the sandbox.
+    If `standby`, a standby daemon is kept to be swapped in after a crash, see `HotStandby`.
+    """
+    os.makedirs(setting.router_sandbox.work_dir, exist_ok=True)
+    # The sandboxes reuse the IP addresses, so the ExaBGP configuration stays the same.
+    shutil.copyfile(original_exabgp_config_path, setting.exabgp_client_config.config_path)
+    set_up_vnet(setting.vnet_config)
+    router_interface = get_router_interface(setting.router_configuration, setting.router_sandbox)
+    hot_standby = None
+    try:
+        # Start the private daemon instance.
+        router_interface.recover_from_crash()
+        if standby:
+            hot_standby = HotStandby(router_interface, setting.vnet_config["router_software"])
+            hot_standby.start()
+            router_interface.standby = hot_standby
+        test_agent = TestAgent(tcp_client_config=setting.tcp_client_config,
+                               exabgp_client_config=setting.exabgp_client_config)
+        test_agent.route_dump = route_dump
+        # The spans of the sandboxes are told apart in the merged trace.
+        test_agent.tracer = Tracer(worker=setting.index)
+        source = BatchTestcaseSource(test_batch_name=test_batch_name,
+                                     testcase_list=testcase_list,
+                                     testcase_ids=iterate_queue(testcase_queue),
+                                     dump_dir_path=dump_dir_path)
+        test_agent.run(source, router_interface, setting.router_configuration, warm,
+                       trace_name=f"{TRACE_FILE_PREFIX}_sandbox_{setting.index}")
+    finally:
+        router_interface.stop_daemon()
+        if hot_standby is not None:
+            print(f"Sandbox {setting.index}: the standby has been swapped in {hot_standby.swap_num} times.")
+            hot_standby.tear_down()
+        tear_down_vnet(setting.vnet_config)
+
+def run_test_batch_parallel(test_batch_name: str,
+                            router_configuration: RouterConfiguration,
+                            tcp_client_config: TCPClientConfiguration,
+                            exabgp_client_config: ExaBGPClientConfiguration,
+                            sandbox_num: int,
+                            warm: bool = False,
+                            vnet_config: dict = None,
+                            standby: bool = False,
+                            route_dump: bool = True):
+    """
+    Run the test batch across `sandbox_num` sandboxes,
+    the results are dumped in the same layout as `TestAgent.run_test_batch`.
+    If `standby`, each sandbox keeps a standby daemon to be swapped in after a crash.
+    If not `route_dump`, the RIB of the testcases is not dumped, see `TestAgent.route_dump`.
+    The testcases are handed out one by one, so a slow sandbox (e.g. recovering from a crash)
+    does not hold back the others.
+    """
+    if vnet_config is None:
+        vnet_config = VNET_CONFIG
+    testcase_list = load_test_batch(test_batch_name)
+    dump_dir_path = prepare_batch_dump_dir(test_batch_name)
+
+    # The workers are forked, so the testcases are not pickled.
+    context = mp.get_context("fork")
+    testcase_queue = context.Queue()
+    for i in range(0, len(testcase_list)):
+        testcase_queue.put(i)
+    for _ in range(0, sandbox_num):
+        testcase_queue.put(None)
+
+    process_list = []
+    for index in range(0, sandbox_num):
+        setting = get_sandbox_setting(index, vnet_config, router_configuration,
+                                      tcp_client_config, exabgp_client_config)
+        process = context.Process(
+            target=run_sandbox_worker,
+            args=(setting, test_batch_name, testcase_list, testcase_queue,
+                  dump_dir_path, exabgp_client_config.config_path, warm, standby, route_dump),
+            name=f"sandbox_{index}",
+        )
+        process.start()
+        process_list.append(process)
+
+    for process in process_list:
+        process.join()
+        if process.exitcode != 0:
+            print(f"Warning: {process.name} exited with code {process.exitcode}, "
+                  f"some testcases may not have been run.")
+
+    ########## Merge the traces of the sandboxes ##########
+
+    result_dir_path = os.path.dirname(dump_dir_path)
+    tracer = Tracer()
+    for index in range(0, sandbox_num):
+        trace_path = f"{result_dir_path}/{TRACE_FILE_PREFIX}_sandbox_{index}{TRACE_JSONL_SUFFIX}"
+        if os.path.exists(trace_path):
+            tracer.read_jsonl(trace_path)
+    tracer.export(f"{result_dir_path}/{TRACE_FILE_PREFIX}")
+    tracer.report()
@@ -2,19 +2,27 @@
 This file defines the agent used to advertise malformed messages.
 """
 
+import json, traceback
 from types import FunctionType
-from time import sleep
+from time import sleep, monotonic
+from typing import Any, Callable, Generator
+from contextlib import contextmanager
 from basic_utils.serialize_utils import save_variable_to_file, read_variables_from_file
 from basic_utils.time_utils import get_current_time
+from basic_utils.wait_utils import WaitRecorder
+from basic_utils.trace_utils import Tracer
 from basic_utils.file_utils import *
 from basic_utils.const import *
 from bgp_utils.message import MessageType
-from network_utils.tcp_client import TCPClient, TCPClientConfiguration
+from network_utils.tcp_client import BGPClient, TCPClientConfiguration
 from routing_software_interface.basic_types import RouterConfiguration, RouterSoftwareType
+from routing_software_interface.router_base import BaseRouter
 from routing_software_interface.router_frr import FRRRouter
 from routing_software_interface.router_bird import BIRDRouter
 from routing_software_interface.utils import get_router_interface
-from .test_suite import Halt, TestCase, TestSuite
+from routing_software_interface.capture_strategy import CaptureStrategy, TapCapture, get_capture_strategy
+from .test_suite import Halt, TestCase, TestSuite, get_bursts
+from .testcase_source import *
 from .exabgp_agent import ExaBGPClient, ExaBGPClientConfiguration, start_exabgp, stop_exabgp
 
 MESSAGE_MRT_FILE = "messages.mrt"
@@ -24,6 +32,17 @@ BGPD_LOG_FILE = "bgpd.log"
 ROUTER_CONFIG_PKL_FILE = "router_conf.pkl"
 TESTCASE_PKL_FILE = "testcase.pkl"
 CRASH_MARKER_FILE = "crashed"
+WAIT_RECORD_FILE = "waits.json"
+PEER_MESSAGE_FILE = "peer_messages.json"
+# The prefix of the trace files written next to the dumps, see `Tracer.export`.
+TRACE_FILE_PREFIX = "trace"
+
+# A log is regarded as stable if nothing is appended within this duration (in seconds).
+LOG_IDLE_WINDOW = 0.5
+# The upper bounds of the waits (in seconds).
+HALT_TIMEOUT = 2
+EXABGP_LOG_TIMEOUT = 2
+RECOVERY_TIMEOUT = 1
 
 TEMP_DUMP_DIR = f"{REPO_ROOT_PATH}/log/temp_dump"
 TEMP_MESSAGE_DUMP = f"{TEMP_DUMP_DIR}/{MESSAGE_MRT_FILE}"
@@ -31,10 +50,31 @@ TEMP_ROUTE_DUMP = f"{TEMP_DUMP_DIR}/{ROUTE_MRT_FILE}"
 TEMP_EXABGP_DUMP = f"{TEMP_DUMP_DIR}/{EXABGP_LOG_FILE}"
 TEMP_BGPD_DUMP = f"{TEMP_DUMP_DIR}/{BGPD_LOG_FILE}"
 
+def run_steps(steps: Generator) -> Any:
+    """
+    Run the steps of `TestAgent` with the blocking clients and router interface:
+    the calls yielded by the steps have already returned, so their results are sent back as they are.
+    Return the value returned by the steps.
+    """
+    value = None
+    while True:
+        try:
+            value = steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+
 class TestAgent:
     """
     BGP software test agent. 
+    The steps of the testcases are written once, as generators (the methods `*_steps`)
+    yielding each call to the clients, the router interface and the capture strategy, and getting its result back:
+    `TestAgent` runs them with the blocking versions (see `run_steps`),
+    `AsyncTestAgent` with the asyncio versions, whose calls are awaited (see `async_run_steps`).
     """
+    # The clients, replaced by their asyncio versions in `AsyncTestAgent`.
+    tcp_client_class = BGPClient
+    exabgp_client_class = ExaBGPClient
+
     def __init__(self,
                  tcp_client_config: TCPClientConfiguration,
                  exabgp_client_config: ExaBGPClientConfiguration
@@ -46,8 +86,20 @@ class TestAgent:
         self.tcp_client_config : TCPClientConfiguration = tcp_client_config
         self.exabgp_client_config : ExaBGPClientConfiguration = exabgp_client_config
         # Initialize the clients
-        self.tcp_client = TCPClient(self.tcp_client_config)
-        self.exabgp_client = ExaBGPClient(self.exabgp_client_config)
+        self.tcp_client : BGPClient = self.tcp_client_class(self.tcp_client_config)
+        self.exabgp_client : ExaBGPClient = self.exabgp_client_class(self.exabgp_client_config)
+        # The router whose BGP instance is kept alive across testcases (see `start_session_steps`),
+        # and the signature of the configuration it was started with.
+        self.warm_router : BaseRouter = None
+        self.warm_signature : tuple = None
+        # Record the actual duration of the waits of each testcase.
+        self.wait_recorder = WaitRecorder()
+        # Called with `(phase name, start time, end time)` at the end of each phase, see `phase`.
+        self.phase_hooks : list[Callable[[str, float, float], None]] = []
+        # Record the spans of the phases (and of the calls to the routing software) of a run.
+        self.tracer = Tracer()
+        # Dump the RIB of each testcase, only needed by the checks on the routes (e.g. `exist_route`).
+        self.route_dump = True
     
     def test(self):
         """For debug"""
@@ -57,419 +109,472 @@ class TestAgent:
         sleep(5)
         stop_exabgp(ret)
 
-    # TODO: Deal with the dumping here: Can we make it a callback function?
-    def run_test_single(self,
-                        test_case: TestCase,
-                        router_configuration: RouterConfiguration,
-                        test_name: str):
+    ########## Router session management ##########
+
+    def get_tester_ip(self) -> str:
         """
-        Run a single testcase.
+        Get the IP address of the tester peer (the TCP client), `None` if it is not bound.
         """
+        bind_val = self.tcp_client_config.bind_val
+        return bind_val[0] if bind_val is not None else None
 
-        ########## Initialize the routing software interface. ##########
-
-        router_interface = get_router_interface(router_configuration)
-
-        ########## Prepare for dumping ##########
-
-        # Create the dump directory
-        test_name = f"{test_name}_{get_current_time()}"
-        dump_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_SINGLE}/{test_name}"
-        assert not directory_exists(dump_path)
-        create_dir(dump_path)
-        
-        # Clear the bgpd log.
-        router_interface.clear_log() 
-        
-        ########## Start the routing software instance and clients ##########
-
-        router_interface.start_bgp_instance()
-        router_interface.wait_for_log() # Start the clients one by one.
-        self.exabgp_client.start()
-        router_interface.wait_for_log() # Start the clients one by one.
-        self.tcp_client.start()
-
-        ########## Minor part of dumping ##########
-
-        # Different dumping behavior for different BGP softwares
-        if isinstance(router_interface, FRRRouter):
-            # For FRRouting bgpd, we start to dump ONLY BGP UPDATE messages here.
-            router_interface.dump_updates(f"{dump_path}/{MESSAGE_MRT_FILE}")
-        elif isinstance(router_interface, BIRDRouter):
-            # For BIRD bgpd, we start to dump ALL BGP messages here.
-            router_interface.dump_messages(f"{dump_path}/{MESSAGE_MRT_FILE}")
-        else:
-            # This should not happen...
-            raise ValueError("Unexpected type of the router interface!")
-
-        ########## Send the test messages ##########
-
-        # Send the message one-by-one
-        for message in test_case:
-            if isinstance(message, Halt):
-                print("Halting between BGP messages to ensure fully updating...")
-                sleep(2)
-                continue
-            self.tcp_client.send(message.get_binary_expression())
-            router_interface.wait_for_log() # Wait the state to become stable.
-            if router_interface.if_crashed():
-                break
-        
-        ########## Main part of dumping ##########
-        
-        # Wait for the ExaBGP log to be ready
-        sleep(2)
-
-        # Get the contents for bgpd log and exabgp log
-        bgpd_log_content = router_interface.read_log()
-        exabgp_log_content = self.exabgp_client.read_log()
-        # Clear the bgpd log
-        # There is no need to clear the exabgp log since it will be overwritten 
-        router_interface.clear_log()
-        # Create bgpd log and exabgp log
-        create_file(f"{dump_path}/{BGPD_LOG_FILE}", bgpd_log_content)
-        create_file(f"{dump_path}/{EXABGP_LOG_FILE}", exabgp_log_content)
-
-        # Dumping RIB here, different behaviors for different BGP softwares
-        if isinstance(router_interface, FRRRouter):
-            # For FRRouting bgpd, dumping RIB is like taking a snapshot.
-            router_interface.dump_routing_table(f"{dump_path}/{ROUTE_MRT_FILE}")
-            # Sleep for a while to wait for the dumping
-            sleep(1.5)
-        elif isinstance(router_interface, BIRDRouter):
-            # For BIRD bgpd, dumping is periodic, we set the period as 1 second.
-            router_interface.dump_routing_table(f"{dump_path}/{ROUTE_MRT_FILE}")
-            # So we need to sleep longer
-            sleep(2)
-        else:
-            # This should not happen...
-            raise ValueError("Unexpected type of the router interface!")
-
-        # Stop MRT dumping, different behaviors for different BGP softwares
-        if isinstance(router_interface, FRRRouter):
-            router_interface.stop_dump_updates()
-            router_interface.stop_dump_routing_table()
-        elif isinstance(router_interface, BIRDRouter):
-            router_interface.stop_dump_messages()
-            router_interface.stop_dump_routing_table()
-        else:
-            # This should not happen...
-            raise ValueError("Unexpected type of the router interface!")
-
-        # Dump the testcase setting
-        save_variable_to_file(router_configuration, 
-                                f"{dump_path}/{ROUTER_CONFIG_PKL_FILE}")
-        save_variable_to_file(test_case, 
-                                f"{dump_path}/{TESTCASE_PKL_FILE}")
-        
-        # Allow user to access the dumped directory
-        allow_user_access(dump_path)
-
-        ########## End the routing software instance and clients ##########
-        
-        self.tcp_client.end()
-        router_interface.wait_for_log() # Shut down the clients one by one.
-        self.exabgp_client.end()
-        router_interface.end_bgp_instance()
-
-        ###### Recover if the routing software crashes ######
-
-        if router_interface.if_crashed():
-            print("Software crashed! Recovering...")
-            # (Currently) Save the router configuration and the testcase
-            # to a special folder and restart.
-            self.save_crash_setting(router_config=router_configuration,
-                                    test_case=test_case,
-                                    name=f"single_testcase_{get_current_time()}")
-            self.tcp_client.end()
-            self.exabgp_client.end()
-            # Restart and wait for a while
-            router_interface.recover_from_crash()
-            sleep(1)
-
-    def run_test_batch(self, 
-                       test_batch_name: str,
-                       router_configuration: RouterConfiguration):
+    def is_session_warm(self, router_interface: BaseRouter) -> bool:
         """
-        Run the test in batch, and dump the result into the target directory.
+        Return if the BGP instance of `router_interface` is kept alive with its current configuration.
         """
+        return self.warm_router is router_interface \
+            and self.warm_signature == router_interface.router_configuration.get_signature() \
+            and self.exabgp_client.is_running()
 
-        ######### Initialize the router interface ##########
-
-        router_interface = get_router_interface(router_configuration)
-
-        ######### Prepare the directory for dumping #########
-        
-        data_file_path = f"{REPO_ROOT_PATH}/test_batches/{test_batch_name}.pkl"
-        dump_dir_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_BATCHED}/{test_batch_name}"
-        if directory_exists(dump_dir_path):
-            os.system(f"sudo rm -r {dump_dir_path}")
-        create_dir(dump_dir_path)
-        dump_dir_path = f"{dump_dir_path}/data"
-        create_dir(dump_dir_path)
+    def start_session_steps(self, router_interface: BaseRouter, warm: bool = False) -> Generator:
+        """
+        Start the routing software instance and the clients for a testcase.
+        If `warm`, the BGP instance and the ExaBGP client are reused if they are still alive
+        with the same configuration, so only the TCP client (the tester peer) connects.
+        """
+        if warm and self.is_session_warm(router_interface):
+            # The withdraws of the reset of the previous testcase (see `end_session_steps`) are not part of this one.
+            self.exabgp_client.skip_new_log()
+            with self.phase("tcp_connect"):
+                yield self.tcp_client.start()
+            return
+        # Tear down the instance left by the previous testcases, e.g. the configuration has changed.
+        yield from self.end_warm_session_steps()
+        with self.phase("router_start"):
+            yield router_interface.start_bgp_instance()
+            yield router_interface.wait_for_log() # Start the clients one by one.
+        with self.phase("exabgp_start"):
+            yield self.exabgp_client.start()
+            yield router_interface.wait_for_log() # Start the clients one by one.
+        with self.phase("tcp_connect"):
+            yield self.tcp_client.start()
+        if warm:
+            self.warm_router = router_interface
+            self.warm_signature = router_interface.router_configuration.get_signature()
+
+    def end_session_steps(self, router_interface: BaseRouter, warm: bool = False) -> Generator:
+        """
+        End the testcase started by `start_session_steps`.
+        If `warm`, only the session of the tester peer is reset, 
+        the routes it announced are withdrawn and the BGP instance is kept.
+        """
+        with self.phase("tcp_close"):
+            yield self.tcp_client.end()
+            yield router_interface.wait_for_log() # Shut down the clients one by one.
+        tester_ip = self.get_tester_ip()
+        if warm and tester_ip is not None and self.is_session_warm(router_interface):
+            with self.phase("session_reset"):
+                yield router_interface.reset_neighbor_session(tester_ip)
+                yield router_interface.wait_for_log() # Wait for the routes to be withdrawn.
+            return
+        self.warm_router = None
+        with self.phase("teardown"):
+            yield self.exabgp_client.end()
+            yield router_interface.end_bgp_instance()
+
+    def end_warm_session_steps(self) -> Generator:
+        """
+        Shut down the BGP instance kept alive by `start_session_steps`, if any.
+        """
+        if self.warm_router is None:
+            return
+        warm_router, self.warm_router = self.warm_router, None
+        yield self.tcp_client.end()
+        yield self.exabgp_client.end()
+        if not (yield warm_router.is_crashed()):
+            yield warm_router.end_bgp_instance()
+
+    def invalidate_session(self):
+        """
+        Rebuild the BGP instance for the next testcase, e.g. after a crash.
+        """
+        self.warm_router = None
+        self.warm_signature = None
 
-        ########## Enumerate the testcases ##########
+    def start_session(self, router_interface: BaseRouter, warm: bool = False):
+        """
+        Start the routing software instance and the clients, see `start_session_steps`.
+        """
+        run_steps(self.start_session_steps(router_interface, warm))
 
-        # First read out the testcases
-        testcase_list = read_variables_from_file(data_file_path)[0]
-        
-        for i in range(0,len(testcase_list)):
+    def end_session(self, router_interface: BaseRouter, warm: bool = False):
+        """
+        End the session started by `start_session`, see `end_session_steps`.
+        """
+        run_steps(self.end_session_steps(router_interface, warm))
 
-            print(f"======= Running testcase {i+1} =======")
-            
-            ###### Prepare for dumping ######
+    ########## Waits ##########
 
-            testcase_dump_dir_path = f"{dump_dir_path}/testcase_{i+1}"
-            create_dir(testcase_dump_dir_path)
+    def wait_for_halt_steps(self, router_interface: BaseRouter) -> Generator:
+        """
+        Wait until the routing software has processed the messages before a `Halt`,
+        i.e. its log is stable.
+        """
+        with self.wait_recorder.measure("halt", HALT_TIMEOUT):
+            yield router_interface.wait_for_log(LOG_IDLE_WINDOW, timeout=HALT_TIMEOUT)
 
-            test_case = testcase_list[i]
+    def wait_for_exabgp_log_steps(self) -> Generator:
+        """
+        Wait until the routes propagated to the ExaBGP client are logged, i.e. its log is stable.
+        """
+        with self.wait_recorder.measure("exabgp_log", EXABGP_LOG_TIMEOUT):
+            yield self.exabgp_client.wait_for_log(LOG_IDLE_WINDOW, timeout=EXABGP_LOG_TIMEOUT)
 
-            # Clear the bgpd log.
-            router_interface.clear_log() 
+    def wait_for_routing_table_steps(self, router_interface: BaseRouter, path: str) -> Generator:
+        """
+        Wait until the RIB dump requested by `dump_routing_table` is written to `path`.
+        """
+        start_time = monotonic()
+        ready = yield router_interface.wait_for_routing_table(path)
+        self.wait_recorder.record("route_dump", monotonic() - start_time, ready)
 
-            ###### Start the routing software instance and clients ######
+    def recover_router_steps(self, router_interface: BaseRouter) -> Generator:
+        """
+        Restart the crashed routing software and wait until its log is stable.
+        """
+        with self.wait_recorder.measure("recover_from_crash"):
+            yield router_interface.recover_from_crash()
+        with self.wait_recorder.measure("recovery_log", RECOVERY_TIMEOUT):
+            yield router_interface.wait_for_log(LOG_IDLE_WINDOW, timeout=RECOVERY_TIMEOUT)
 
-            router_interface.start_bgp_instance()
-            router_interface.wait_for_log() # Start the clients one by one.
-            self.exabgp_client.start()
-            router_interface.wait_for_log() # Start the clients one by one.
-            self.tcp_client.start()
+    ########## Phases ##########
 
-            ###### Minor part of dumping ######
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a phase of the testcase, the span is recorded in `self.tracer`
+        and the phase hooks are called with `(name, start_time, end_time)` (by `time.monotonic`).
+        """
+        start_time = monotonic()
+        try:
+            yield
+        finally:
+            end_time = monotonic()
+            self.tracer.record(name, start_time, end_time)
+            for hook in self.phase_hooks:
+                hook(name, start_time, end_time)
 
-            # We should dump into temporary path first and then 
-            # copy to the "permanent storage" if `dump_all` is set.
+    ########## Run testcases ##########
 
-            # Different dumping behavior for different BGP softwares
-            if isinstance(router_interface, FRRRouter):
-                # For FRRouting bgpd, we start to dump ONLY BGP UPDATE messages here.
-                router_interface.dump_updates(f"{testcase_dump_dir_path}/{MESSAGE_MRT_FILE}")
-            elif isinstance(router_interface, BIRDRouter):
-                # For BIRD bgpd, we start to dump ALL BGP messages here.
-                router_interface.dump_messages(f"{testcase_dump_dir_path}/{MESSAGE_MRT_FILE}")
-            else:
-                # This should not happen...
-                raise ValueError("Unexpected type of the router interface!")
+    def run_test_single(self,
+                        test_case: TestCase,
+                        router_configuration: RouterConfiguration,
+                        test_name: str):
+        """
+        Run a single testcase.
+        """
+        source = SingleTestcaseSource(test_case, test_name)
+        self.run_source(source, router_configuration)
+        # Allow user to access the dumped directory
+        allow_user_access(source.dump_path)
 
-            try:
-                ###### Send the test messages ######
-
-                # Send the message one-by-one
-                for message in test_case:
-                    if isinstance(message, Halt):
-                        print("Halting between BGP messages to ensure fully updating...")
-                        sleep(2)
-                        continue
-                    self.tcp_client.send(message.get_binary_expression())
-                    router_interface.wait_for_log() # Wait the state to become stable.
-                    if router_interface.if_crashed():
-                        raise ValueError("Routing daemon crashed!")
-                
-                ###### Main part of dumping ######
-            
-                # Wait for the ExaBGP log to be ready
-                sleep(2)
-
-                # Get the contents for bgpd log and exabgp log
-                bgpd_log_content = router_interface.read_log()
-                exabgp_log_content = self.exabgp_client.read_log()
-                # Clear the bgpd log
-                # There is no need to clear the exabgp log since it will be overwritten 
-                router_interface.clear_log()
-                # Create bgpd log and exabgp log
-                create_file(f"{testcase_dump_dir_path}/{BGPD_LOG_FILE}", bgpd_log_content)
-                create_file(f"{testcase_dump_dir_path}/{EXABGP_LOG_FILE}", exabgp_log_content)
-                # Dump the testcase settings
-                save_variable_to_file(router_configuration, 
-                                    f"{testcase_dump_dir_path}/{ROUTER_CONFIG_PKL_FILE}")
-                save_variable_to_file(test_case,
-                                    f"{testcase_dump_dir_path}/{TESTCASE_PKL_FILE}")
-
-                # Dumping RIB here, different behaviors for different BGP softwares
-                if isinstance(router_interface, FRRRouter):
-                    # For FRRouting bgpd, dumping RIB is like taking a snapshot.
-                    router_interface.dump_routing_table(f"{testcase_dump_dir_path}/{ROUTE_MRT_FILE}")
-                    # Sleep for a while to wait for the dumping
-                    sleep(1.5)
-                elif isinstance(router_interface, BIRDRouter):
-                    # For BIRD bgpd, dumping is periodic, we set the period as 1 second.
-                    router_interface.dump_routing_table(f"{testcase_dump_dir_path}/{ROUTE_MRT_FILE}")
-                    # So we need to sleep longer
-                    sleep(2)
-
-                # Stop MRT dumping, different behaviors for different BGP softwares
-                if isinstance(router_interface, FRRRouter):
-                    router_interface.stop_dump_updates()
-                    router_interface.stop_dump_routing_table()
-                elif isinstance(router_interface, BIRDRouter):
-                    router_interface.stop_dump_messages()
-                    router_interface.stop_dump_routing_table()
-            
-                ###### End the routing software instance and clients ######
-                
-                self.tcp_client.end()
-                router_interface.wait_for_log() # Shut down the clients one by one.
-                self.exabgp_client.end()
-                router_interface.end_bgp_instance()
-
-            except:
-                pass
-
-            ###### Deal with software crash ######
-
-            if router_interface.if_crashed():
-                print("Software crashed! Recovering...")
-                # Save the router configuration and the testcase to a special folder.
-                self.save_crash_setting(router_config=router_configuration,
-                                        test_case=test_case,
-                                        name=f"{test_batch_name}_testcase_{i+1}_{get_current_time()}")
-                self.tcp_client.end()
-                self.exabgp_client.end()
-                # Mark the testcase has crashed
-                create_file(f"{testcase_dump_dir_path}/{CRASH_MARKER_FILE}", "1")
-                # Restart and wait for a while
-                router_interface.recover_from_crash()
-                sleep(1)
+    def run_test_batch(self, 
+                       test_batch_name: str,
+                       router_configuration: RouterConfiguration,
+                       warm: bool = False,
+                       post_process: Callable[[int, str], None] = None):
+        """
+        Run the test batch.
+        If `warm`, the BGP instance is kept across testcases (see `start_session_steps`),
+        it is only rebuilt after a crash or when the configuration changes.
+        `post_process(i, testcase_dump_dir_path)` (e.g. the analysis) is called
+        once the dumps of testcase `i` are written.
+        """
+        self.run_source(BatchTestcaseSource(test_batch_name), router_configuration, warm, post_process)
 
     def run_test_repeated(self,
                           testcase_name: str,
                           test_case: TestCase,
                           router_configuration: RouterConfiguration,
-                          repeated_num: int):
+                          repeated_num: int,
+                          warm: bool = False):
         """
         Run the testcase repeatedly.
+        If `warm`, the BGP instance is kept across executions (see `start_session_steps`),
+        it is only rebuilt after a crash.
+        """
+        source = RepeatedTestcaseSource(testcase_name, test_case, repeated_num)
+        self.run_source(source, router_configuration, warm)
+
+    def run_source(self,
+                   source: TestcaseSource,
+                   router_configuration: RouterConfiguration,
+                   warm: bool = False,
+                   post_process: Callable[[int, str], None] = None):
+        """
+        Run the testcases of `source` on a new interface of the routing software.
         """
-
-        ######### Initialize the router interface ##########
-
         router_interface = get_router_interface(router_configuration)
+        self.run(source, router_interface, router_configuration, warm, post_process)
+
+    def run(self,
+            source: TestcaseSource,
+            router_interface: BaseRouter,
+            router_configuration: RouterConfiguration,
+            warm: bool = False,
+            post_process: Callable[[int, str], None] = None,
+            trace_name: str = TRACE_FILE_PREFIX):
+        """
+        Run the testcases of `source` one by one, see `source_steps`.
+        """
+        run_steps(self.source_steps(source, router_interface, router_configuration, warm, post_process, trace_name))
+
+    def source_steps(self,
+                     source: TestcaseSource,
+                     router_interface: BaseRouter,
+                     router_configuration: RouterConfiguration,
+                     warm: bool = False,
+                     post_process: Callable[[int, str], None] = None,
+                     trace_name: str = TRACE_FILE_PREFIX) -> Generator:
+        """
+        Run the testcases of `source` one by one.
+        If `warm`, the BGP instance is kept across testcases (see `start_session_steps`).
+        The dumps of each testcase are handed to `submit_dumps`, along with `post_process`.
+        The spans of the phases are written to `{source.result_dir_path}/{trace_name}.jsonl`
+        (and `.chrome.json`), and their summary is printed at the end.
+        """
+        capture = self.get_capture(router_interface, router_configuration)
+        self.tracer.clear()
+        router_interface.tracer = self.tracer
+        for item in source:
+            self.tracer.testcase = item.index
+            with self.phase("testcase"):
+                log_contents = yield from self.testcase_steps(item, router_interface, router_configuration,
+                                                              capture, warm)
+                with self.phase("write_dumps"):
+                    yield self.submit_dumps(item, log_contents, router_configuration, post_process)
+        yield self.flush_dumps()
+
+        ########## Shut down the BGP instance kept by the warm mode ##########
+
+        self.tracer.testcase = None
+        yield from self.end_warm_session_steps()
+
+        ########## Export the trace ##########
+
+        self.tracer.export(f"{source.result_dir_path}/{trace_name}")
+        self.tracer.report()
+
+    def get_capture(self,
+                    router_interface: BaseRouter,
+                    router_configuration: RouterConfiguration) -> CaptureStrategy:
+        """
+        Get the strategy capturing the MRT dumps of the testcases.
+        """
+        capture = get_capture_strategy(router_interface)
+        if self.tcp_client_config.mrt_tap:
+            capture = TapCapture(self.tcp_client, router_configuration, capture)
+        return capture
+
+    def testcase_steps(self,
+                       item: TestcaseItem,
+                       router_interface: BaseRouter,
+                       router_configuration: RouterConfiguration,
+                       capture: CaptureStrategy,
+                       warm: bool = False) -> Generator:
+        """
+        Run a testcase and dump the MRT files (and the replies of the routing software) into `item.dump_dir_path`.
+        Return the contents of the logs `{file name: content}` to be written by `write_dumps`,
+        they are also collected if the testcase is interrupted (e.g. the routing software crashed),
+        since they show what happened.
+        An interrupted testcase whose routing software has not crashed is torn down,
+        so the next one starts from a new session.
+        """
+        if item.index is not None:
+            print(f"======= Running testcase {item.index+1} =======")
+        dump_dir_path = item.dump_dir_path
 
-        ######### Prepare the directory for dumping #########
-        
-        dump_dir_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_REPEATED}/{testcase_name}"
-        if directory_exists(dump_dir_path):
-            os.system(f"sudo rm -r {dump_dir_path}")
-        create_dir(dump_dir_path)
-
-        ########## Enumerate the testcases ##########
-        
-        for i in range(0,repeated_num):
-
-            print(f"======= Running testcase {i+1} =======")
-            
-            ###### Prepare for dumping ######
+        ###### Prepare for dumping ######
 
-            testcase_dump_dir_path = f"{dump_dir_path}/execution_{i+1}"
-            create_dir(testcase_dump_dir_path)
-            
+        with self.phase("prepare"):
+            create_dir(dump_dir_path)
             # Clear the bgpd log.
-            router_interface.clear_log() 
-
-            ###### Start the routing software instance and clients ######
-
-            router_interface.start_bgp_instance()
-            router_interface.wait_for_log() # Start the clients one by one.
-            self.exabgp_client.start()
-            router_interface.wait_for_log() # Start the clients one by one.
-            self.tcp_client.start()
-
-            ###### Minor part of dumping ######
-
-            # We should dump into temporary path first and then 
-            # copy to the "permanent storage" if `dump_all` is set.
-
-            # Different dumping behavior for different BGP softwares
-            if isinstance(router_interface, FRRRouter):
-                # For FRRouting bgpd, we start to dump ONLY BGP UPDATE messages here.
-                router_interface.dump_updates(f"{testcase_dump_dir_path}/{MESSAGE_MRT_FILE}")
-            elif isinstance(router_interface, BIRDRouter):
-                # For BIRD bgpd, we start to dump ALL BGP messages here.
-                router_interface.dump_messages(f"{testcase_dump_dir_path}/{MESSAGE_MRT_FILE}")
-            else:
-                # This should not happen...
-                raise ValueError("Unexpected type of the router interface!")
-
-            try:
-                ###### Send the test messages ######
-
-                # Send the message one-by-one
-                for message in test_case:
-                    if isinstance(message, Halt):
-                        print("Halting between BGP messages to ensure fully updating...")
-                        sleep(2)
-                        continue
-                    self.tcp_client.send(message.get_binary_expression())
-                    router_interface.wait_for_log() # Wait the state to become stable.
-                    if router_interface.if_crashed():
-                        raise ValueError("Routing daemon crashed!")
-                
-                ###### Main part of dumping ######
-            
-                # Wait for the ExaBGP log to be ready
-                sleep(2)
-
-                # Get the contents for bgpd log and exabgp log
-                bgpd_log_content = router_interface.read_log()
-                exabgp_log_content = self.exabgp_client.read_log()
-                # Clear the bgpd log
-                # There is no need to clear the exabgp log since it will be overwritten 
-                router_interface.clear_log()
-                # Create bgpd log and exabgp log
-                create_file(f"{testcase_dump_dir_path}/{BGPD_LOG_FILE}", bgpd_log_content)
-                create_file(f"{testcase_dump_dir_path}/{EXABGP_LOG_FILE}", exabgp_log_content)
-                # Dump the testcase settings
-                save_variable_to_file(router_configuration, 
-                                    f"{testcase_dump_dir_path}/{ROUTER_CONFIG_PKL_FILE}")
-                save_variable_to_file(test_case,
-                                    f"{testcase_dump_dir_path}/{TESTCASE_PKL_FILE}")
-                
-                # Dumping RIB here, different behaviors for different BGP softwares
-                if isinstance(router_interface, FRRRouter):
-                    # For FRRouting bgpd, dumping RIB is like taking a snapshot.
-                    router_interface.dump_routing_table(f"{testcase_dump_dir_path}/{ROUTE_MRT_FILE}")
-                    # Sleep for a while to wait for the dumping
-                    sleep(1.5)
-                elif isinstance(router_interface, BIRDRouter):
-                    # For BIRD bgpd, dumping is periodic, we set the period as 1 second.
-                    router_interface.dump_routing_table(f"{testcase_dump_dir_path}/{ROUTE_MRT_FILE}")
-                    # So we need to sleep longer
-                    sleep(2)
-                
-                # Stop MRT dumping, different behaviors for different BGP softwares
-                if isinstance(router_interface, FRRRouter):
-                    router_interface.stop_dump_updates()
-                    router_interface.stop_dump_routing_table()
-                elif isinstance(router_interface, BIRDRouter):
-                    router_interface.stop_dump_messages()
-                    router_interface.stop_dump_routing_table()
-                
-                ###### End the routing software instance and clients ######
-                
-                self.tcp_client.end()
-                router_interface.wait_for_log() # Shut down the clients one by one.
-                self.exabgp_client.end()
-                router_interface.end_bgp_instance()
-            
-            except:
-                pass
-
-            ###### Deal with software crash ######
-
-            if router_interface.if_crashed():
-                print("Software crashed! Recovering...")
+            yield router_interface.clear_log()
+
+        ###### Start the routing software instance and clients ######
+
+        with self.phase("start_session"):
+            yield from self.start_session_steps(router_interface, warm)
+
+        ###### Minor part of dumping ######
+
+        with self.phase("start_capture"):
+            yield capture.start_message_dump(router_interface, f"{dump_dir_path}/{MESSAGE_MRT_FILE}")
+
+        log_contents = None
+        capture_stopped = False
+        interrupted = False
+        try:
+            ###### Send the test messages ######
+
+            with self.phase("send"):
+                yield from self.send_testcase_steps(item.test_case, router_interface)
+
+            ###### Main part of dumping ######
+
+            with self.phase("collect_logs"):
+                yield from self.wait_for_exabgp_log_steps()
+                log_contents = yield from self.collect_logs_steps(router_interface, dump_dir_path, warm)
+
+            if self.route_dump:
+                with self.phase("dump_routes"):
+                    yield capture.dump_routing_table(router_interface, f"{dump_dir_path}/{ROUTE_MRT_FILE}")
+                    yield from self.wait_for_routing_table_steps(router_interface,
+                                                                 f"{dump_dir_path}/{ROUTE_MRT_FILE}")
+
+            with self.phase("stop_capture"):
+                yield capture.stop(router_interface)
+            capture_stopped = True
+
+            ###### End the routing software instance and clients ######
+
+            with self.phase("end_session"):
+                yield from self.end_session_steps(router_interface, warm)
+
+        except Exception:
+            traceback.print_exc()
+            interrupted = True
+            if not capture_stopped:
+                # Complete the message dump of the interrupted testcase (e.g. flush the `MRTTap`)
+                # before it is written, instead of when the next testcase starts.
+                try:
+                    with self.phase("stop_capture"):
+                        yield capture.stop(router_interface)
+                except Exception as error:
+                    print(f"Warning: Cannot stop the capture of the interrupted testcase: {error}")
+            if log_contents is None:
+                # Keep the logs of the interrupted testcase (the RIB is not dumped).
+                try:
+                    with self.phase("collect_logs"):
+                        log_contents = yield from self.collect_logs_steps(router_interface, dump_dir_path, warm)
+                except Exception as error:
+                    print(f"Warning: Cannot collect the logs of the interrupted testcase: {error}")
+
+        ###### Deal with software crash ######
+
+        if (yield router_interface.is_crashed()):
+            print("Software crashed! Recovering...")
+            with self.phase("recover"):
                 # Save the router configuration and the testcase to a special folder.
                 self.save_crash_setting(router_config=router_configuration,
-                                        test_case=test_case,
-                                        name=f"{testcase_name}_execution_{i+1}_{get_current_time()}")
-                self.tcp_client.end()
-                self.exabgp_client.end()
+                                        test_case=item.test_case,
+                                        name=f"{item.crash_name}_{get_current_time()}")
+                yield self.tcp_client.end()
+                yield self.exabgp_client.end()
+                self.invalidate_session()
                 # Mark the testcase has crashed
-                create_file(f"{testcase_dump_dir_path}/{CRASH_MARKER_FILE}", "1")
-                # Restart and wait for a while
-                router_interface.recover_from_crash()
+                create_file(f"{dump_dir_path}/{CRASH_MARKER_FILE}", "1")
+                # Restart and wait until the routing software is ready
+                yield from self.recover_router_steps(router_interface)
+        elif interrupted:
+            # The state of the session is unknown (e.g. a warm session that has not been reset),
+            # so tear it down and start from a new BGP instance for the next testcase.
+            print("Testcase interrupted! Tearing down the session...")
+            try:
+                with self.phase("teardown_session"):
+                    yield from self.end_session_steps(router_interface, warm=False)
+            except Exception:
+                traceback.print_exc()
+            self.invalidate_session()
+        return log_contents
+
+    def collect_logs_steps(self,
+                           router_interface: BaseRouter,
+                           dump_dir_path: str,
+                           warm: bool = False) -> Generator:
+        """
+        Read the logs of the testcase, return them as `{file name: content}`,
+        and dump the messages sent back by the routing software to the tester peer.
+        """
+        # Get the contents for bgpd log and exabgp log
+        bgpd_log_content = yield router_interface.read_log()
+        if warm:
+            # ExaBGP keeps running, only read the content of this testcase.
+            exabgp_log_content = yield self.exabgp_client.read_new_log()
+        else:
+            exabgp_log_content = yield self.exabgp_client.read_log()
+        # Clear the bgpd log
+        # There is no need to clear the exabgp log since it will be overwritten 
+        yield router_interface.clear_log()
+        yield self.tcp_client.dump_received(f"{dump_dir_path}/{PEER_MESSAGE_FILE}")
+        return {
+            BGPD_LOG_FILE: bgpd_log_content,
+            EXABGP_LOG_FILE: exabgp_log_content,
+        }
+
+    def send_testcase_steps(self, test_case: TestCase, router_interface: BaseRouter) -> Generator:
+        """
+        Send the messages of the testcase, and wait for the state to become stable after each burst.
+        In the burst mode (`TCPClientConfiguration.burst`), the consecutive messages between the `Halt`s
+        are encoded before sending and written in one go, otherwise each message is a burst of its own.
+        Stop when the routing software closes the session (e.g. sends a NOTIFICATION),
+        since the remaining messages cannot be delivered.
+        Raise `ValueError` if the routing software crashes.
+        """
+        if self.tcp_client_config.burst:
+            bursts = get_bursts(test_case)
+        else:
+            bursts = [item if isinstance(item, Halt) else [item] for item in test_case]
+        for burst in bursts:
+            if isinstance(burst, Halt):
+                print("Halting between BGP messages to ensure fully updating...")
+                yield from self.wait_for_halt_steps(router_interface)
+                continue
+            if len(burst) == 1:
+                yield self.tcp_client.send(burst[0].get_binary_expression())
+            else:
+                yield self.tcp_client.send_burst([message.get_binary_expression() for message in burst])
+            yield router_interface.wait_for_log() # Wait the state to become stable.
+            if (yield router_interface.is_crashed()):
+                raise ValueError("Routing daemon crashed!")
+            if self.tcp_client.is_session_closed():
+                print(f"Session closed by the routing software ({self.tcp_client.describe_close()}), "
+                      f"skipping the remaining messages.")
+                break
+
+    ########## Write the dumps ##########
 
-    def save_crash_setting(self,
-                           router_config: RouterConfiguration,
+    def submit_dumps(self,
+                     item: TestcaseItem,
+                     log_contents: dict[str, str],
+                     router_configuration: RouterConfiguration,
+                     post_process: Callable[[int, str], None] = None):
+        """
+        Write the dumps of a finished testcase (see `write_dumps`) along with its waits.
+        """
+        self.write_dumps(item, log_contents, self.wait_recorder.pop_records(), router_configuration, post_process)
+
+    def flush_dumps(self):
+        """
+        Wait until the dumps handed to `submit_dumps` are written, they are written at once here.
+        """
+        pass
+
+    @staticmethod
+    def write_dumps(item: TestcaseItem,
+                    log_contents: dict[str, str],
+                    wait_records: list[dict],
+                    router_configuration: RouterConfiguration,
+                    post_process: Callable[[int, str], None] = None):
+        """
+        Write the logs, the settings and the waits of a finished testcase, then call `post_process`.
+        """
+        if log_contents is not None:
+            for file_name, content in log_contents.items():
+                create_file(f"{item.dump_dir_path}/{file_name}", content)
+            # Dump the testcase settings
+            save_variable_to_file(router_configuration,
+                                  f"{item.dump_dir_path}/{ROUTER_CONFIG_PKL_FILE}")
+            save_variable_to_file(item.test_case,
+                                  f"{item.dump_dir_path}/{TESTCASE_PKL_FILE}")
+        # Record the actual duration of the waits.
+        with open(f"{item.dump_dir_path}/{WAIT_RECORD_FILE}", 'w') as file:
+            json.dump(wait_records, file, indent=1)
+        if post_process is not None:
+            post_process(item.index, item.dump_dir_path)
+
+    @staticmethod
+    def save_crash_setting(router_config: RouterConfiguration,
                            test_case: TestCase,
                            name: str = None):
         """
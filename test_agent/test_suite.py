@@ -4,6 +4,7 @@ This class defines the test cases.
 
 from dataclasses import dataclass
 from types import FunctionType
+from typing import Union
 from bgp_utils.message import Message
 from routing_software_interface.basic_types import RouterConfiguration
 
@@ -33,6 +34,24 @@ class TestCase(list[Message]):
         # Create the instance using the validated list
         return super().__new__(cls, value)
 
+def get_bursts(test_case: TestCase) -> list[Union[list[Message], Halt]]:
+    """
+    Split the testcase into the bursts of consecutive messages, separated by the `Halt`s.
+    """
+    bursts = []
+    burst = []
+    for item in test_case:
+        if isinstance(item, Halt):
+            if burst:
+                bursts.append(burst)
+                burst = []
+            bursts.append(item)
+        else:
+            burst.append(item)
+    if burst:
+        bursts.append(burst)
+    return bursts
+
 class TestSuite():
     """
     The full description of a router software test.
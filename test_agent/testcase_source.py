@@ -0,0 +1,151 @@
+"""
+This file defines where the testcases run by the agent come from,
+and where the results of each testcase are dumped.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from basic_utils.serialize_utils import read_variables_from_file
+from basic_utils.time_utils import get_current_time
+from basic_utils.file_utils import *
+from basic_utils.const import *
+from .test_suite import TestCase
+
+@dataclass
+class TestcaseItem:
+    """
+    A testcase to run.
+    """
+    # the index of the testcase in its source, `None` for a single testcase
+    index : int
+    test_case : TestCase
+    # the directory the results are dumped into
+    dump_dir_path : str
+    # the prefix of the name of the crash dump (the time is appended)
+    crash_name : str
+
+def load_test_batch(test_batch_name: str) -> list[TestCase]:
+    """
+    Load the testcases of the test batch from `test_batches/`.
+    """
+    data_file_path = f"{REPO_ROOT_PATH}/test_batches/{test_batch_name}.pkl"
+    return read_variables_from_file(data_file_path)[0]
+
+def prepare_batch_dump_dir(test_batch_name: str) -> str:
+    """
+    Create an empty dump directory for the test batch.
+    Return the directory holding the dumps of the testcases.
+    """
+    dump_dir_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_BATCHED}/{test_batch_name}"
+    if directory_exists(dump_dir_path):
+        os.system(f"sudo rm -r {dump_dir_path}")
+    create_dir(dump_dir_path)
+    dump_dir_path = f"{dump_dir_path}/data"
+    create_dir(dump_dir_path)
+    return dump_dir_path
+
+class TestcaseSource(ABC):
+    """
+    The source of the testcases, the dump directories are prepared when iterating.
+    The results of the whole run (e.g. the trace) are written into `result_dir_path`.
+    """
+    result_dir_path : str
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[TestcaseItem]:
+        raise NotImplementedError()
+
+class SingleTestcaseSource(TestcaseSource):
+    """
+    A single testcase dumped into `log/test_single/{test_name}_{time}`.
+    """
+    def __init__(self, test_case: TestCase, test_name: str):
+        self.test_case = test_case
+        self.dump_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_SINGLE}/{test_name}_{get_current_time()}"
+        self.result_dir_path = self.dump_path
+
+    def __iter__(self) -> Iterator[TestcaseItem]:
+        assert not directory_exists(self.dump_path)
+        yield TestcaseItem(index=None,
+                           test_case=self.test_case,
+                           dump_dir_path=self.dump_path,
+                           crash_name="single_testcase")
+
+class BatchTestcaseSource(TestcaseSource):
+    """
+    The testcases of a test batch, testcase `i` is dumped into
+    `log/test_batched/{test_batch_name}/data/testcase_{i+1}`.
+    """
+    def __init__(self,
+                 test_batch_name: str,
+                 testcase_list: list[TestCase] = None,
+                 testcase_ids: Iterable[int] = None,
+                 dump_dir_path: str = None):
+        """
+        By default, the testcases are loaded from `test_batches/`, all of them are run,
+        and the dump directory is emptied first (see `prepare_batch_dump_dir`).
+        Give `testcase_ids` and `dump_dir_path` to run a part of the batch (e.g. in a sandbox).
+        """
+        self.test_batch_name = test_batch_name
+        self.testcase_list = testcase_list
+        self.testcase_ids = testcase_ids
+        self.dump_dir_path = dump_dir_path
+        if dump_dir_path is None:
+            self.result_dir_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_BATCHED}/{test_batch_name}"
+        else:
+            self.result_dir_path = os.path.dirname(dump_dir_path)
+
+    def __iter__(self) -> Iterator[TestcaseItem]:
+        if self.testcase_list is None:
+            self.testcase_list = load_test_batch(self.test_batch_name)
+        if self.dump_dir_path is None:
+            self.dump_dir_path = prepare_batch_dump_dir(self.test_batch_name)
+        testcase_ids = self.testcase_ids
+        if testcase_ids is None:
+            testcase_ids = range(0, len(self.testcase_list))
+        for i in testcase_ids:
+            yield TestcaseItem(index=i,
+                               test_case=self.testcase_list[i],
+                               dump_dir_path=f"{self.dump_dir_path}/testcase_{i+1}",
+                               crash_name=f"{self.test_batch_name}_testcase_{i+1}")
+
+class StreamTestcaseSource(TestcaseSource):
+    """
+    The testcases generated on the fly (e.g. by a fuzzer), dumped like a test batch,
+    so a testcase is run as soon as it is generated.
+    """
+    def __init__(self, test_batch_name: str, testcases: Iterable[TestCase]):
+        self.test_batch_name = test_batch_name
+        self.testcases = testcases
+        self.result_dir_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_BATCHED}/{test_batch_name}"
+
+    def __iter__(self) -> Iterator[TestcaseItem]:
+        dump_dir_path = prepare_batch_dump_dir(self.test_batch_name)
+        for i, test_case in enumerate(self.testcases):
+            yield TestcaseItem(index=i,
+                               test_case=test_case,
+                               dump_dir_path=f"{dump_dir_path}/testcase_{i+1}",
+                               crash_name=f"{self.test_batch_name}_testcase_{i+1}")
+
+class RepeatedTestcaseSource(TestcaseSource):
+    """
+    The same testcase run `repeated_num` times, execution `i` is dumped into
+    `log/test_repeated/{testcase_name}/execution_{i+1}`.
+    """
+    def __init__(self, testcase_name: str, test_case: TestCase, repeated_num: int):
+        self.testcase_name = testcase_name
+        self.test_case = test_case
+        self.repeated_num = repeated_num
+        self.result_dir_path = f"{REPO_ROOT_PATH}/{TESTCASE_DUMP_REPEATED}/{testcase_name}"
+
+    def __iter__(self) -> Iterator[TestcaseItem]:
+        dump_dir_path = self.result_dir_path
+        if directory_exists(dump_dir_path):
+            os.system(f"sudo rm -r {dump_dir_path}")
+        create_dir(dump_dir_path)
+        for i in range(0, self.repeated_num):
+            yield TestcaseItem(index=i,
+                               test_case=self.test_case,
+                               dump_dir_path=f"{dump_dir_path}/execution_{i+1}",
+                               crash_name=f"{self.testcase_name}_execution_{i+1}")
@@ -0,0 +1,208 @@
+"""
+This file defines the UPDATE flood used to benchmark the routing software under table-scale loads.
+"""
+
+import ipaddress
+import numpy as np
+from dataclasses import dataclass
+from time import time, sleep
+from basic_utils.log_parse_utils import ExaBGPLogEngine
+from bgp_utils.message import UpdateMessage_BFN
+from bgp_utils.message.msg_parser import BGP_HEADER_LEN
+from bgp_utils.path_attribute import PathAttributeType
+from network_utils.tcp_client import TCPClient
+
+# The maximum length of a BGP message without the extended message capability.
+MAX_MESSAGE_LEN = 4096
+
+@dataclass
+class FloodConfiguration:
+    """
+    This class is used to configure the UPDATE flood.
+    """
+    # the number of prefixes announced
+    prefix_num : int = 1000000
+    # the number of prefixes (NLRI) per UPDATE message
+    prefixes_per_update : int = 1
+    # the first prefix, the following ones are the consecutive prefixes of the same length
+    first_prefix : str = "20.0.0.0/24"
+    # the AS number of the origin, and the number of origins the UPDATEs cycle through
+    origin_asn : int = 64512
+    origin_num : int = 1
+    # the target rate (in UPDATEs per second), `None` to send as fast as possible
+    rate : float = None
+    # the number of UPDATEs encoded and written at once
+    batch_size : int = 1000
+
+@dataclass
+class FloodResult:
+    """
+    The result of an UPDATE flood, the times are the wall-clock times (by `time.time`),
+    so they can be compared with the receipt times logged by ExaBGP.
+    """
+    update_num : int
+    prefix_num : int
+    byte_num : int
+    send_start : float
+    send_end : float
+    # the number of flood prefixes propagated to the ExaBGP client, and when they are received
+    received_prefix_num : int = 0
+    first_receipt : float = None
+    last_receipt : float = None
+
+    def get_send_rate(self) -> float:
+        """Get the rate (in prefixes per second) the tester sends at."""
+        return self.prefix_num / max(self.send_end - self.send_start, 1e-9)
+
+    def get_convergence_time(self) -> float:
+        """Get the time from the start of the flood to the receipt of the last propagated prefix."""
+        if self.last_receipt is None:
+            return None
+        return self.last_receipt - self.send_start
+
+    def get_ingest_rate(self) -> float:
+        """Get the rate (in prefixes per second) the routing software propagates the flood at."""
+        convergence_time = self.get_convergence_time()
+        if convergence_time is None:
+            return None
+        return self.received_prefix_num / max(convergence_time, 1e-9)
+
+class UpdateFlood:
+    """
+    Generate the UPDATEs of the flood from a single encoded template:
+    all the UPDATEs share the path attributes, only the bytes of the prefixes
+    and of the origin AS number are rewritten in place, a batch at a time.
+    """
+    def __init__(self, configuration: FloodConfiguration, aspath: list[int], next_hop: str):
+        """
+        `aspath` is the AS path before the origin AS (e.g. `[tester ASN]`).
+        """
+        self.configuration = configuration
+        first_network = ipaddress.IPv4Network(configuration.first_prefix)
+        self.prefix_len = first_network.prefixlen
+        self.first_network = int(first_network.network_address)
+        self.prefix_byte_len = (self.prefix_len + 7) // 8
+        last_network = self.first_network + ((configuration.prefix_num - 1) << (32 - self.prefix_len))
+        if self.prefix_len == 0 or last_network >= 1 << 32:
+            raise ValueError(f"{configuration.prefix_num} prefixes do not fit after {configuration.first_prefix}!")
+        self.update_num = -(-configuration.prefix_num // configuration.prefixes_per_update)
+
+        ###### Encode the template ######
+
+        nlri = [configuration.first_prefix] * configuration.prefixes_per_update
+        message_bfn = UpdateMessage_BFN.get_bfn(aspath=aspath + [configuration.origin_asn],
+                                                next_hop=next_hop,
+                                                nlri=nlri)
+        self.template = message_bfn.get_binary_expression()
+        if len(self.template) > MAX_MESSAGE_LEN:
+            raise ValueError(f"{configuration.prefixes_per_update} prefixes per UPDATE exceed "
+                             f"the maximum message length {MAX_MESSAGE_LEN}!")
+        self.locate_fields()
+
+    def locate_fields(self):
+        """
+        Find the offsets of the NLRI and of the origin AS number in the template.
+        """
+        template = self.template
+        wroutes_len = int.from_bytes(template[BGP_HEADER_LEN:BGP_HEADER_LEN+2], 'big')
+        attr_offset = BGP_HEADER_LEN + 2 + wroutes_len + 2
+        attr_end = attr_offset + int.from_bytes(template[attr_offset-2:attr_offset], 'big')
+        self.nlri_offset = attr_end
+        self.origin_asn_offset = None
+        offset = attr_offset
+        while offset < attr_end:
+            flags, attr_type = template[offset], template[offset+1]
+            len_byte_len = 2 if flags & 0x10 else 1
+            value_offset = offset + 2 + len_byte_len
+            value_len = int.from_bytes(template[offset+2:value_offset], 'big')
+            if attr_type == PathAttributeType.AS_PATH.value:
+                # A single AS_SEQUENCE: type, count, then the AS numbers.
+                self.asn_byte_len = (value_len - 2) // template[value_offset+1]
+                self.origin_asn_offset = value_offset + value_len - self.asn_byte_len
+            offset = value_offset + value_len
+        if self.origin_asn_offset is None:
+            raise ValueError("The AS_PATH attribute is not found in the template!")
+
+    def encode_batch(self, first_update: int, update_num: int) -> bytes:
+        """
+        Encode the UPDATEs `first_update` to `first_update + update_num - 1`.
+        The last UPDATE of the flood repeats its last prefix to fill the template.
+        """
+        configuration = self.configuration
+        prefix_num = configuration.prefixes_per_update
+        buffer = np.tile(np.frombuffer(self.template, dtype=np.uint8), (update_num, 1))
+
+        ###### Prefixes ######
+
+        prefix_ids = np.arange(first_update * prefix_num, (first_update + update_num) * prefix_num, dtype=np.uint64)
+        prefix_ids = np.minimum(prefix_ids, configuration.prefix_num - 1).reshape(update_num, prefix_num)
+        networks = np.uint64(self.first_network) + (prefix_ids << np.uint64(32 - self.prefix_len))
+        shifts = np.arange(24, 24 - 8 * self.prefix_byte_len, -8, dtype=np.uint64)
+        columns = self.nlri_offset + 1 \
+            + np.arange(prefix_num)[:, None] * (1 + self.prefix_byte_len) \
+            + np.arange(self.prefix_byte_len)[None, :]
+        buffer[:, columns] = (networks[:, :, None] >> shifts) & np.uint64(0xff)
+
+        ###### Origin AS numbers ######
+
+        if configuration.origin_num > 1:
+            origins = configuration.origin_asn \
+                + np.arange(first_update, first_update + update_num, dtype=np.uint64) % np.uint64(configuration.origin_num)
+            for i in range(0, self.asn_byte_len):
+                shift = np.uint64(8 * (self.asn_byte_len - 1 - i))
+                buffer[:, self.origin_asn_offset + i] = (origins >> shift) & np.uint64(0xff)
+
+        return buffer.tobytes()
+
+    def send(self, tcp_client: TCPClient) -> FloodResult:
+        """
+        Send the flood through the connected client, paced by the target rate.
+        """
+        configuration = self.configuration
+        byte_num = 0
+        send_start = time()
+        for first_update in range(0, self.update_num, configuration.batch_size):
+            batch = self.encode_batch(first_update, min(configuration.batch_size, self.update_num - first_update))
+            if configuration.rate is not None:
+                delay = send_start + first_update / configuration.rate - time()
+                if delay > 0:
+                    sleep(delay)
+            if not tcp_client.send(batch):
+                print(f"The flood stopped after {first_update} UPDATEs.")
+                break
+            byte_num += len(batch)
+        return FloodResult(update_num=byte_num // len(self.template),
+                           prefix_num=min(byte_num // len(self.template) * configuration.prefixes_per_update,
+                                          configuration.prefix_num),
+                           byte_num=byte_num,
+                           send_start=send_start,
+                           send_end=time())
+
+    def is_flood_prefix(self, prefix: str) -> bool:
+        network = ipaddress.IPv4Network(prefix, strict=False)
+        if network.prefixlen != self.prefix_len:
+            return False
+        index = (int(network.network_address) - self.first_network) >> (32 - self.prefix_len)
+        return int(network.network_address) >= self.first_network and index < self.configuration.prefix_num
+
+    def collect_receipts(self, result: FloodResult, exabgp_log_path: str):
+        """
+        Count the flood prefixes announced to the ExaBGP client, by the receipt times in its log.
+        """
+        received_prefixes = set()
+        for update_json in ExaBGPLogEngine.extract_update_json_blocks(exabgp_log_path):
+            try:
+                receipt_time = update_json["time"]
+                announce : dict = update_json["neighbor"]["message"]["update"]["announce"]["ipv4 unicast"]
+            except KeyError:
+                continue
+            for value_list in announce.values():
+                for value in value_list:
+                    if "nlri" not in value or not self.is_flood_prefix(value["nlri"]):
+                        continue
+                    received_prefixes.add(value["nlri"])
+                    if result.first_receipt is None or receipt_time < result.first_receipt:
+                        result.first_receipt = receipt_time
+                    if result.last_receipt is None or receipt_time > result.last_receipt:
+                        result.last_receipt = receipt_time
+        result.received_prefix_num = len(received_prefixes)
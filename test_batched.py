@@ -3,6 +3,7 @@
 # The routing software is automatically set-up and torn-down.
 
 import sys, os, argparse
+from dataclasses import replace
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from basic_utils.binary_utils import make_bytes_displayable
@@ -10,6 +11,8 @@ from basic_utils.file_utils import *
 from basic_utils.log_parse_utils import *
 
 from test_agent.test_agent import *
+from test_agent.parallel_runner import run_test_batch_parallel
+from test_agent.async_test_agent import AsyncTestAgent
 from test_configuration import *
 from testcase_factory.batched_testcase_factory import *
 
@@ -20,10 +23,29 @@ ROUTE_DUMP_KEY = "route_dump"
 PROPAGATED_KEY = "propagated"
 PROPAGATE_INVALID_KEY = "propagate_invalid"
 
-def run_test_batch(test_batch_name: str):
+def run_test_batch(test_batch_name: str,
+                   warm: bool = False,
+                   sandbox_num: int = 1,
+                   pipeline: bool = False,
+                   burst: bool = False,
+                   segment_size: int = None,
+                   segment_interval: float = 0,
+                   standby: bool = False,
+                   tap: bool = False,
+                   route_dump: bool = True):
     """
     Run test on the test batch
+    If `warm`, the BGP instance is kept across the testcases.
+    If `sandbox_num` > 1, the testcases are run in parallel across `sandbox_num` isolated sandboxes.
+    If `pipeline`, the testcases are run by `AsyncTestAgent`.
+    If `burst`, the messages between the `Halt`s are sent in one go (in chunks of `segment_size` bytes if given,
+    pausing `segment_interval` seconds between the chunks so they are sent in separate TCP segments).
+    If `standby`, each sandbox keeps a standby daemon to be swapped in after a crash.
+    If `tap`, the messages of the tester session are dumped by the tester instead of by the routing software.
+    If not `route_dump`, the RIB is not dumped (the route checks of `analyze_test_batch` are skipped).
     """
+    tester_config = replace(tcp_client_config, burst=burst, segment_size=segment_size,
+                            segment_interval=segment_interval, mrt_tap=tap)
 
     ########## Configure the Router Software ##########
 
@@ -45,18 +67,52 @@ def run_test_batch(test_batch_name: str):
         router_type=router_type
     )
 
+    ########## Run in sandboxes ##########
+
+    if sandbox_num > 1:
+        run_test_batch_parallel(
+            test_batch_name=test_batch_name,
+            router_configuration=router_config,
+            tcp_client_config=tester_config,
+            exabgp_client_config=exabgp_client_config,
+            sandbox_num=sandbox_num,
+            warm=warm,
+            standby=standby,
+            route_dump=route_dump,
+        )
+        return
+    if standby:
+        print("Warning: The standby daemon is only kept in the sandboxes (--sandboxes > 1), ignored.")
+
+    ########## Run on asyncio ##########
+
+    if pipeline:
+        async_test_agent = AsyncTestAgent(
+            tcp_client_config = tester_config,
+            exabgp_client_config = exabgp_client_config,
+        )
+        async_test_agent.route_dump = route_dump
+        async_test_agent.run_test_batch(
+            test_batch_name=test_batch_name,
+            router_configuration=router_config,
+            warm=warm,
+        )
+        return
+
     ########## Initialize the TestAgent ##########
 
     test_agent = TestAgent(
-        tcp_client_config = tcp_client_config,
+        tcp_client_config = tester_config,
         exabgp_client_config = exabgp_client_config,
     )
+    test_agent.route_dump = route_dump
 
     ########## Run test batch ##########
 
     test_agent.run_test_batch(
         test_batch_name=test_batch_name,
-        router_configuration=router_config
+        router_configuration=router_config,
+        warm=warm,
     )
 
 def analyze_test_batch(test_batch_name: str):
@@ -84,7 +140,9 @@ def analyze_test_batch(test_batch_name: str):
             break
         if MrtparseEngine.exist_update_prefix(f"{full_path}/{MESSAGE_MRT_FILE}",CONST_PREFIX):
             test_info[MESSAGE_DUMP_KEY] = 1
-        if MrtparseEngine.exist_route(f"{full_path}/{ROUTE_MRT_FILE}",CONST_PREFIX):
+        # The RIB is not dumped if the batch is run without the route dumps.
+        if file_exists(f"{full_path}/{ROUTE_MRT_FILE}") and \
+            MrtparseEngine.exist_route(f"{full_path}/{ROUTE_MRT_FILE}",CONST_PREFIX):
             test_info[ROUTE_DUMP_KEY] = 1
         if ExaBGPLogEngine.exist_update_prefix(f"{full_path}/{EXABGP_LOG_FILE}", CONST_PREFIX):
             test_info[PROPAGATED_KEY] = 1
@@ -114,12 +172,70 @@ if __name__ == "__main__":
         required=True,
         help="The name of the test batch",
     )
+    parser.add_argument(
+        "--warm", "-w",
+        action="store_true",
+        help="Keep the BGP instance across the testcases, only reset the session of the tester (run_test_batch only).",
+    )
+    parser.add_argument(
+        "--sandboxes", "-s",
+        type=int,
+        default=1,
+        help="The number of isolated sandboxes running the testcases in parallel (run_test_batch only).",
+    )
+    parser.add_argument(
+        "--pipeline", "-p",
+        action="store_true",
+        help="Wait on the logs and the MRT files instead of fixed sleeps, "
+             "and write the dumps of a testcase while the next one runs (run_test_batch only).",
+    )
+    parser.add_argument(
+        "--burst", "-b",
+        action="store_true",
+        help="Send the messages between the halts of a testcase in one go (run_test_batch only).",
+    )
+    parser.add_argument(
+        "--segment-size",
+        type=int,
+        default=None,
+        help="Write the bursts in chunks of this many bytes, e.g. to split the messages "
+             "across TCP segments with --segment-interval (run_test_batch only, implies --burst).",
+    )
+    parser.add_argument(
+        "--segment-interval",
+        type=float,
+        default=0,
+        help="The pause in seconds between the chunks of --segment-size, so they are not coalesced "
+             "into one TCP segment (run_test_batch only).",
+    )
+    parser.add_argument(
+        "--standby",
+        action="store_true",
+        help="Keep a pre-spawned standby daemon in each sandbox, swapped in after a crash "
+             "(run_test_batch only, with --sandboxes > 1).",
+    )
+    parser.add_argument(
+        "--tap",
+        action="store_true",
+        help="Dump the messages of the tester session from the tester itself instead of "
+             "from the routing software (run_test_batch only).",
+    )
+    parser.add_argument(
+        "--no-route-dump",
+        action="store_true",
+        help="Do not dump the RIB of the testcases, the route checks are then skipped (run_test_batch only).",
+    )
     args = parser.parse_args()
     
     func = args.func
     test_batch_name = args.name
 
-    if func in func_name_dict:
+    if func == "run_test_batch":
+        run_test_batch(test_batch_name, warm=args.warm, sandbox_num=args.sandboxes, pipeline=args.pipeline,
+                       burst=args.burst or args.segment_size is not None, segment_size=args.segment_size,
+                       segment_interval=args.segment_interval,
+                       standby=args.standby, tap=args.tap, route_dump=not args.no_route_dump)
+    elif func in func_name_dict:
         func_name_dict[func](test_batch_name)
     else:
         print(f"Invalid function name: {func}.s")
@@ -11,7 +11,7 @@ from test_agent.test_agent import TestAgent
 from test_configuration import *
 from testcase_factory.repeated_testcase_factory import repeated_testcase_suite
 
-def main(test_id: int, repeat_num: int):
+def main(test_id: int, repeat_num: int, warm: bool = False):
     """
     The main function of running the test cases.
     """
@@ -54,6 +54,7 @@ def main(test_id: int, repeat_num: int):
         test_case=testcase,
         router_configuration=router_config,
         repeated_num=repeat_num,
+        warm=warm,
     )
 
     ########## Debug testcase ##########
@@ -81,6 +82,11 @@ if __name__ == "__main__":
         type=non_negative_int, 
         help=f"Please enter the number of times you want to repeat the execution.",
     )
+    parser.add_argument(
+        "--warm", "-w",
+        action="store_true",
+        help="Keep the BGP instance across the executions, only reset the session of the tester.",
+    )
     args = parser.parse_args()
     # Run the main function. 
-    main(test_id=args.number, repeat_num=args.repeat)
+    main(test_id=args.number, repeat_num=args.repeat, warm=args.warm)
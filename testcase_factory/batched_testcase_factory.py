@@ -2,13 +2,15 @@
 
 from copy import deepcopy
 import sys, os, subprocess, random
+import numpy as np
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from basic_utils.time_utils import get_current_time
 from basic_utils.file_utils import *
-from bgp_utils.message import OpenMessage_BFN, OpenMessage, KeepAliveMessage_BFN, KeepAliveMessage, UpdateMessageContent_BFN, UpdateMessage_BFN, UpdateMessage, WithdrawnRoutes_BFN, NLRI_BFN, PathAttributes_BFN
+from bgp_utils.message import BaseMessage_BFN, RawMessage, OpenMessage_BFN, OpenMessage, KeepAliveMessage_BFN, KeepAliveMessage, UpdateMessageContent_BFN, UpdateMessage_BFN, UpdateMessage, WithdrawnRoutes_BFN, NLRI_BFN, PathAttributes_BFN
 from bgp_utils.path_attribute import AttrType_BFN, BaseAttr_BFN, OriginType, Origin_BFN, OriginAttr_BFN, PathSegementType, PathSegmentType_BFN, PathSegmentLength_BFN, PathSegmentValue_BFN, PathSegment_BFN, ASPath_BFN, ASPathAttr_BFN, NextHop_BFN, NextHopAttr_BFN, Communities_BFN, CommunitiesAttr_BFN, MPReachNLRI_BFN, MPReachNLRIAttr_BFN, MPUnreachNLRI_BFN, MPUnreachNLRIAttr_BFN, LOCPREF_BFN, LOCPREFAttr_BFN, Arbitrary_BFN, ArbitraryAttr_BFN
 from bgp_utils.basic_bfn_types import IPv4Prefix_BFN, Length_BFN
 from bgp_utils.binary_field_node import BinaryFieldNode
+from bgp_utils.bfn_template import BFNTemplate, TemplateFieldKind, MutantBatch
 from basic_utils.binary_utils import bytes2num
 from basic_utils.log_parse_utils import MrtparseEngine, ExaBGPLogEngine
 from test_agent.test_suite import TestCase, Halt, TestSuite
@@ -68,6 +70,32 @@ def generate_test_batch(gen_func,
         testcase_list.append(testcase)
     save_variable_to_file(testcase_list,target_file)
 
+def generate_template_test_batch(seed_message_bfn: BaseMessage_BFN,
+                                 gen_func,
+                                 testcase_num: int,
+                                 test_batch_name: str,
+                                 include_timestamp: bool = False,
+                                 chunk_size: int = 65536):
+    """
+    Generate the test batch by mutating a seed UPDATE message compiled into a `BFNTemplate`.
+    `gen_func(template, mutant_num)` returns a `MutantBatch` of UPDATE messages.
+    No BFN tree is built per testcase, so it is much faster than `generate_test_batch`.
+    """
+    if include_timestamp:
+        test_batch_name = f"{test_batch_name}_{get_current_time()}"
+    target_file =  f"{TEST_BATCH_DIR}/{test_batch_name}.pkl"
+    if file_exists(target_file):
+        delete_file(target_file)
+    template = BFNTemplate(seed_message_bfn)
+    testcase_list = []
+    for begin in range(0, testcase_num, chunk_size):
+        mutants = gen_func(template, min(chunk_size, testcase_num - begin))
+        testcase_list.extend(
+            TestCase([vanilla_open_message, vanilla_keepalive_message, RawMessage(mutant)])
+            for mutant in mutants
+        )
+    save_variable_to_file(testcase_list,target_file)
+
 ############### Test bacth generating functions ###############
 
 def vanilla_gen() -> TestCase:
@@ -79,9 +107,9 @@ def vanilla_gen() -> TestCase:
         withdrawn_routes=[],
         nlri=[CONST_PREFIX],
         attr_bfn_list=[
-            vanilla_attr_origin,
-            vanilla_attr_aspath,
-            vanilla_attr_nexthop,
+            vanilla_attr_origin.clone(),
+            vanilla_attr_aspath.clone(),
+            vanilla_attr_nexthop.clone(),
         ]
     )
     update_message = UpdateMessage(update_message_bfn)
@@ -117,9 +145,9 @@ def random_unknown_attribute() -> TestCase:
         withdrawn_routes=[],
         nlri=[CONST_PREFIX],
         attr_bfn_list=[
-            vanilla_attr_origin,
-            vanilla_attr_aspath,
-            vanilla_attr_nexthop,
+            vanilla_attr_origin.clone(),
+            vanilla_attr_aspath.clone(),
+            vanilla_attr_nexthop.clone(),
             attr_arbitrary,
         ]
     )
@@ -127,9 +155,9 @@ def random_unknown_attribute() -> TestCase:
 
     return TestCase([vanilla_open_message, vanilla_keepalive_message, update_message])
 
-def random_descendent_bfn():
+def build_seed_update_message_bfn() -> UpdateMessage_BFN:
     """
-    Randomly mutate one BFN under the UPDATE message
+    Build the seed UPDATE message mutated by the random generating functions below.
     """
     attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
     attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -152,6 +180,22 @@ def random_descendent_bfn():
             attr_arbitrary
         ] # Out-of-order path attributes
     )
+    return update_message_bfn
+
+###### The seed is built once, and every testcase gets a copy-on-write clone of it ######
+seed_update_message_bfn = build_seed_update_message_bfn()
+
+def get_seed_update_message_bfn() -> UpdateMessage_BFN:
+    """
+    Get a clone of the seed UPDATE message, the BFNs are copied only when mutated.
+    """
+    return seed_update_message_bfn.clone()
+
+def random_descendent_bfn():
+    """
+    Randomly mutate one BFN under the UPDATE message
+    """
+    update_message_bfn = get_seed_update_message_bfn()
     update_message_bfn.sample_under_cone(
         BinaryFieldNode.is_bfn
     ).uniformly_apply_mutation()
@@ -163,27 +207,7 @@ def random_length_bfn():
     """
     Randomly mutate one Length_BFN under the UPDATE message by modifying its value randomly.
     """
-    attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
-    attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
-    attr_nexthop = NextHopAttr_BFN(NextHop_BFN(tester_client_ip))
-    attr_arbitrary = ArbitraryAttr_BFN(
-        attr_type_bfn=AttrType_BFN.get_bfn(
-            type_code=114, # An unknown type
-            higher_bits=[1,1,1,0], # optional, transitive, partial, no extended length
-        ),
-        attr_value_bfn=Arbitrary_BFN(value=b'\x11\x45\x14\x19')
-    ) # Unknown path attribute.
-    # UPDATE message
-    update_message_bfn = UpdateMessage_BFN.get_bfn_diy_attr(
-        withdrawn_routes=[],
-        nlri=[CONST_PREFIX],
-        attr_bfn_list=[
-            attr_nexthop,
-            attr_origin,
-            attr_aspath,
-            attr_arbitrary
-        ] # Out-of-order path attributes
-    )
+    update_message_bfn = get_seed_update_message_bfn()
     to_be_mutated : Length_BFN = update_message_bfn.sample_under_cone(
         BinaryFieldNode.is_length_bfn
     )
@@ -200,27 +224,7 @@ def random_attribute_bfn():
     """
     Randomly mutate one attribute BFN under the UPDATE message.
     """
-    attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
-    attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
-    attr_nexthop = NextHopAttr_BFN(NextHop_BFN(tester_client_ip))
-    attr_arbitrary = ArbitraryAttr_BFN(
-        attr_type_bfn=AttrType_BFN.get_bfn(
-            type_code=114, # An unknown type
-            higher_bits=[1,1,1,0], # optional, transitive, partial, no extended length
-        ),
-        attr_value_bfn=Arbitrary_BFN(value=b'\x11\x45\x14\x19')
-    ) # Unknown path attribute.
-    # UPDATE message
-    update_message_bfn = UpdateMessage_BFN.get_bfn_diy_attr(
-        withdrawn_routes=[],
-        nlri=[CONST_PREFIX],
-        attr_bfn_list=[
-            attr_nexthop,
-            attr_origin,
-            attr_aspath,
-            attr_arbitrary
-        ] # Out-of-order path attributes
-    )
+    update_message_bfn = get_seed_update_message_bfn()
     # Sample an attribute to be mutated
     sampled_attr = update_message_bfn.sample_under_cone(
         BinaryFieldNode.is_attr_bfn
@@ -235,6 +239,28 @@ def random_attribute_bfn():
 
     return TestCase([vanilla_open_message, vanilla_keepalive_message, update_message])
 
+############### Template-based test batch generating functions ###############
+
+def random_length_mutants(template: BFNTemplate, mutant_num: int) -> MutantBatch:
+    """
+    Template-based `random_length_bfn`:
+    randomly mutate one Length_BFN of the template in each mutant.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    field_idx = rng.choice(template.get_field_indices([TemplateFieldKind.LENGTH]), size=mutant_num)
+    # Random lengths fitting in the field (only the lowest bytes are encoded).
+    values = rng.integers(0, np.iinfo(np.uint64).max, size=mutant_num, dtype=np.uint64, endpoint=True)
+    # Set the length value to 0 with probability 0.1
+    values[rng.random(mutant_num) < 0.1] = 0
+    return template.mutate_numbers(field_idx, values)
+
+def random_asn_mutants(template: BFNTemplate, mutant_num: int) -> MutantBatch:
+    """
+    Randomly mutate one ASN_BFN of the template in each mutant.
+    """
+    rng = np.random.default_rng(random.getrandbits(64))
+    return template.mutate_random_numbers(mutant_num, kinds=[TemplateFieldKind.ASN], rng=rng)
+
 if __name__ == "__main__":
     """
     Generate the test batch
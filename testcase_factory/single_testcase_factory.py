@@ -1,6 +1,5 @@
 # DIY testcases here!
 
-from copy import deepcopy
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -28,8 +27,8 @@ vanilla_keepalive_message = KeepAliveMessage(keepalive_message_bfn)
 """Vanilla testcase: No UPDATE message."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # testcase
 testcase_0 = TestCase([open_message, keepalive_message])
@@ -39,8 +38,8 @@ testcase_0 = TestCase([open_message, keepalive_message])
 """Vanilla testcase: Empty UPDATE message."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_empty_message_bfn()
@@ -54,8 +53,8 @@ testcase_1 = TestCase([open_message, keepalive_message, update_message])
 """Vanilla testcase: Trivial UPDATE message."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -76,8 +75,8 @@ testcase_2 = TestCase([open_message, keepalive_message, update_message])
 # This is expected to be ignored but not hurt the connection
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -96,8 +95,8 @@ testcase_3 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: Unmatched last AS number."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -116,8 +115,8 @@ testcase_4 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message lacking mandatory attribute - ORIGIN."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
 attr_nexthop = NextHopAttr_BFN(NextHop_BFN(tester_client_ip))
@@ -140,8 +139,8 @@ testcase_5 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: No NLRI but still use path attributes (No MP_REACH_NLRI)."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -160,8 +159,8 @@ testcase_6 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: Withdraw route that does not exist."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -180,8 +179,8 @@ testcase_7 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: Update message with multiple AS segments."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -200,8 +199,8 @@ testcase_8 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: Update message with AS loop."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -220,8 +219,8 @@ testcase_9 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with out-of-order path attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -246,8 +245,8 @@ testcase_10 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with COMMUNITIES attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -276,8 +275,8 @@ testcase_11 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with unknown COMMUNITIES operation."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -306,8 +305,8 @@ testcase_12 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with unknown path attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -341,8 +340,8 @@ testcase_13 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with repeated path attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 # Repeated path attrbutes.
@@ -371,8 +370,8 @@ testcase_14 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with near-maximum number of AS in AS_PATH."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 
@@ -403,8 +402,8 @@ testcase_15 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with another AS' COMMUNITIES."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -424,8 +423,8 @@ testcase_16 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with multiple BGP COMMUNITIES."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -445,8 +444,8 @@ testcase_17 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with empty COMMUNITIES list."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -475,8 +474,8 @@ testcase_18 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: Repeated NLRI components."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -494,8 +493,8 @@ testcase_19 = TestCase([open_message, keepalive_message, update_message])
 """Vanilla testcase: UPDATE message with MP_REACH_NLRI attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -523,8 +522,8 @@ testcase_20 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with all NLRI, NEXT_HOP and MP_REACH_NLRI attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -554,8 +553,8 @@ testcase_21 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with multiple IPv4 unicast MP_REACH_NLRI attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -593,8 +592,8 @@ testcase_22 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: No NLRI but still use path attributes (With MP_REACH_NLRI)."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -631,8 +630,8 @@ Same prefix in NLRIs, different next-hop.
 # TODO: Does the order matter?
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -666,8 +665,8 @@ Same prefix in NLRIs, different next-hop.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -697,8 +696,8 @@ testcase_25 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with MP_REACH_NLRI attribute with nontrivial RESERVED field."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -727,8 +726,8 @@ testcase_26 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with PathAttrType with nontrivial padding bits."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -754,8 +753,8 @@ testcase_27 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: External UPDATE message with LOCAL_PREF attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -783,8 +782,8 @@ testcase_28 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with nontrivial NLRI padding bits."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -820,8 +819,8 @@ Current size is 65533.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # This message now have length 65533
 community_list = [(114, op) for op in range(10000,26361)]
@@ -847,8 +846,8 @@ testcase_30 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message lacking mandatory attribute - NEXT_HOP."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -871,8 +870,8 @@ testcase_31 = TestCase([open_message, keepalive_message, update_message])
 """Vanilla testcase: Advertise a route then withdraw."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message 1
 update_message_bfn_1 = UpdateMessage_BFN.get_bfn(
@@ -900,8 +899,8 @@ testcase_32 = TestCase(
 """Testcase: Advertise a route then trigger treat-as-withdraw."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message 1
 update_message_bfn_1 = UpdateMessage_BFN.get_bfn(
@@ -948,7 +947,7 @@ diy_bgp_config = BGP_Configuration(
 open_message_bfn = OpenMessage_BFN.get_bfn(BGP_CONFIG)
 open_message = OpenMessage(open_message_bfn)
 # Vanilla KEEPALIVE message
-keepalive_message = deepcopy(vanilla_keepalive_message)
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -976,8 +975,8 @@ testcase_34 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with unknown WELL-KNOWN path attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1011,8 +1010,8 @@ testcase_35 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: Withdraw with normal path attributes (No NLRI)."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message 1
 update_message_bfn_1 = UpdateMessage_BFN.get_bfn(
@@ -1048,8 +1047,8 @@ testcase_36 = TestCase(
 """Testcase: Withdraw with an unknown OPTIONAL path attribute (No NLRI)."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message 1
 update_message_bfn_1 = UpdateMessage_BFN.get_bfn(
@@ -1087,8 +1086,8 @@ testcase_37 = TestCase(
 """Testcase: Withdraw with an unknown WELL-KNOWN path attribute (No NLRI)."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message 1
 update_message_bfn_1 = UpdateMessage_BFN.get_bfn(
@@ -1126,8 +1125,8 @@ testcase_38 = TestCase(
 """Testcase: UPDATE message with only an unknown OPTIONAL path attribute (No NLRI)."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_arbitrary = ArbitraryAttr_BFN(
     attr_type_bfn=AttrType_BFN.get_bfn(
@@ -1158,8 +1157,8 @@ Same prefix in NLRIs, different next-hop.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1193,8 +1192,8 @@ Same prefix in NLRIs, different next-hop.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1228,8 +1227,8 @@ Same prefix in NLRIs, different next-hop.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1263,8 +1262,8 @@ Same prefix in NLRIs, different next-hop.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1294,8 +1293,8 @@ testcase_43 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with MP_REACH_NLRI attribute with illegal NEXT_HOP value."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1326,8 +1325,8 @@ AND there is another path attribute embedded in the path attribute.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1364,8 +1363,8 @@ Testcase: WELL-KNOWN attribute not transitive.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1391,8 +1390,8 @@ testcase_46 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with only an incomplete Marker field."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message with only an incomplete Marker field
 update_message_bfn = UpdateMessage_BFN.get_bfn_diy_bval(b"\xff"*7)
@@ -1406,8 +1405,8 @@ testcase_47 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with a large length and no content."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message with only an incomplete Marker field
 update_message_bfn = UpdateMessage_BFN.get_empty_message_bfn()
@@ -1425,8 +1424,8 @@ BGP Update with the overall attribute field length exceeding the message length.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -1448,8 +1447,8 @@ Testcase: UPDATE message with one particular attribute field length exceeding th
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1478,8 +1477,8 @@ Violating RFC 4271: "For well-known attributes and for optional non-transitive a
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1508,8 +1507,8 @@ Violating RFC 4271: "For well-known attributes and for optional non-transitive a
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1538,8 +1537,8 @@ Violating RFC 4271: "For well-known attributes and for optional non-transitive a
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1569,8 +1568,8 @@ Current size is 65534.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
@@ -1609,8 +1608,8 @@ Testcase: UPDATE message with some random contents attached to the end.
 """
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 # UPDATE message
 update_message_bfn = UpdateMessage_BFN.get_bfn(
@@ -1631,8 +1630,8 @@ testcase_55 = TestCase([open_message, keepalive_message, update_message])
 """Testcase: UPDATE message with repeated unknown path attribute."""
 
 # Vanilla OPEN and KEEPALIVE message
-open_message = deepcopy(vanilla_open_message)
-keepalive_message = deepcopy(vanilla_keepalive_message)
+open_message = vanilla_open_message.clone()
+keepalive_message = vanilla_keepalive_message.clone()
 
 attr_origin = OriginAttr_BFN(Origin_BFN(OriginType.IGP))
 attr_aspath = ASPathAttr_BFN(ASPath_BFN.get_bfn(as_path=[tester_client_asn]))
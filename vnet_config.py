@@ -1,6 +1,6 @@
 from network_utils.vnet_utils import *
 
-import re, sys
+import re, sys, copy
 
 ########## Function for parsing the config file ##########
 
@@ -55,18 +55,28 @@ def set_up_vnet(config):
 
     ###### Processing the router software's veth ######
 
+    # The router software runs in the root namespace unless a namespace is given (e.g. in a sandbox).
+    router_namespace = router_software.get("namespace")
+    if router_namespace is not None:
+        exec_ns(create_network_namespace(router_namespace))
+        exec_ns(start_veth("lo"), namespace=router_namespace)
     # Create the veth for the router instance
     exec_ns(create_veth(router_software["veth"],
                         peer_name(router_software["veth"])))
     # Bind the peer side of the router's veth into the bridge.
     exec_ns(bind_veth_to_bridge(peer_name(router_software["veth"]),
                                 bridge_name))
+    if router_namespace is not None:
+        exec_ns(bind_interface_with_network_namespace(router_software["veth"],
+                                                      router_namespace))
     # Start both sides of the router's veth.
-    exec_ns(start_veth(router_software["veth"]))
+    exec_ns(start_veth(router_software["veth"]),
+            namespace=router_namespace)
     exec_ns(start_veth(peer_name(router_software["veth"])))
     # Assign the adress for the router 
     exec_ns(assign_prefix_to_interface(router_software["ip"],
-                                       router_software["veth"]))
+                                       router_software["veth"]),
+            namespace=router_namespace)
 
     ###### Processing the clients' veth ######
 
@@ -103,6 +113,8 @@ def cleanup_namespaces(config: dict):
     # Use a shorter expression
     exec_ns = execute_under_namespace
     namespaces = [client["namespace"] for client in clients]
+    if config["router_software"].get("namespace") is not None:
+        namespaces.append(config["router_software"]["namespace"])
     for namespace in namespaces:
         exec_ns(delete_network_namespace(namespace))
 
@@ -110,6 +122,7 @@ def cleanup_veth_interfaces(config: dict):
     """
     Clean all veth interfaces.
     Important: The veth name must contain `veth`!
+    The veths moved into a namespace have been deleted along with the namespace.
     """
     # Get all veth interfaces
     router_software: dict = config["router_software"]
@@ -139,6 +152,34 @@ def tear_down_vnet(config: dict):
     cleanup_veth_interfaces(config)
     cleanup_bridges(config)
 
+########## Function for sandboxes ##########
+
+# The namespace of the router software in the sandboxes.
+SANDBOX_ROUTER_NAMESPACE = "ns-rtr"
+
+def get_sandbox_name(name: str, index: int) -> str:
+    """
+    Get the name of the bridge/veth/namespace `name` in the sandbox `index`.
+    The names of the interfaces are limited to 15 characters (the veth peers are suffixed by `-peer`).
+    """
+    return f"{name}s{index}"
+
+def get_sandbox_vnet_config(config: dict, index: int) -> dict:
+    """
+    Get the vnet configuration of the sandbox `index` from `config`.
+    Each sandbox has its own bridge, veths and namespaces (the router software included),
+    so the IP addresses are kept and the sandboxes do not see each other.
+    """
+    sandbox_config = copy.deepcopy(config)
+    sandbox_config["bridge"] = get_sandbox_name(config["bridge"], index)
+    router_software: dict = sandbox_config["router_software"]
+    router_software["veth"] = get_sandbox_name(router_software["veth"], index)
+    router_software["namespace"] = get_sandbox_name(SANDBOX_ROUTER_NAMESPACE, index)
+    for client in sandbox_config["clients"]:
+        client["veth"] = get_sandbox_name(client["veth"], index)
+        client["namespace"] = get_sandbox_name(client["namespace"], index)
+    return sandbox_config
+
 ########## vnet configuration ##########
 
 # Parse the yaml file